@@ -0,0 +1,114 @@
+import random
+from time import perf_counter
+from typing import Callable, List, Tuple
+
+from constants import CONFIGS_DIRECTORY
+from space_game.Bullet import Bullet
+from space_game.Config import Config
+from space_game.Entity import Entity
+from space_game.Player import create_player_1, create_player_2
+from space_game.broad_phase.BroadPhase import BroadPhase
+from space_game.broad_phase.BruteForceBroadPhase import BruteForceBroadPhase
+from space_game.broad_phase.UniformGridBroadPhase import UniformGridBroadPhase
+from space_game.domain_names import Constraint, ObjectId
+from space_game.events.creation_events.NewCollisableAddedEvent import NewCollisableAddedEvent
+from space_game.events.creation_events.NewMovableAddedEvent import NewMovableAddedEvent
+from space_game.events.creation_events.NewObjectCreatedEvent import NewObjectCreatedEvent
+from space_game.managers.CollisionManager import CollisionManager
+from space_game.managers.EventManager import EventManager
+from space_game.managers.MovableManager import MovableManager
+
+BULLET_COUNTS = [0, 10, 20, 40, 80, 160]
+TICKS = 200
+
+
+class RecordingCollisionManager(CollisionManager):
+    def __init__(self, event_manager: EventManager, broad_phase: BroadPhase):
+        super().__init__(event_manager, broad_phase)
+        self.collisions: List[Tuple[ObjectId, ObjectId]] = []
+
+    def emit_collision(self, p1_id, p2_id):
+        self.collisions.append((p1_id, p2_id))
+
+
+def random_bullet(config: Config, rng: random.Random, event_manager: EventManager) -> Bullet:
+    return Bullet(
+        Entity(
+            x=rng.randrange(1, config.width - config.bullet_width),
+            y=rng.randrange(1, config.height - config.bullet_height),
+            x_constraint=Constraint(0, config.width),
+            y_constraint=Constraint(0, config.height),
+            vertical_velocity=rng.choice([-1, 1]) * config.bullet_velocity,
+            horizontal_velocity=0,
+            width=config.bullet_width,
+            height=config.bullet_height,
+            color=config.player_1_bullet_color,
+            respect_constraints=False,
+            max_velocity=config.max_velocity
+        ), 1, event_manager
+    )
+
+
+def run(config: Config, broad_phase_factory: Callable[[], BroadPhase], n_bullets: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    event_manager = EventManager()
+    collision_manager = RecordingCollisionManager(event_manager, broad_phase_factory())
+    movable_manager = MovableManager(event_manager.objects_manager)
+    movable_manager.add_movement_observer(collision_manager)
+    collision_manager.register(event_manager)
+    movable_manager.register(event_manager)
+    event_manager.process_events()
+
+    players = [create_player_1(config, event_manager), create_player_2(config, event_manager)]
+    for player in players:
+        player.register(event_manager)
+    bullets = [random_bullet(config, rng, event_manager) for _ in range(n_bullets)]
+    indices = {id(o): index for index, o in enumerate(players + bullets)}
+    for bullet in bullets:
+        event_manager.add_event(NewObjectCreatedEvent(bullet))
+        event_manager.add_event(NewMovableAddedEvent(id(bullet)))
+        event_manager.add_event(NewCollisableAddedEvent(id(bullet)))
+    event_manager.process_events()
+
+    pair_tests = 0
+    elapsed = 0.
+    for _ in range(TICKS):
+        for bullet in bullets:
+            if bullet.entity.is_at_constraints():
+                bullet.entity.y = rng.randrange(1, config.height - config.bullet_height)
+        movable_manager.update_movables()
+        start = perf_counter()
+        collision_manager.check_collisions()
+        elapsed += perf_counter() - start
+        pair_tests += collision_manager.pair_tests
+        event_manager.event_queue.clear()
+    return {
+        "pair_tests_per_tick": pair_tests / TICKS,
+        "us_per_tick": elapsed / TICKS * 1e6,
+        "collisions": [(indices[p1_id], indices[p2_id]) for p1_id, p2_id in collision_manager.collisions]
+    }
+
+
+def benchmark(config: Config) -> List[dict]:
+    results = []
+    for n_bullets in BULLET_COUNTS:
+        brute_force = run(config, BruteForceBroadPhase, n_bullets)
+        grid = run(config, lambda: UniformGridBroadPhase.from_config(config), n_bullets)
+        assert brute_force["collisions"] == grid["collisions"], "broad phases disagree"
+        results.append({
+            "bullets": n_bullets,
+            "brute_force_pair_tests": brute_force["pair_tests_per_tick"],
+            "brute_force_us": brute_force["us_per_tick"],
+            "grid_pair_tests": grid["pair_tests_per_tick"],
+            "grid_us": grid["us_per_tick"]
+        })
+    return results
+
+
+if __name__ == "__main__":
+    for config_name in ("unified_space_game_config.yml", "bigger_space_game_config.yml"):
+        print(config_name)
+        print(f"{'bullets':>8} {'brute pairs':>12} {'brute us':>10} {'grid pairs':>11} {'grid us':>9}")
+        for row in benchmark(Config.custom(CONFIGS_DIRECTORY / config_name)):
+            print(f"{row['bullets']:>8} {row['brute_force_pair_tests']:>12.1f} {row['brute_force_us']:>10.1f} "
+                  f"{row['grid_pair_tests']:>11.1f} {row['grid_us']:>9.1f}")
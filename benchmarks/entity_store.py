@@ -0,0 +1,66 @@
+import random
+from functools import partial
+from time import perf_counter
+
+from constants import CONFIGS_DIRECTORY
+from benchmarks.collision_broad_phase import random_bullet
+from space_game.Config import Config
+from space_game.Entity import Entity
+from space_game.EntityStore import EntityStore
+from space_game.events.creation_events.NewMovableAddedEvent import NewMovableAddedEvent
+from space_game.events.creation_events.NewObjectCreatedEvent import NewObjectCreatedEvent
+from space_game.events.creation_events.NewStatefulAddedEvent import NewStatefulAddedEvent
+from space_game.managers.EventManager import EventManager
+from space_game.managers.MovableManager import MovableManager
+from space_game.managers.StatefulsManager import StatefulsManager
+
+BULLET_COUNTS = [10, 40, 160, 640]
+TICKS = 200
+
+
+def bounce(entity: Entity) -> None:
+    entity.vertical_velocity = -entity.vertical_velocity
+
+
+def run_per_object(config: Config, n_bullets: int, seed: int = 0) -> float:
+    rng = random.Random(seed)
+    event_manager = EventManager()
+    bullets = [random_bullet(config, rng, event_manager) for _ in range(n_bullets)]
+    start = perf_counter()
+    for _ in range(TICKS):
+        for bullet in bullets:
+            bullet.update_position()
+        for bullet in bullets:
+            if bullet.entity.is_at_constraints():
+                bounce(bullet.entity)
+    return (perf_counter() - start) / TICKS * 1e6
+
+
+def run_entity_store(config: Config, n_bullets: int, seed: int = 0) -> float:
+    rng = random.Random(seed)
+    event_manager = EventManager()
+    entity_store = EntityStore()
+    movable_manager = MovableManager(event_manager.objects_manager, entity_store)
+    statefuls_manager = StatefulsManager(event_manager.objects_manager, entity_store)
+    movable_manager.register(event_manager)
+    statefuls_manager.register(event_manager)
+    event_manager.process_events()
+    bullets = [random_bullet(config, rng, event_manager) for _ in range(n_bullets)]
+    for bullet in bullets:
+        bullet.expire = partial(bounce, bullet.entity)
+        event_manager.add_event(NewObjectCreatedEvent(bullet))
+        event_manager.add_event(NewMovableAddedEvent(id(bullet)))
+        event_manager.add_event(NewStatefulAddedEvent(id(bullet)))
+    event_manager.process_events()
+    start = perf_counter()
+    for _ in range(TICKS):
+        movable_manager.update_movables()
+        statefuls_manager.update_statefuls()
+    return (perf_counter() - start) / TICKS * 1e6
+
+
+if __name__ == "__main__":
+    config = Config.custom(CONFIGS_DIRECTORY / "unified_space_game_config.yml")
+    print(f"{'bullets':>8} {'per object us':>14} {'entity store us':>16}")
+    for n_bullets in BULLET_COUNTS:
+        print(f"{n_bullets:>8} {run_per_object(config, n_bullets):>14.1f} {run_entity_store(config, n_bullets):>16.1f}")
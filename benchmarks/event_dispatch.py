@@ -0,0 +1,129 @@
+import gc
+import random
+from time import perf_counter
+from typing import Callable
+
+from benchmarks.collision_broad_phase import random_bullet
+from space_game.AccelerationDirection import AccelerationDirection
+from space_game.Config import Config
+from space_game.EventProfiler import EventProfiler
+from space_game.GameController import GameController
+from space_game.Player import create_player_1, create_player_2
+from space_game.events.PlayerAcceleratedEvent import PlayerAcceleratedEvent
+from space_game.events.creation_events.NewCollisableAddedEvent import NewCollisableAddedEvent
+from space_game.events.creation_events.NewDrawableAddedEvent import NewDrawableAddedEvent
+from space_game.events.creation_events.NewMovableAddedEvent import NewMovableAddedEvent
+from space_game.events.creation_events.NewObjectCreatedEvent import NewObjectCreatedEvent
+from space_game.events.creation_events.NewStatefulAddedEvent import NewStatefulAddedEvent
+from space_game.events.update_events.UpdateAIControllersEvent import UpdateAIControllersEvent
+from space_game.events.update_events.UpdateMovablesEvent import UpdateMovablesEvent
+from space_game.events.update_events.UpdateStatefulsEvent import UpdateStatefulsEvent
+from space_game.managers.EventManager import EventManager
+
+BULLETS_PER_TICK = [1, 4, 16]
+ACCELERATIONS = 100000
+TICKS = 300
+REPEATS = 5
+
+
+def process_events_legacy(event_manager: EventManager) -> None:
+    """
+    Previous dispatch: processors looked up in the registry and resolved through process_event for every event
+    """
+    while len(event_manager.event_queue) > 0 or len(event_manager.pending_deletions) > 0:
+        while len(event_manager.event_queue) > 0:
+            event = event_manager.event_queue.popleft()
+            for processor in event_manager.event_processors[type(event)].values():
+                processor.process_event(event)
+        event_manager.apply_pending_deletions()
+
+
+def run_accelerations(synchronous_registration: bool, process_events: Callable[[EventManager], None]) -> float:
+    """
+    Dispatch alone: a queue of cheap acceleration events, each processed by both players
+    :return: Seconds spent processing events
+    """
+    config = Config.unified()
+    game_controller = GameController(config, synchronous_registration=synchronous_registration)
+    event_manager = game_controller.event_manager
+    player_1 = create_player_1(config, event_manager)
+    player_2 = create_player_2(config, event_manager)
+    game_controller.__add_player__(player_1)
+    game_controller.__add_player__(player_2)
+    event_manager.process_events()
+    for _ in range(ACCELERATIONS // 2):
+        event_manager.add_event(PlayerAcceleratedEvent(id(player_1), AccelerationDirection.LEFT))
+        event_manager.add_event(PlayerAcceleratedEvent(id(player_2), AccelerationDirection.RIGHT))
+    start = perf_counter()
+    process_events(event_manager)
+    elapsed = perf_counter() - start
+    game_controller.release()
+    return elapsed
+
+
+def run_bullets(
+        synchronous_registration: bool, process_events: Callable[[EventManager], None], bullets_per_tick: int,
+        seed: int = 0
+) -> float:
+    """
+    Bullets are fired every tick and deleted once they leave the arena. Frames are neither drawn nor checked
+    for collisions, so registration and deletion of objects make up most of the work.
+    :return: Seconds spent processing events, registration of the fired bullets included
+    """
+    config = Config.unified()
+    rng = random.Random(seed)
+    game_controller = GameController(config, synchronous_registration=synchronous_registration)
+    event_manager = game_controller.event_manager
+    event_manager.process_events()
+    elapsed = 0.
+    for _ in range(TICKS):
+        bullets = [random_bullet(config, rng, event_manager) for _ in range(bullets_per_tick)]
+        start = perf_counter()
+        for bullet in bullets:
+            event_manager.add_event(NewObjectCreatedEvent(bullet))
+            event_manager.add_event(NewMovableAddedEvent(id(bullet)))
+            event_manager.add_event(NewCollisableAddedEvent(id(bullet)))
+            event_manager.add_event(NewDrawableAddedEvent(id(bullet)))
+            event_manager.add_event(NewStatefulAddedEvent(id(bullet)))
+        event_manager.add_event(UpdateMovablesEvent())
+        event_manager.add_event(UpdateStatefulsEvent())
+        event_manager.add_event(UpdateAIControllersEvent())
+        process_events(event_manager)
+        elapsed += perf_counter() - start
+    game_controller.release()
+    return elapsed
+
+
+def benchmark(run: Callable[..., float], *args, repeats: int = REPEATS) -> dict:
+    """
+    :return: Events per second of every dispatch variant, events are counted in a separate, untimed run
+    """
+    profiler = EventProfiler()
+    run(False, profiler.process_events, *args)
+    n_events = sum(profiler.event_counts.values())
+    variants = {
+        "legacy": (False, process_events_legacy),
+        "compiled": (False, EventManager.process_events),
+        "synchronous": (True, EventManager.process_events)
+    }
+    result = {"events": n_events}
+    gc.disable()
+    try:
+        for name, (synchronous_registration, process_events) in variants.items():
+            seconds = min(run(synchronous_registration, process_events, *args) for _ in range(repeats))
+            result[name] = n_events / seconds
+    finally:
+        gc.enable()
+    return result
+
+
+def print_row(name: str, result: dict) -> None:
+    print(f"{name:>16} {result['events']:>8} {result['legacy']:>12.0f} {result['compiled']:>14.0f} "
+          f"{result['synchronous']:>17.0f}")
+
+
+if __name__ == "__main__":
+    print(f"{'scenario':>16} {'events':>8} {'legacy ev/s':>12} {'compiled ev/s':>14} {'synchronous ev/s':>17}")
+    print_row("accelerations", benchmark(run_accelerations))
+    for n in BULLETS_PER_TICK:
+        print_row(f"{n} bullets/tick", benchmark(run_bullets, n))
@@ -0,0 +1,27 @@
+import sys
+from time import perf_counter
+
+from env.SpaceGameEnvironmentConfig import SpaceGameEnvironmentConfig
+from env.SpaceGameGymAPIEnvironment import SpaceGameEnvironment
+from space_game.Config import Config
+
+RESETS = 1000
+
+
+def run(resets: int, rebuild: bool) -> float:
+    env = SpaceGameEnvironment(SpaceGameEnvironmentConfig.unified(), Config.unified())
+    env.reset()
+    start = perf_counter()
+    for _ in range(resets):
+        if rebuild:
+            env.initial_snapshot = None
+        env.reset()
+    return (perf_counter() - start) / resets * 1e6
+
+
+if __name__ == "__main__":
+    resets = int(sys.argv[1]) if len(sys.argv) > 1 else RESETS
+    rebuild_us = run(resets, rebuild=True)
+    restore_us = run(resets, rebuild=False)
+    print(f"{'rebuild us':>12} {'restore us':>12} {'speedup':>8}")
+    print(f"{rebuild_us:>12.1f} {restore_us:>12.1f} {rebuild_us / restore_us:>8.1f}")
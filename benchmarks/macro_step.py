@@ -0,0 +1,45 @@
+import random
+import sys
+from time import perf_counter
+
+from env.SpaceGameEnvironmentConfig import SpaceGameEnvironmentConfig
+from env.SpaceGameSelfPlayEnvironment import SpaceGameSelfPlayEnvironment
+from space_game.Config import Config
+from space_game.Winner import Winner
+
+STEPS = 2000
+
+
+def run(steps: int, macro_step: bool) -> float:
+    """
+    :return: Microseconds per self-play step spent advancing the game, observations excluded
+    """
+    environment_config = SpaceGameEnvironmentConfig.unified()
+    environment_config.macro_step = macro_step
+    env = SpaceGameSelfPlayEnvironment(Config.unified(), environment_config)
+    n_actions = env.get_n_actions()
+    rng = random.Random(0)
+    random.seed(0)
+    env.reset()
+    event_manager = env.game_controller.event_manager
+    elapsed = 0.
+    for _ in range(steps):
+        for event in env.action_events_1[rng.randrange(n_actions)]:
+            event_manager.add_event(event)
+        for event in env.action_events_2[rng.randrange(n_actions)]:
+            event_manager.add_event(event)
+        start = perf_counter()
+        env.game_controller.advance(environment_config.step_delay)
+        elapsed += perf_counter() - start
+        if env.game_controller.is_game_over() != Winner.NOBODY:
+            env.reset()
+            event_manager = env.game_controller.event_manager
+    return elapsed / steps * 1e6
+
+
+if __name__ == "__main__":
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else STEPS
+    tick_us = run(steps, macro_step=False)
+    macro_us = run(steps, macro_step=True)
+    print(f"{'tick us':>12} {'macro us':>12} {'speedup':>8}")
+    print(f"{tick_us:>12.1f} {macro_us:>12.1f} {tick_us / macro_us:>8.1f}")
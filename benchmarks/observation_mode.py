@@ -0,0 +1,44 @@
+import random
+import sys
+from time import perf_counter
+
+import torch
+
+from env.FrameStack import FrameStack
+from env.SpaceGameEnvironmentConfig import SpaceGameEnvironmentConfig
+from env.SpaceGameGymAPIEnvironment import SpaceGameEnvironment
+from models.DQN.single_agent_training import create_network
+from space_game.Config import Config
+
+STEPS = 2000
+MODES = ("pixels", "vector")
+
+
+def run(steps: int, observation_mode: str, with_model: bool) -> float:
+    """
+    :return: Steps per second of a stacked environment acting randomly, or greedily with the network
+    of the observation mode (DQN for pixels, MLP for vectors) evaluated on cpu
+    """
+    environment_config = SpaceGameEnvironmentConfig.unified()
+    environment_config.observation_mode = observation_mode
+    env = FrameStack(SpaceGameEnvironment(environment_config, Config.unified()))
+    n_actions = env.get_n_actions()
+    network = create_network(env.frame().shape[1:], n_actions).eval() if with_model else None
+    rng = random.Random(0)
+    random.seed(0)
+    state = env.reset()
+    start = perf_counter()
+    with torch.no_grad():
+        for _ in range(steps):
+            action = int(network(state.float()).max(1)[1]) if with_model else rng.randrange(n_actions)
+            state, _, done, _ = env.step(action)
+            if done:
+                state = env.reset()
+    return steps / (perf_counter() - start)
+
+
+if __name__ == "__main__":
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else STEPS
+    print(f"{'mode':>8} {'env steps/s':>12} {'env+model steps/s':>18}")
+    for mode in MODES:
+        print(f"{mode:>8} {run(steps, mode, with_model=False):>12.1f} {run(steps, mode, with_model=True):>18.1f}")
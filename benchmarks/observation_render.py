@@ -0,0 +1,68 @@
+import random
+from time import perf_counter
+from typing import Tuple
+
+from PIL.Image import fromarray
+from numpy import zeros, array, uint8, expand_dims, array_equal
+
+from env.SpaceGameEnvironmentConfig import SpaceGameEnvironmentConfig
+from env.SpaceGameGymAPIEnvironment import SpaceGameEnvironment
+from space_game.Config import Config
+from space_game.Screen import Screen
+
+STEPS = 300
+
+
+class PillowScreen(Screen):
+    """
+    Previous render path: full size RGB buffer reallocated every frame, converted and resized by PIL
+    """
+    def __init__(self, screen: Screen):
+        super().__init__(screen.width, screen.height, screen.n_channels, screen.scaled_height, screen.scaled_width)
+
+    def reset_screen(self) -> None:
+        self.screen = zeros((self.width, self.height, self.n_channels), dtype=uint8)
+
+    def draw_rect(self, x: int, width: int, y: int, height: int, pxl: Tuple[int, int, int]) -> None:
+        self.screen[x:x+width, y:y+height] = array(pxl)
+
+    def process_map(self):
+        array_processed = array(fromarray(self.screen).convert('L').resize(
+            size=(self.scaled_height, self.scaled_width)))
+        return expand_dims(array_processed, axis=-1)
+
+
+def render_and_observe(drawables, screen: Screen):
+    screen.reset_screen()
+    for drawable in drawables:
+        drawable.draw(screen)
+    return screen.process_map()
+
+
+def benchmark(steps: int = STEPS, seed: int = 0) -> dict:
+    random.seed(seed)
+    env = SpaceGameEnvironment(SpaceGameEnvironmentConfig.unified(), Config.unified())
+    env.reset()
+    native_screen = env.game_controller.screen
+    pillow_screen = PillowScreen(native_screen)
+    native_time = pillow_time = 0.
+    for _ in range(steps):
+        _, _, done, _ = env.step(random.randrange(env.get_n_actions()))
+        if done:
+            env.reset()
+            native_screen = env.game_controller.screen
+        drawables = list(env.game_controller.drawable_manager.drawables.values())
+        start = perf_counter()
+        native = render_and_observe(drawables, native_screen)
+        native_time += perf_counter() - start
+        start = perf_counter()
+        pillow = render_and_observe(drawables, pillow_screen)
+        pillow_time += perf_counter() - start
+        assert array_equal(native, pillow), "observations differ"
+    return {"native_us": native_time / steps * 1e6, "pillow_us": pillow_time / steps * 1e6}
+
+
+if __name__ == "__main__":
+    result = benchmark()
+    print(f"PIL path:    {result['pillow_us']:8.1f} us per render+observe")
+    print(f"native path: {result['native_us']:8.1f} us per render+observe")
@@ -0,0 +1,74 @@
+import random
+import sys
+from time import perf_counter
+
+import numpy as np
+import torch
+
+from env.SpaceGameEnvironmentConfig import SpaceGameEnvironmentConfig
+from env.SpaceGameGymAPIEnvironment import SpaceGameEnvironment
+from models.DQN.Config import Config as DQNConfig
+from models.DQN.PrioritizedReplayMemory import PrioritizedReplayMemory
+from models.DQN.ReplayMemory import ReplayMemory
+from models.DQN.single_agent_training import train_model
+from space_game.Config import Config
+
+CAPACITY = 200000
+FRAME_SHAPE = (64, 64)
+BATCH_SIZE = 128
+SAMPLES = 1000
+EPISODE_LENGTH = 300
+
+
+def fill(memory: ReplayMemory, rng: np.random.Generator) -> None:
+    frames = torch.from_numpy(rng.integers(0, 256, (EPISODE_LENGTH + 3, 1) + FRAME_SHAPE, dtype=np.uint8))
+    while memory.written < memory.capacity:
+        memory.start_episode(frames[:3].view(1, 3, *FRAME_SHAPE))
+        for step in range(EPISODE_LENGTH):
+            memory.push(step % 6, 0., frames[step + 3] if step < EPISODE_LENGTH - 1 else None)
+
+
+def measure_latency(memory: ReplayMemory, samples: int) -> float:
+    """
+    :return: Microseconds per sample of a batch, followed by the update of its priorities when prioritized
+    """
+    rng = np.random.default_rng(0)
+    fill(memory, rng)
+    td_errors = rng.random((samples, BATCH_SIZE))
+    start = perf_counter()
+    for i in range(samples):
+        batch = memory.sample(BATCH_SIZE)
+        if batch.weight is not None:
+            memory.update_priorities(batch.slot, td_errors[i])
+    return (perf_counter() - start) / samples * 1e6
+
+
+def learning_curves(games: int) -> None:
+    """
+    Train against the DecisionBasedController opponent of the unified configs with uniform and prioritized replay.
+    Episode rewards of both runs are logged to TensorBoard as replay_uniform and replay_prioritized.
+    """
+    for prioritized_replay in (False, True):
+        random.seed(0)
+        np.random.seed(0)
+        torch.manual_seed(0)
+        dqn_config = DQNConfig.unified()
+        dqn_config.games_total = games
+        dqn_config.prioritized_replay = prioritized_replay
+        env = SpaceGameEnvironment(SpaceGameEnvironmentConfig.unified(), Config.unified())
+        train_model(
+            env=env, dqn_config=dqn_config,
+            custom_train_run_id=f"replay_{'prioritized' if prioritized_replay else 'uniform'}"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "curves":
+        learning_curves(int(sys.argv[2]) if len(sys.argv) > 2 else DQNConfig.unified().games_total)
+    else:
+        samples = int(sys.argv[1]) if len(sys.argv) > 1 else SAMPLES
+        uniform_us = measure_latency(ReplayMemory(CAPACITY, FRAME_SHAPE, batch_size=BATCH_SIZE), samples)
+        prioritized_us = measure_latency(PrioritizedReplayMemory(CAPACITY, FRAME_SHAPE, batch_size=BATCH_SIZE), samples)
+        print(f"capacity {CAPACITY}, batch {BATCH_SIZE}")
+        print(f"{'uniform us':>12} {'prioritized us':>15}")
+        print(f"{uniform_us:>12.1f} {prioritized_us:>15.1f}")
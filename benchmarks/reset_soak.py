@@ -0,0 +1,47 @@
+import gc
+import os
+import sys
+from time import perf_counter
+
+from env.SpaceGameEnvironmentConfig import SpaceGameEnvironmentConfig
+from env.SpaceGameGymAPIEnvironment import SpaceGameEnvironment
+from space_game.Config import Config
+
+RESETS = 100_000
+SAMPLES = 10
+STEPS_PER_EPISODE = 2
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 10
+
+
+def soak(resets: int = RESETS, samples: int = SAMPLES) -> list:
+    env = SpaceGameEnvironment(SpaceGameEnvironmentConfig.unified(), Config.unified())
+    interval = max(resets // samples, 1)
+    results = []
+    start = perf_counter()
+    for index in range(1, resets + 1):
+        env.reset()
+        for _ in range(STEPS_PER_EPISODE):
+            env.step(0)
+        if index % interval == 0:
+            gc.collect()
+            results.append({
+                "resets": index,
+                "rss_mb": current_rss_mb(),
+                "seconds": perf_counter() - start
+            })
+    return results
+
+
+if __name__ == "__main__":
+    resets = int(sys.argv[1]) if len(sys.argv) > 1 else RESETS
+    print(f"{'resets':>8} {'rss MB':>8} {'seconds':>8}")
+    for row in soak(resets):
+        print(f"{row['resets']:>8} {row['rss_mb']:>8.1f} {row['seconds']:>8.1f}")
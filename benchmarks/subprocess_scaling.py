@@ -0,0 +1,53 @@
+import os
+import sys
+from time import perf_counter
+from typing import Iterator
+
+import numpy as np
+
+from env.SpaceGameEnvironmentConfig import SpaceGameEnvironmentConfig
+from env.SubprocessVectorSpaceGameEnvironment import SubprocessVectorSpaceGameEnvironment
+from env.VectorSpaceGameEnvironment import VectorSpaceGameEnvironment
+from space_game.Config import Config
+
+WORKER_COUNTS = [1, 2, 4, 8, 16]
+ENVS_PER_WORKER = 4
+STEPS = 200
+
+
+def run(env, steps: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    env.reset()
+    ipc_overhead = 0.
+    start = perf_counter()
+    for _ in range(steps):
+        actions = rng.integers(0, env.get_n_actions(), env.num_envs)
+        step_start = perf_counter()
+        env.step(actions)
+        if isinstance(env, SubprocessVectorSpaceGameEnvironment):
+            ipc_overhead += perf_counter() - step_start - max(env.worker_times)
+    elapsed = perf_counter() - start
+    env.close()
+    return {
+        "steps_per_second": steps * env.num_envs / elapsed,
+        "ipc_overhead_us": ipc_overhead / steps * 1e6
+    }
+
+
+def benchmark(worker_counts=WORKER_COUNTS, steps: int = STEPS) -> Iterator[dict]:
+    environment_config = SpaceGameEnvironmentConfig.unified()
+    game_config = Config.unified()
+    yield {"workers": 0, **run(VectorSpaceGameEnvironment(ENVS_PER_WORKER, environment_config, game_config), steps)}
+    for n_workers in worker_counts:
+        env = SubprocessVectorSpaceGameEnvironment(
+            n_workers * ENVS_PER_WORKER, n_workers, environment_config, game_config
+        )
+        yield {"workers": n_workers, **run(env, steps)}
+
+
+if __name__ == "__main__":
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else STEPS
+    print(f"cpu count: {os.cpu_count()}, games per worker: {ENVS_PER_WORKER} (0 workers = in-process)")
+    print(f"{'workers':>8} {'steps/s':>10} {'ipc us/step':>12}")
+    for row in benchmark(steps=steps):
+        print(f"{row['workers']:>8} {row['steps_per_second']:>10.1f} {row['ipc_overhead_us']:>12.1f}", flush=True)
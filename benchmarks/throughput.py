@@ -0,0 +1,221 @@
+import json
+import platform
+import random
+import subprocess
+from functools import partial
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, List
+
+from benchmarks.collision_broad_phase import random_bullet
+from benchmarks.entity_store import bounce
+from constants import BENCHMARK_RESULTS_DIRECTORY, CONFIGS_DIRECTORY
+from env.EnvironmentAction import EnvironmentAction, EnvironmentActionToAIActionMapping, \
+    compile_environment_action_events
+from env.SpaceGameEnvironmentConfig import SpaceGameEnvironmentConfig
+from env.SpaceGameGymAPIEnvironment import SpaceGameEnvironment
+from env.SpaceGameSelfPlayEnvironment import SpaceGameSelfPlayEnvironment
+from space_game.Config import Config
+from space_game.GameController import GameController
+from space_game.ai.AIActionToEventMapping import AIActionToEventMapping
+from space_game.ai.DecisionBasedController import DecisionBasedController
+from space_game.ai.RandomAI import RandomAI
+from space_game.events.creation_events.NewCollisableAddedEvent import NewCollisableAddedEvent
+from space_game.events.creation_events.NewDrawableAddedEvent import NewDrawableAddedEvent
+from space_game.events.creation_events.NewMovableAddedEvent import NewMovableAddedEvent
+from space_game.events.creation_events.NewObjectCreatedEvent import NewObjectCreatedEvent
+from space_game.events.creation_events.NewStatefulAddedEvent import NewStatefulAddedEvent
+from space_game.events.update_events.CheckCollisionsEvent import CheckCollisionsEvent
+from space_game.events.update_events.UpdateAIControllersEvent import UpdateAIControllersEvent
+from space_game.events.update_events.UpdateDrawablesEvent import UpdateDrawablesEvent
+from space_game.events.update_events.UpdateMovablesEvent import UpdateMovablesEvent
+from space_game.events.update_events.UpdateStatefulsEvent import UpdateStatefulsEvent
+
+CONFIG_NAMES = ("unified_space_game_config.yml", "bigger_space_game_config.yml")
+OPPONENTS = {"RandomAI": RandomAI, "DecisionBasedController": DecisionBasedController}
+BULLET_COUNTS = [0, 10, 40, 160]
+STEPS = 500
+RESETS = 200
+TICKS = 500
+ACTIONS = 100000
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def measure_environment(env, step: Callable[[random.Random], bool], steps: int, resets: int, ticks: int) -> dict:
+    """
+    :param step: Performs a single random step of env and returns whether the game is done
+    """
+    rng = random.Random(0)
+    random.seed(0)
+    env.reset()
+    start = perf_counter()
+    for _ in range(steps):
+        if step(rng):
+            env.reset()
+    steps_per_second = steps / (perf_counter() - start)
+
+    start = perf_counter()
+    for _ in range(resets):
+        env.reset()
+    resets_per_second = resets / (perf_counter() - start)
+
+    env.reset()
+    start = perf_counter()
+    for _ in range(ticks):
+        env.game_controller.__refresh__()
+    ticks_per_second = ticks / (perf_counter() - start)
+    return {
+        "steps_per_second": steps_per_second,
+        "resets_per_second": resets_per_second,
+        "ticks_per_second": ticks_per_second
+    }
+
+
+def benchmark_environments(config_name: str, steps: int, resets: int, ticks: int) -> List[dict]:
+    game_config = Config.custom(CONFIGS_DIRECTORY / config_name)
+    results = []
+    for opponent_name, opponent_type in OPPONENTS.items():
+        environment_config = SpaceGameEnvironmentConfig.unified()
+        environment_config.OpponentControllerType = opponent_type
+        env = SpaceGameEnvironment(environment_config, game_config)
+        n_actions = env.get_n_actions()
+        results.append({
+            "config": config_name,
+            "environment": f"SpaceGameEnvironment[{opponent_name}]",
+            **measure_environment(env, lambda rng: env.step(rng.randrange(n_actions))[2], steps, resets, ticks)
+        })
+
+    self_play_env = SpaceGameSelfPlayEnvironment(game_config, SpaceGameEnvironmentConfig.unified())
+    n_actions = self_play_env.get_n_actions()
+
+    def self_play_step(rng: random.Random) -> bool:
+        (_, _, done_1), (_, _, done_2) = self_play_env.step((rng.randrange(n_actions), rng.randrange(n_actions)))
+        return done_1 or done_2
+    results.append({
+        "config": config_name,
+        "environment": "SpaceGameSelfPlayEnvironment",
+        **measure_environment(self_play_env, self_play_step, steps, resets, ticks)
+    })
+    return results
+
+
+def benchmark_components(config_name: str, n_bullets: int, ticks: int) -> dict:
+    """
+    Per tick latency of the hot paths of a game populated with n_bullets bullets bouncing off the arena borders
+    """
+    config = Config.custom(CONFIGS_DIRECTORY / config_name)
+    rng = random.Random(0)
+    game_controller = GameController(config)
+    event_manager = game_controller.event_manager
+    for _ in range(n_bullets):
+        bullet = random_bullet(config, rng, event_manager)
+        bullet.expire = partial(bounce, bullet.entity)
+        event_manager.add_event(NewObjectCreatedEvent(bullet))
+        event_manager.add_event(NewMovableAddedEvent(id(bullet)))
+        event_manager.add_event(NewCollisableAddedEvent(id(bullet)))
+        event_manager.add_event(NewDrawableAddedEvent(id(bullet)))
+        event_manager.add_event(NewStatefulAddedEvent(id(bullet)))
+    event_manager.process_events()
+
+    process_events = check_collisions = process_map = 0.
+    for _ in range(ticks):
+        event_manager.add_event(UpdateDrawablesEvent())
+        event_manager.add_event(UpdateMovablesEvent())
+        event_manager.add_event(UpdateStatefulsEvent())
+        event_manager.add_event(CheckCollisionsEvent())
+        event_manager.add_event(UpdateAIControllersEvent())
+        start = perf_counter()
+        event_manager.process_events()
+        process_events += perf_counter() - start
+
+        start = perf_counter()
+        game_controller.collision_manager.check_collisions()
+        check_collisions += perf_counter() - start
+
+        game_controller.screen.invalidate()
+        start = perf_counter()
+        game_controller.screen.process_map()
+        process_map += perf_counter() - start
+    return {
+        "config": config_name,
+        "bullets": n_bullets,
+        "process_events_us": process_events / ticks * 1e6,
+        "check_collisions_us": check_collisions / ticks * 1e6,
+        "process_map_us": process_map / ticks * 1e6
+    }
+
+
+def benchmark_action_events(actions: int) -> dict:
+    """
+    Latency of turning a random environment action into events, as done on every step:
+    mapping built on every call versus the table compiled once per player
+    """
+    rng = random.Random(0)
+    player_id = 0
+    sampled_actions = [rng.choice(list(EnvironmentAction)) for _ in range(actions)]
+    start = perf_counter()
+    for action in sampled_actions:
+        for _ in AIActionToEventMapping[EnvironmentActionToAIActionMapping[action]](player_id):
+            pass
+    mapped = perf_counter() - start
+
+    action_events = compile_environment_action_events(player_id)
+    start = perf_counter()
+    for action in sampled_actions:
+        for _ in action_events[action]:
+            pass
+    compiled = perf_counter() - start
+    return {"mapped_us": mapped / actions * 1e6, "compiled_us": compiled / actions * 1e6}
+
+
+def run_suite(
+        steps: int = STEPS, resets: int = RESETS, ticks: int = TICKS, actions: int = ACTIONS,
+        log: Callable[[str], None] = print
+) -> dict:
+    environments = []
+    components = []
+    for config_name in CONFIG_NAMES:
+        log(config_name)
+        log(f"{'environment':>45} {'steps/s':>10} {'resets/s':>10} {'ticks/s':>10}")
+        for row in benchmark_environments(config_name, steps, resets, ticks):
+            environments.append(row)
+            log(f"{row['environment']:>45} {row['steps_per_second']:>10.1f} "
+                f"{row['resets_per_second']:>10.1f} {row['ticks_per_second']:>10.1f}")
+        log(f"{'bullets':>8} {'process_events us':>18} {'check_collisions us':>20} {'process_map us':>15}")
+        for n_bullets in BULLET_COUNTS:
+            row = benchmark_components(config_name, n_bullets, ticks)
+            components.append(row)
+            log(f"{n_bullets:>8} {row['process_events_us']:>18.1f} {row['check_collisions_us']:>20.1f} "
+                f"{row['process_map_us']:>15.1f}")
+    action_events = benchmark_action_events(actions)
+    log(f"action to events: {action_events['mapped_us']:.2f} us mapped, {action_events['compiled_us']:.2f} us compiled")
+    return {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "settings": {
+            "steps": steps, "resets": resets, "ticks": ticks, "actions": actions, "bullet_counts": BULLET_COUNTS
+        },
+        "environments": environments,
+        "components": components,
+        "action_events": action_events
+    }
+
+
+def write_results(results: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    suite_results = run_suite()
+    write_results(suite_results, BENCHMARK_RESULTS_DIRECTORY / f"{suite_results['commit']}.json")
@@ -1,13 +1,20 @@
+import os
+from pathlib import Path
+
 import click
 import torch
 
 from env.SpaceGameSelfPlayEnvironment import SpaceGameSelfPlayEnvironment
 from space_game.Config import Config
-from constants import CONFIGS_DIRECTORY
+from space_game.EventProfiler import EventProfiler
+from benchmarks.throughput import ACTIONS, RESETS, STEPS, TICKS, run_suite, write_results
+from constants import BENCHMARK_RESULTS_DIRECTORY, CONFIGS_DIRECTORY
 from env.SpaceGameEnvironmentConfig import SpaceGameEnvironmentConfig
 from env.SpaceGameGymAPIEnvironment import SpaceGameEnvironment
+from env.VectorSpaceGameEnvironment import VectorSpaceGameEnvironment
 from models.DQN.Config import Config as DQNConfig
-from models.DQN.single_agent_training import train_model
+from models.DQN.actor_learner_training import PUBLISH_INTERVAL, train_model as train_actor_learner_model
+from models.DQN.single_agent_training import train_model as train_single_agent_model
 from models.DQN.self_play_training import train_model
 
 
@@ -20,18 +27,43 @@ def cli():
 @click.option('--game-config-file', default='unified_space_game_config.yml', help='Filename of desired config for SpaceGame')
 @click.option('--env-config-file', default='unified_gym_api_env_config.yml', help='Filename of desired config for GymApi')
 @click.option('--dqn-config-file', default='unified_dqn_config.yml', help='Filename of desired config for Custom DQN')
-def train_custom_dqn(game_config_file, env_config_file, dqn_config_file):
+@click.option('--n-envs', default=1, help='Number of games stepped one after another per training step')
+@click.option('--profile', is_flag=True, help='Log per event and per processor timings of the game to TensorBoard')
+def train_custom_dqn(game_config_file, env_config_file, dqn_config_file, n_envs, profile):
     space_game_config = Config.custom(CONFIGS_DIRECTORY / game_config_file)
     gym_api_env_config = SpaceGameEnvironmentConfig.custom(CONFIGS_DIRECTORY / env_config_file)
     dqn_config = DQNConfig.custom(CONFIGS_DIRECTORY / dqn_config_file)
 
-    gym_api_env = SpaceGameEnvironment(game_config=space_game_config, environment_config=gym_api_env_config)
-    train_model(env=gym_api_env, dqn_config=dqn_config)
+    if n_envs > 1:
+        gym_api_env = VectorSpaceGameEnvironment(n_envs, gym_api_env_config, space_game_config)
+    else:
+        gym_api_env = SpaceGameEnvironment(game_config=space_game_config, environment_config=gym_api_env_config)
+    train_single_agent_model(env=gym_api_env, dqn_config=dqn_config, profiler=EventProfiler() if profile else None)
+
+
+@cli.command()
+@click.option('--game-config-file', default='unified_space_game_config.yml', help='Filename of desired config for SpaceGame')
+@click.option('--env-config-file', default='unified_gym_api_env_config.yml', help='Filename of desired config for GymApi')
+@click.option('--dqn-config-file', default='unified_dqn_config.yml', help='Filename of desired config for Custom DQN')
+@click.option('--n-actors', default=max(1, (os.cpu_count() or 2) - 1), help='Number of actor processes playing games')
+@click.option('--publish-interval', default=PUBLISH_INTERVAL, help='Learner updates between broadcasts of weights')
+def train_actor_learner_dqn(game_config_file, env_config_file, dqn_config_file, n_actors, publish_interval):
+    space_game_config = Config.custom(CONFIGS_DIRECTORY / game_config_file)
+    gym_api_env_config = SpaceGameEnvironmentConfig.custom(CONFIGS_DIRECTORY / env_config_file)
+    dqn_config = DQNConfig.custom(CONFIGS_DIRECTORY / dqn_config_file)
+    train_actor_learner_model(
+        n_actors=n_actors,
+        environment_config=gym_api_env_config,
+        game_config=space_game_config,
+        dqn_config=dqn_config,
+        publish_interval=publish_interval
+    )
 
 
 @cli.command()
 @click.option('--saved-model-path', default=None, help='Filepath to trained DQN model')
-def unified_self_play_dqn(saved_model_path: str):
+@click.option('--n-envs', default=1, help='Number of games played at once, requires shared_self_play_policy')
+def unified_self_play_dqn(saved_model_path: str, n_envs: int):
     model = torch.load(saved_model_path) if saved_model_path else None
 
     space_game_config = Config.unified()
@@ -43,9 +75,23 @@ def unified_self_play_dqn(saved_model_path: str):
     train_model(
         env=self_play_env,
         dqn_config=dqn_config,
-        old_model=model
+        old_model=model,
+        n_envs=n_envs
     )
 
 
+@cli.command()
+@click.option('--output', default=None, help='Path of the JSON results file, benchmark_results/<commit>.json by default')
+@click.option('--steps', default=STEPS, help='Environment steps measured per environment')
+@click.option('--resets', default=RESETS, help='Resets measured per environment')
+@click.option('--ticks', default=TICKS, help='Game ticks measured per environment and bullet count')
+@click.option('--actions', default=ACTIONS, help='Actions turned into events per mapping')
+def benchmark(output, steps, resets, ticks, actions):
+    results = run_suite(steps=steps, resets=resets, ticks=ticks, actions=actions, log=click.echo)
+    path = Path(output) if output else BENCHMARK_RESULTS_DIRECTORY / f"{results['commit']}.json"
+    write_results(results, path)
+    click.echo(f"results written to {path}")
+
+
 if __name__ == '__main__':
     cli()
@@ -4,8 +4,9 @@ import gym
 import torch
 
 from env.EnvironmentAction import EnvironmentActionToAIActionMapping, EnvironmentAction
+from env.FrameHistory import FrameHistory
+from env.FrameStack import HISTORY_LENGTH
 from common.TorchNNModuleInterface import TorchNNModuleInterface
-from common.utils import process_observation
 from space_game.ai.AIAction import AIAction
 
 
@@ -13,12 +14,11 @@ class DQNWrapper(TorchNNModuleInterface):
     def __init__(self, module: torch.nn.Module):
         super(DQNWrapper, self).__init__(module)
         self.module = module.cpu()
-        self.state = torch.zeros((1, 3, 64, 64))
+        self.history = FrameHistory(1, HISTORY_LENGTH, (64, 64))
 
     def predict(self, observation: gym.spaces.Box) -> AIAction:
-        processed_observation = process_observation(observation).cpu()
-        self.state = torch.cat((self.state[:, 1:, :, :], processed_observation.unsqueeze(0)), dim=1)
-        raw_action = self.module(self.state).max(1)[1].view(1, 1)
+        self.history.push((observation,))
+        raw_action = self.module(self.history.state(0).float()).max(1)[1].view(1, 1)
         return EnvironmentActionToAIActionMapping.get(EnvironmentAction(raw_action.item()), AIAction.StandStill)
 
     @staticmethod
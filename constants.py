@@ -6,3 +6,4 @@ SCREENSHOTS_DIRECTORY = Path("screenshots").absolute()
 TRAINING_LOGS_DIRECTORY = Path("logs").absolute()
 RECORDED_GAMES_DIRECTORY = Path("recordings").absolute()
 CONFIGS_DIRECTORY = Path("configs").absolute()
+BENCHMARK_RESULTS_DIRECTORY = Path("benchmark_results").absolute()
@@ -1,7 +1,10 @@
 import enum
-from typing import Dict
+from typing import Callable, Dict, Tuple
 
 from space_game.ai.AIAction import AIAction
+from space_game.ai.AIActionToEventMapping import compile_action_events
+from space_game.domain_names import PlayerId
+from space_game.events.Event import Event
 
 
 class EnvironmentAction(enum.IntEnum):
@@ -45,3 +48,17 @@ EnvironmentActionToAIActionMapping: Dict[EnvironmentAction, AIAction] = {
     EnvironmentAction.MoveRightDownShoot: AIAction.MoveRightDownShoot,
     EnvironmentAction.StandStill: AIAction.StandStill,
 }
+
+
+def compile_environment_action_events(
+        player_id: PlayerId,
+        transform: Callable[[EnvironmentAction], EnvironmentAction] = lambda action: action
+) -> Dict[EnvironmentAction, Tuple[Event, ...]]:
+    """
+    Events of every environment action of a single player, resolved once instead of on every step
+    :param transform: Applied to the action before it is mapped, e.g. to mirror movement of the down side player
+    """
+    action_events = compile_action_events(player_id)
+    return {
+        action: action_events[EnvironmentActionToAIActionMapping[transform(action)]] for action in EnvironmentAction
+    }
@@ -0,0 +1,77 @@
+from typing import List
+
+import numpy as np
+
+from space_game.Bullet import Bullet
+from space_game.Config import Config
+from space_game.GameController import GameController
+from space_game.Player import Player
+
+N_BULLETS = 8
+
+
+class FeatureObservation:
+    """
+    Fixed-size float32 feature vector of the game state seen by a player, read straight from the entities
+    instead of the screen: the player, its opponent and the n_bullets bullets of each of them nearest
+    to the player vertically. Positions are normalized entity centers, velocities are relative to max_velocity
+    (bullet_velocity for bullets) and empty bullet slots are zero. Mirrored features are seen from the DOWN side,
+    flipped vertically like Screen.process_flipped_map, so both sides of self-play see their own side at the top.
+    """
+    PLAYER_FEATURES = 7
+    BULLET_FEATURES = 4
+
+    def __init__(self, config: Config, n_bullets: int = N_BULLETS):
+        self.config = config
+        self.n_bullets = n_bullets
+        self.size = 2 * self.PLAYER_FEATURES + 2 * n_bullets * self.BULLET_FEATURES
+
+    def encode(
+            self, game_controller: GameController, player: Player, opponent: Player, mirrored: bool = False
+    ) -> np.ndarray:
+        features = np.zeros(self.size, dtype=np.float32)
+        features[:self.PLAYER_FEATURES] = self.encode_player(player, mirrored)
+        features[self.PLAYER_FEATURES:2 * self.PLAYER_FEATURES] = self.encode_player(opponent, mirrored)
+        bullets = [
+            movable for movable in game_controller.movable_manager.movables.values() if isinstance(movable, Bullet)
+        ]
+        # bullets fired by the player of side 1 fly down, the ones of side 2 fly up
+        direction = 1 if player.side == 1 else -1
+        own = [bullet for bullet in bullets if bullet.entity.vertical_velocity * direction > 0]
+        enemy = [bullet for bullet in bullets if bullet.entity.vertical_velocity * direction <= 0]
+        offset = 2 * self.PLAYER_FEATURES
+        for group in (own, enemy):
+            slots = features[offset:offset + self.n_bullets * self.BULLET_FEATURES].reshape(self.n_bullets, -1)
+            self.encode_bullets(group, player, mirrored, slots)
+            offset += self.n_bullets * self.BULLET_FEATURES
+        return features
+
+    def encode_player(self, player: Player, mirrored: bool) -> List[float]:
+        entity = player.entity
+        config = self.config
+        return [
+            (entity.x + entity.width / 2) / config.width,
+            self.vertical_position(entity.y + entity.height / 2, mirrored),
+            entity.horizontal_velocity / config.max_velocity,
+            entity.vertical_velocity / config.max_velocity * (-1 if mirrored else 1),
+            player.hitpoints / config.max_hitpoints,
+            player.ammo_left / config.ammo_maximum,
+            player.shoot_countdown / config.shoot_cooldown if config.shoot_cooldown else 0.
+        ]
+
+    def encode_bullets(self, bullets: List[Bullet], player: Player, mirrored: bool, slots: np.ndarray) -> None:
+        """
+        Write the bullets nearest to player vertically into the rows of slots
+        """
+        player_center = player.entity.y + player.entity.height / 2
+        bullets = sorted(bullets, key=lambda bullet: abs(bullet.entity.y - player_center))[:self.n_bullets]
+        for slot, bullet in zip(slots, bullets):
+            entity = bullet.entity
+            slot[0] = 1.
+            slot[1] = (entity.x + entity.width / 2) / self.config.width
+            slot[2] = self.vertical_position(entity.y + entity.height / 2, mirrored)
+            slot[3] = entity.vertical_velocity / self.config.bullet_velocity * (-1 if mirrored else 1)
+
+    def vertical_position(self, y: float, mirrored: bool) -> float:
+        y = y / self.config.height
+        return 1. - y if mirrored else y
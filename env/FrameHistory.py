@@ -0,0 +1,87 @@
+from typing import Sequence, Tuple
+
+import numpy as np
+import torch
+
+
+class FrameHistory:
+    """
+    Last history_length frames of n_streams games stepped in lockstep, kept in a preallocated circular buffer.
+    Every frame is written twice, history_length slots apart, so the history of every stream is a contiguous window
+    of the buffer and states are zero-copy channel-first views of it, oldest frame first.
+    Frames are observations transposed like process_observation does, feature vectors as they are,
+    or with frame_difference the differences of consecutive ones, wrapping around like uint8 tensors do.
+    Views are overwritten by the following push, so they have to be copied to be kept.
+    """
+    def __init__(
+            self, n_streams: int, history_length: int, frame_shape: Tuple[int, ...], frame_difference: bool = False,
+            dtype: np.dtype = np.uint8
+    ):
+        """
+        :param frame_shape: Shape of a processed frame, see to_frame
+        :param dtype: Type of the observations, float32 for feature vectors
+        """
+        self.history_length = history_length
+        self.frame_difference = frame_difference
+        self.buffer = np.zeros((n_streams, 2 * history_length) + tuple(frame_shape), dtype=dtype)
+        self.screens = np.zeros((n_streams,) + tuple(frame_shape), dtype=dtype)
+        self.buffer_tensor = torch.from_numpy(self.buffer)
+        self.screens_tensor = torch.from_numpy(self.screens)
+        # slot of the oldest frame, which the next push overwrites
+        self.position = 0
+
+    @staticmethod
+    def to_frame(observation: np.ndarray) -> np.ndarray:
+        """
+        :param observation: HxWx1 screen observation or feature vector
+        """
+        if observation.ndim == 1:
+            return observation
+        return observation[:, :, 0].T
+
+    def reset(self, stream: int, observation: np.ndarray) -> None:
+        """
+        Start a new game of the stream, whose first frame fills the whole history
+        """
+        self.screens[stream] = self.to_frame(observation)
+        self.buffer[stream] = 0 if self.frame_difference else self.screens[stream]
+
+    def push(self, observations: Sequence[np.ndarray]) -> None:
+        """
+        :param observations: Observation of every stream
+        """
+        slot = self.position
+        for stream, observation in enumerate(observations):
+            screen = self.to_frame(observation)
+            if self.frame_difference:
+                np.subtract(screen, self.screens[stream], out=self.buffer[stream, slot])
+            else:
+                self.buffer[stream, slot] = screen
+            self.screens[stream] = screen
+        self.buffer[:, slot + self.history_length] = self.buffer[:, slot]
+        self.position = (slot + 1) % self.history_length
+
+    def state(self, stream: int) -> torch.Tensor:
+        """
+        :return: 1xHxFrame state of the stream
+        """
+        return self.buffer_tensor[stream:stream + 1, self.position:self.position + self.history_length]
+
+    def states(self) -> torch.Tensor:
+        """
+        :return: NxHxFrame states of all streams
+        """
+        return self.buffer_tensor[:, self.position:self.position + self.history_length]
+
+    def frame(self, stream: int) -> torch.Tensor:
+        """
+        :return: 1xFrame newest frame of the stream's state
+        """
+        newest = self.position + self.history_length - 1
+        return self.buffer_tensor[stream, newest:newest + 1]
+
+    def screen(self, stream: int) -> torch.Tensor:
+        """
+        :return: 1xFrame last processed observation of the stream
+        """
+        return self.screens_tensor[stream:stream + 1]
@@ -0,0 +1,66 @@
+from typing import Any, Tuple, Union
+
+import torch
+
+from env.FrameHistory import FrameHistory
+from env.SpaceGameGymAPIEnvironment import SpaceGameEnvironment
+from env.SpaceGameSelfPlayEnvironment import SpaceGameSelfPlayEnvironment
+
+HISTORY_LENGTH = 3
+
+
+class FrameStack:
+    """
+    Wraps SpaceGameEnvironment or SpaceGameSelfPlayEnvironment to return 1xHxFrame states of the last
+    history_length frames in place of observations, one per side of self-play, see FrameHistory.
+    reset fills the history with the first frame. States are views valid until the following step.
+    Max-pooling over the ticks of a step is set by pooled_ticks of the environment config, since the frames
+    are drawn while the game advances.
+    Other attributes are the ones of the wrapped environment.
+    """
+    def __init__(
+            self,
+            env: Union[SpaceGameEnvironment, SpaceGameSelfPlayEnvironment],
+            history_length: int = HISTORY_LENGTH,
+            frame_difference: bool = False
+    ):
+        self.env = env
+        self.self_play = isinstance(env, SpaceGameSelfPlayEnvironment)
+        frame = FrameHistory.to_frame(env.sample_observation_space())
+        self.history = FrameHistory(
+            2 if self.self_play else 1, history_length, frame.shape, frame_difference, frame.dtype
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        if name == 'env':
+            raise AttributeError(name)
+        return getattr(self.env, name)
+
+    def reset(self, *args) -> Union[torch.Tensor, Tuple[torch.Tensor, torch.Tensor]]:
+        observations = self.env.reset(*args)
+        if not self.self_play:
+            observations = (observations,)
+        for stream, observation in enumerate(observations):
+            self.history.reset(stream, observation)
+        return (self.history.state(0), self.history.state(1)) if self.self_play else self.history.state(0)
+
+    def step(self, action):
+        if self.self_play:
+            (reward_1, observation_1, done_1), (reward_2, observation_2, done_2) = self.env.step(action)
+            self.history.push((observation_1, observation_2))
+            return (reward_1, self.history.state(0), done_1), (reward_2, self.history.state(1), done_2)
+        observation, reward, done, info = self.env.step(action)
+        self.history.push((observation,))
+        return self.history.state(0), reward, done, info
+
+    def frame(self, side: int = 0) -> torch.Tensor:
+        """
+        :return: 1xFrame newest frame of the side's state, see FrameHistory.frame
+        """
+        return self.history.frame(side)
+
+    def screen(self, side: int = 0) -> torch.Tensor:
+        """
+        :return: 1xFrame last processed observation of the side
+        """
+        return self.history.screen(side)
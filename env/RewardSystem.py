@@ -1,3 +1,5 @@
+from typing import Any, Callable
+
 from env.SpaceGameEnvironmentConfig import SpaceGameEnvironmentConfig
 from space_game.Config import Config
 from space_game.Player import Player
@@ -44,6 +46,9 @@ class RewardSystem(EventProcessor, Registrable):
     def process_event(self, event: Event):
         self.event_resolver[type(event)](event)
 
+    def get_event_handler(self, event_type: Any) -> Callable[[Event], None]:
+        return self.event_resolver[event_type]
+
     def process_damage_dealt_event(self, event: DamageDealtEvent):
         if event.damaged_id == id(self.agent):
             self.current_reward += self.get_value(self.environment_config.taken_damage_reward_start, self.environment_config.taken_damage_reward_end, self.environment_config.taken_damage_reward_decay)
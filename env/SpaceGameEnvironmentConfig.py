@@ -31,6 +31,9 @@ class SpaceGameEnvironmentConfig:
     action_taken_reward: float = 0
     max_steps: float = float("inf")
     step_delay: int = 5
+    macro_step: bool = False
+    pooled_ticks: int = 1
+    observation_mode: str = 'pixels'
     shot_fired_when_on_cooldown_reward: float = 0
     use_simplified_environment_actions: bool = False
     hit_reward_decay: float = 0.
@@ -58,7 +61,10 @@ class SpaceGameEnvironmentConfig:
             target_hit_reward_start=config_dict['reward']['target_hit']['start'],
             target_hit_reward_end=config_dict['reward']['target_hit']['end'],
             target_hit_reward_decay=config_dict['reward']['target_hit']['decay'],
-            use_simplified_environment_actions=config_dict['use_simplified_environment_actions']
+            use_simplified_environment_actions=config_dict['use_simplified_environment_actions'],
+            macro_step=config_dict.get('macro_step', False),
+            pooled_ticks=config_dict.get('pooled_ticks', 1),
+            observation_mode=config_dict.get('observation_mode', 'pixels')
         )
 
     @staticmethod
@@ -1,17 +1,18 @@
-from typing import Union
+from typing import Optional, Union
 
 import gym
-from numpy import uint8
+from numpy import float32, ndarray, uint8
 
-from env.EnvironmentAction import EnvironmentActionToAIActionMapping
-from env.EnvironmentAction import EnvironmentAction
+from env.EnvironmentAction import EnvironmentAction, compile_environment_action_events
+from env.FeatureObservation import FeatureObservation
 from env.RewardSystem import RewardSystem
 from env.SimplifiedEnvironmentAction import SimplifiedEnvironmentAction
 from env.SpaceGameEnvironmentConfig import SpaceGameEnvironmentConfig
-from space_game.ai.AIActionToEventMapping import AIActionToEventMapping
 from space_game.Config import Config
 from space_game.domain_names import Side
+from space_game.EventProfiler import EventProfiler
 from space_game.GameController import GameController
+from space_game.GameSnapshot import GameSnapshot
 from space_game.Player import create_player_1, create_player_2
 
 
@@ -31,7 +32,9 @@ class SpaceGameEnvironment(gym.Env):
         self.EnvironmentAction = SimplifiedEnvironmentAction \
             if self.environment_config.use_simplified_environment_actions else EnvironmentAction
         self.renderable = environment_config.render
-        self.game_controller = GameController(self.game_config, self.renderable)
+        self.game_controller = GameController(
+            self.game_config, self.renderable, macro_step=self.environment_config.macro_step
+        )
         self.steps_left = SpaceGameEnvironmentConfig.max_steps
         self.games = 0
 
@@ -41,6 +44,7 @@ class SpaceGameEnvironment(gym.Env):
             self.game_controller.event_manager
         )
         self.game_controller.__add_player__(self.agent)
+        self.action_events = compile_environment_action_events(id(self.agent))
         self.reward_system = RewardSystem(self.environment_config, self.game_config, self.agent, previously_done_steps)
         self.reward_system.register(self.game_controller.event_manager)
 
@@ -59,15 +63,38 @@ class SpaceGameEnvironment(gym.Env):
         )
 
         self.history = []
+        self.initial_snapshot: Optional[GameSnapshot] = None
+        self.profiler: Optional[EventProfiler] = None
         self.action_space = gym.spaces.Discrete(len(self.EnvironmentAction))
-        self.observation_space = gym.spaces.Box(high=255, low=0, shape=(64, 64, 1), dtype=uint8)
+        if self.environment_config.observation_mode == 'vector':
+            self.features = FeatureObservation(self.game_config)
+            self.observation_space = gym.spaces.Box(high=1, low=-1, shape=(self.features.size,), dtype=float32)
+            # observations are not read from the screen, see GameController.advance
+            self.pooled_ticks = 0
+        elif self.environment_config.observation_mode == 'pixels':
+            self.features = None
+            self.observation_space = gym.spaces.Box(high=255, low=0, shape=(64, 64, 1), dtype=uint8)
+            self.pooled_ticks = self.environment_config.pooled_ticks
+        else:
+            raise ValueError(f"Unknown observation mode {self.environment_config.observation_mode}")
 
     def reset(self, game_index=None):
+        """
+        The first reset builds a fresh game and snapshots it, following resets restore that pristine state
+        """
         self.games += 1
         game_index = game_index if game_index else self.games
-        self.game_controller = GameController(self.game_config, self.renderable)
-
         self.steps_left = self.environment_config.max_steps
+        if self.initial_snapshot is not None:
+            self.game_controller.restore(self.initial_snapshot)
+            self.game_controller.event_manager.profiler = self.profiler
+            self.reward_system.game_index = game_index
+            return self.observe()
+
+        self.game_controller.release()
+        self.game_controller = GameController(
+            self.game_config, self.renderable, macro_step=self.environment_config.macro_step
+        )
 
         # AGENT INITIALIZATION
         self.agent = create_player_1(
@@ -75,6 +102,7 @@ class SpaceGameEnvironment(gym.Env):
             self.game_controller.event_manager
         )
         self.game_controller.__add_player__(self.agent)
+        self.action_events = compile_environment_action_events(id(self.agent))
         self.reward_system = RewardSystem(self.environment_config, self.game_config, self.agent, game_index)
         self.reward_system.register(self.game_controller.event_manager)
 
@@ -92,19 +120,20 @@ class SpaceGameEnvironment(gym.Env):
             self.game_controller.screen
         )
         self.game_controller.__add_player__(self.opponent)
-        self.ai_2.register(self.game_controller.event_manager)
+        self.game_controller.__add_ai_controller__(self.ai_2)
 
-        return self.game_controller.screen.process_map()
+        self.game_controller.event_manager.process_events()
+        self.initial_snapshot = self.game_controller.snapshot()
+        self.game_controller.event_manager.profiler = self.profiler
+        return self.observe()
 
     def step(self, action: Union[EnvironmentAction, SimplifiedEnvironmentAction]):
         if self.renderable:
             self.game_controller.render_screen()
         # AGENT CHOICE HANDLING
-        action_parsed = EnvironmentActionToAIActionMapping[action]
-        for event in AIActionToEventMapping[action_parsed](id(self.agent)):
+        for event in self.action_events[action]:
             self.game_controller.event_manager.add_event(event)
-        for _ in range(self.environment_config.step_delay):
-            self.game_controller.__refresh__()
+        self.game_controller.advance(self.environment_config.step_delay, self.pooled_ticks)
 
         # REWARD CALCULATION
         self.steps_left -= 1
@@ -114,7 +143,7 @@ class SpaceGameEnvironment(gym.Env):
             done = True
 
         info = {"agent_hp": self.agent.hitpoints, "opponent_hp": self.opponent.hitpoints}
-        return self.game_controller.screen.process_map(), reward, done, info
+        return self.observe(), reward, done, info
 
     def render(self, mode='human'):
         pass
@@ -122,5 +151,20 @@ class SpaceGameEnvironment(gym.Env):
     def get_n_actions(self):
         return len(self.EnvironmentAction)
 
-    def sample_observation_space(self):
+    def enable_profiling(self, profiler: Optional[EventProfiler]) -> None:
+        """
+        Instruments event processing of the current and every following game, None disables profiling
+        """
+        self.profiler = profiler
+        self.game_controller.event_manager.profiler = profiler
+
+    def observe(self) -> ndarray:
+        """
+        :return: Screen observation, or feature vector of the agent's view with observation_mode vector
+        """
+        if self.features is not None:
+            return self.features.encode(self.game_controller, self.agent, self.opponent)
         return self.game_controller.screen.process_map()
+
+    def sample_observation_space(self):
+        return self.observe()
@@ -1,16 +1,18 @@
 import numpy as np
 import pygame
 
-from typing import Tuple, Union
+from typing import Optional, Tuple, Union
 
-from env.EnvironmentAction import EnvironmentActionToAIActionMapping, EnvironmentAction
+from env.EnvironmentAction import EnvironmentAction, compile_environment_action_events
+from env.FeatureObservation import FeatureObservation
 from env.RewardSystem import RewardSystem
 from env.SimplifiedEnvironmentAction import SimplifiedEnvironmentAction
 from env.SpaceGameEnvironmentConfig import SpaceGameEnvironmentConfig
+from space_game.EventProfiler import EventProfiler
 from space_game.GameController import GameController
+from space_game.GameSnapshot import GameSnapshot
 from space_game.Config import Config
 from space_game.Player import create_player_1, create_player_2
-from space_game.ai.AIActionToEventMapping import AIActionToEventMapping
 
 Reward = float
 Observation = np.ndarray
@@ -66,7 +68,11 @@ class SpaceGameSelfPlayEnvironment:
             if self.environment_config.use_simplified_environment_actions else EnvironmentAction
         self.running = True
         self.clock = pygame.time.Clock()
-        self.game_controller = GameController(self.space_game_config, renderable=self.environment_config.render)
+        self.game_controller = GameController(
+            self.space_game_config,
+            renderable=self.environment_config.render,
+            macro_step=self.environment_config.macro_step
+        )
         self.steps_left = SpaceGameEnvironmentConfig.max_steps
 
         # UP SIDE INITIALIZATION
@@ -75,6 +81,7 @@ class SpaceGameSelfPlayEnvironment:
             self.game_controller.event_manager
         )
         self.game_controller.__add_player__(self.agent_1)
+        self.action_events_1 = compile_environment_action_events(id(self.agent_1))
         self.reward_system_1 = RewardSystem(self.environment_config, self.space_game_config, self.agent_1)
         self.reward_system_1.register(self.game_controller.event_manager)
 
@@ -84,21 +91,47 @@ class SpaceGameSelfPlayEnvironment:
             self.game_controller.event_manager
         )
         self.game_controller.__add_player__(self.agent_2)
+        self.action_events_2 = compile_environment_action_events(
+            id(self.agent_2), SpaceGameSelfPlayEnvironment.inverse_movement
+        )
         self.reward_system_2 = RewardSystem(self.environment_config, self.space_game_config, self.agent_2)
         self.reward_system_2.register(self.game_controller.event_manager)
 
         self.history = []
+        self.initial_snapshot: Optional[GameSnapshot] = None
+        self.profiler: Optional[EventProfiler] = None
+        if self.environment_config.observation_mode == 'vector':
+            self.features = FeatureObservation(self.space_game_config)
+            # observations are not read from the screen, see GameController.advance
+            self.pooled_ticks = 0
+        elif self.environment_config.observation_mode == 'pixels':
+            self.features = None
+            self.pooled_ticks = self.environment_config.pooled_ticks
+        else:
+            raise ValueError(f"Unknown observation mode {self.environment_config.observation_mode}")
 
     def reset(self, game_index=0) -> Tuple[Observation, Observation]:
         """
-        Reload game internals
+        Reload game internals. The first reset builds a fresh game and snapshots it,
+        following resets restore that pristine state
         :return: Map of newly created game
         """
 
         self.running = True
         self.clock = pygame.time.Clock()
-        self.game_controller = GameController(self.space_game_config, renderable=self.environment_config.render)
         self.steps_left = SpaceGameEnvironmentConfig.max_steps
+        if self.initial_snapshot is not None:
+            self.game_controller.restore(self.initial_snapshot)
+            self.game_controller.event_manager.profiler = self.profiler
+            self.reward_system_1.game_index = game_index
+            return self.observe()
+
+        self.game_controller.release()
+        self.game_controller = GameController(
+            self.space_game_config,
+            renderable=self.environment_config.render,
+            macro_step=self.environment_config.macro_step
+        )
 
         # UP SIDE INITIALIZATION
         self.agent_1 = create_player_1(
@@ -106,6 +139,7 @@ class SpaceGameSelfPlayEnvironment:
             self.game_controller.event_manager
         )
         self.game_controller.__add_player__(self.agent_1)
+        self.action_events_1 = compile_environment_action_events(id(self.agent_1))
         self.reward_system_1 = RewardSystem(self.environment_config, self.space_game_config, self.agent_1, game_index)
         self.reward_system_1.register(self.game_controller.event_manager)
 
@@ -115,12 +149,16 @@ class SpaceGameSelfPlayEnvironment:
             self.game_controller.event_manager
         )
         self.game_controller.__add_player__(self.agent_2)
+        self.action_events_2 = compile_environment_action_events(
+            id(self.agent_2), SpaceGameSelfPlayEnvironment.inverse_movement
+        )
         self.reward_system_2 = RewardSystem(self.environment_config, self.space_game_config, self.agent_2)
         self.reward_system_2.register(self.game_controller.event_manager)
 
-        current_observation = self.game_controller.screen.process_map()
-
-        return current_observation, SpaceGameSelfPlayEnvironment.convert_observation(current_observation)
+        self.game_controller.event_manager.process_events()
+        self.initial_snapshot = self.game_controller.snapshot()
+        self.game_controller.event_manager.profiler = self.profiler
+        return self.observe()
 
     def step(self, actions: Tuple[Action, Action]) -> Tuple[PlayerReturnTuple, PlayerReturnTuple]:
         """
@@ -134,17 +172,14 @@ class SpaceGameSelfPlayEnvironment:
             self.game_controller.render_screen()
 
         # UP SIDE CHOICE HANDLING
-        action_parsed = EnvironmentActionToAIActionMapping[actions[0]]
-        for event in AIActionToEventMapping[action_parsed](id(self.agent_1)):
+        for event in self.action_events_1[actions[0]]:
             self.game_controller.event_manager.add_event(event)
 
         # DOWN SIDE CHOICE HANDLING
-        action_parsed = EnvironmentActionToAIActionMapping[SpaceGameSelfPlayEnvironment.inverse_movement(actions[1])]
-        for event in AIActionToEventMapping[action_parsed](id(self.agent_2)):
+        for event in self.action_events_2[actions[1]]:
             self.game_controller.event_manager.add_event(event)
 
-        for _ in range(self.environment_config.step_delay):
-            self.game_controller.__refresh__()
+        self.game_controller.advance(self.environment_config.step_delay, self.pooled_ticks)
 
         self.steps_left -= 1
 
@@ -160,12 +195,32 @@ class SpaceGameSelfPlayEnvironment:
         if self.steps_left == 0:
             done_2 = True
 
-        observation = self.game_controller.screen.process_map()
-        return (reward_1, observation, done_1), \
-               (reward_2, SpaceGameSelfPlayEnvironment.convert_observation(observation), done_2)
+        observation_1, observation_2 = self.observe()
+        return (reward_1, observation_1, done_1), \
+               (reward_2, observation_2, done_2)
+
+    def enable_profiling(self, profiler: Optional[EventProfiler]) -> None:
+        """
+        Instruments event processing of the current and every following game, None disables profiling
+        """
+        self.profiler = profiler
+        self.game_controller.event_manager.profiler = profiler
+
+    def observe(self) -> Tuple[Observation, Observation]:
+        """
+        :return: Observations of the UP and DOWN sides, the DOWN one mirrored: screen observations,
+        or feature vectors with observation_mode vector
+        """
+        if self.features is not None:
+            return (
+                self.features.encode(self.game_controller, self.agent_1, self.agent_2),
+                self.features.encode(self.game_controller, self.agent_2, self.agent_1, mirrored=True)
+            )
+        screen = self.game_controller.screen
+        return screen.process_map(), screen.process_flipped_map()
 
     def sample_observation_space(self):
-        return self.game_controller.screen.process_map()
+        return self.observe()[0]
 
     def get_current_rewards(self):
         return self.reward_system_1.get_current_rewards()
@@ -0,0 +1,275 @@
+import multiprocessing as mp
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+
+from env.SpaceGameEnvironmentConfig import SpaceGameEnvironmentConfig
+from env.SpaceGameGymAPIEnvironment import SpaceGameEnvironment
+from env.VectorSpaceGameEnvironment import Indices
+from space_game.Config import Config
+
+
+def worker(
+        remote: Connection,
+        parent_remote: Connection,
+        shared_memory_name: str,
+        n_envs_total: int,
+        env_indices: Sequence[int],
+        environment_config: SpaceGameEnvironmentConfig,
+        game_config: Config
+) -> None:
+    """
+    Owns a shard of games. Observations are written straight into the shared buffer,
+    only rewards, dones and infos are sent back through the pipe.
+    """
+    parent_remote.close()
+    shared_memory = SharedMemory(name=shared_memory_name)
+    envs = [SpaceGameEnvironment(environment_config, game_config) for _ in env_indices]
+    observation_space = envs[0].observation_space
+    observations = np.ndarray(
+        (n_envs_total,) + observation_space.shape, dtype=observation_space.dtype, buffer=shared_memory.buf
+    )
+    resets = [0] * len(envs)
+
+    def reset(local_index: int) -> np.ndarray:
+        resets[local_index] += 1
+        return envs[local_index].reset(resets[local_index] * n_envs_total + env_indices[local_index])
+
+    try:
+        while True:
+            command, data = remote.recv()
+            start = perf_counter()
+            if command == "step":
+                rewards = np.zeros(len(envs), dtype=np.float32)
+                dones = np.zeros(len(envs), dtype=bool)
+                infos = []
+                for local_index, env in enumerate(envs):
+                    observation, reward, done, info = env.step(int(data[local_index]))
+                    if done:
+                        info["terminal_observation"] = observation
+                        observation = reset(local_index)
+                    observations[env_indices[local_index]] = observation
+                    rewards[local_index] = reward
+                    dones[local_index] = done
+                    infos.append(info)
+                remote.send((rewards, dones, infos, perf_counter() - start))
+            elif command == "reset":
+                for local_index in range(len(envs)):
+                    observations[env_indices[local_index]] = reset(local_index)
+                remote.send(perf_counter() - start)
+            elif command == "get_attr":
+                remote.send([getattr(envs[local_index], data[0]) for local_index in data[1]])
+            elif command == "set_attr":
+                for local_index in data[2]:
+                    setattr(envs[local_index], data[0], data[1])
+                remote.send(None)
+            elif command == "env_method":
+                method_name, args, kwargs, local_indices = data
+                remote.send([getattr(envs[local_index], method_name)(*args, **kwargs) for local_index in local_indices])
+            elif command == "close":
+                break
+            else:
+                raise NotImplementedError(f"Unknown command {command}")
+    except (KeyboardInterrupt, EOFError, BrokenPipeError):
+        pass
+    finally:
+        for env in envs:
+            env.close()
+        del observations
+        shared_memory.close()
+        remote.close()
+
+
+class SubprocessVectorSpaceGameEnvironment(VecEnv):
+    """
+    Pool of worker processes, each owning a contiguous shard of the games.
+    Observations of all games live in one multiprocessing.shared_memory block of shape (N,)+observation shape.
+    In asynchronous mode step_async returns immediately and results are collected by step_wait,
+    in synchronous mode workers are waited for already in step_async.
+    A worker which dies is restarted with freshly reset games, reported as done with info['worker_restarted'].
+    """
+    def __init__(
+            self,
+            n_envs: int,
+            n_workers: int,
+            environment_config: SpaceGameEnvironmentConfig = None,
+            game_config: Config = None,
+            asynchronous: bool = True,
+            start_method: str = None
+    ):
+        self.environment_config = environment_config if environment_config is not None \
+            else SpaceGameEnvironmentConfig.default()
+        self.game_config = game_config if game_config is not None else Config.default()
+        self.asynchronous = asynchronous
+        self.context = mp.get_context(start_method if start_method is not None else "forkserver")
+        probe_env = SpaceGameEnvironment(self.environment_config, self.game_config)
+        super().__init__(n_envs, probe_env.observation_space, probe_env.action_space)
+        self.n_actions = probe_env.get_n_actions()
+        probe_env.close()
+        self.single_observation_space = self.observation_space
+        self.single_action_space = self.action_space
+
+        observation_shape = (n_envs,) + self.observation_space.shape
+        self.shared_memory = SharedMemory(
+            create=True, size=int(np.prod(observation_shape)) * self.observation_space.dtype.itemsize
+        )
+        self.observations = np.ndarray(
+            observation_shape, dtype=self.observation_space.dtype, buffer=self.shared_memory.buf
+        )
+        self.shards: List[np.ndarray] = [shard for shard in np.array_split(np.arange(n_envs), n_workers) if len(shard)]
+        # worker index and local index of every game, shards being contiguous
+        self.env_locations: List[Tuple[int, int]] = [
+            (worker_index, local_index)
+            for worker_index, shard in enumerate(self.shards) for local_index in range(len(shard))
+        ]
+        self.remotes: List[Optional[Connection]] = [None] * len(self.shards)
+        self.processes: List[Optional[mp.Process]] = [None] * len(self.shards)
+        for worker_index in range(len(self.shards)):
+            self.start_worker(worker_index)
+
+        self.waiting = False
+        self.results: Optional[Tuple[np.ndarray, np.ndarray, List[dict]]] = None
+        self.worker_times: List[float] = [0.] * len(self.shards)
+        self.closed = False
+
+    def start_worker(self, worker_index: int) -> None:
+        remote, worker_remote = self.context.Pipe()
+        process = self.context.Process(
+            target=worker,
+            args=(
+                worker_remote, remote, self.shared_memory.name, self.num_envs, list(self.shards[worker_index]),
+                self.environment_config, self.game_config
+            ),
+            daemon=True
+        )
+        process.start()
+        worker_remote.close()
+        self.remotes[worker_index] = remote
+        self.processes[worker_index] = process
+
+    def restart_worker(self, worker_index: int) -> None:
+        process = self.processes[worker_index]
+        if process.is_alive():
+            process.terminate()
+        process.join()
+        self.remotes[worker_index].close()
+        self.start_worker(worker_index)
+        self.remotes[worker_index].send(("reset", None))
+        self.worker_times[worker_index] = self.remotes[worker_index].recv()
+
+    def reset(self) -> np.ndarray:
+        for remote in self.remotes:
+            remote.send(("reset", None))
+        for worker_index, remote in enumerate(self.remotes):
+            self.worker_times[worker_index] = remote.recv()
+        return self.observations.copy()
+
+    def step_async(self, actions: np.ndarray) -> None:
+        for worker_index, shard in enumerate(self.shards):
+            try:
+                self.remotes[worker_index].send(("step", np.asarray(actions)[shard]))
+            except (BrokenPipeError, EOFError, ConnectionResetError):
+                pass
+        self.waiting = True
+        if not self.asynchronous:
+            self.results = self.collect_results()
+
+    def collect_results(self) -> Tuple[np.ndarray, np.ndarray, List[dict]]:
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        infos: List[dict] = [{} for _ in range(self.num_envs)]
+        for worker_index, shard in enumerate(self.shards):
+            try:
+                shard_rewards, shard_dones, shard_infos, self.worker_times[worker_index] = \
+                    self.remotes[worker_index].recv()
+            except (BrokenPipeError, EOFError, ConnectionResetError):
+                self.restart_worker(worker_index)
+                shard_rewards = np.zeros(len(shard), dtype=np.float32)
+                shard_dones = np.ones(len(shard), dtype=bool)
+                shard_infos = [{"worker_restarted": True} for _ in shard]
+            rewards[shard] = shard_rewards
+            dones[shard] = shard_dones
+            for env_index, info in zip(shard, shard_infos):
+                infos[env_index] = info
+        self.waiting = False
+        return rewards, dones, infos
+
+    def step_wait(self):
+        rewards, dones, infos = self.results if self.results is not None else self.collect_results()
+        self.results = None
+        return self.observations.copy(), rewards, dones, infos
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        if self.waiting:
+            self.collect_results()
+        for remote in self.remotes:
+            try:
+                remote.send(("close", None))
+            except (BrokenPipeError, EOFError, ConnectionResetError):
+                pass
+        for process in self.processes:
+            process.join()
+        del self.observations
+        self.shared_memory.close()
+        self.shared_memory.unlink()
+        self.closed = True
+
+    def get_target_shards(self, indices: Indices) -> Tuple[Dict[int, List[int]], List[Tuple[int, int]]]:
+        """
+        :return: Local indices of the targeted games of every involved worker, and for every requested index,
+        in request order and duplicates included, the worker and the position of the game's reply among its replies
+        """
+        if indices is None:
+            indices = range(self.num_envs)
+        elif isinstance(indices, int):
+            indices = [indices]
+        targets: Dict[int, List[int]] = {}
+        order: List[Tuple[int, int]] = []
+        for env_index in indices:
+            worker_index, local_index = self.env_locations[env_index]
+            local_indices = targets.setdefault(worker_index, [])
+            order.append((worker_index, len(local_indices)))
+            local_indices.append(local_index)
+        return targets, order
+
+    def gather_replies(self, targets: Dict[int, List[int]], order: List[Tuple[int, int]]) -> List[Any]:
+        """
+        :return: Replies of the workers to requests sent for targets, in the order of the requested indices
+        """
+        replies = {worker_index: self.remotes[worker_index].recv() for worker_index in targets}
+        return [replies[worker_index][position] for worker_index, position in order]
+
+    def get_attr(self, attr_name: str, indices: Indices = None) -> List[Any]:
+        targets, order = self.get_target_shards(indices)
+        for worker_index, local_indices in targets.items():
+            self.remotes[worker_index].send(("get_attr", (attr_name, local_indices)))
+        return self.gather_replies(targets, order)
+
+    def set_attr(self, attr_name: str, value: Any, indices: Indices = None) -> None:
+        targets, _ = self.get_target_shards(indices)
+        for worker_index, local_indices in targets.items():
+            self.remotes[worker_index].send(("set_attr", (attr_name, value, local_indices)))
+        for worker_index in targets:
+            self.remotes[worker_index].recv()
+
+    def env_method(self, method_name: str, *method_args, indices: Indices = None, **method_kwargs) -> List[Any]:
+        targets, order = self.get_target_shards(indices)
+        for worker_index, local_indices in targets.items():
+            self.remotes[worker_index].send(("env_method", (method_name, method_args, method_kwargs, local_indices)))
+        return self.gather_replies(targets, order)
+
+    def env_is_wrapped(self, wrapper_class: type, indices: Indices = None) -> List[bool]:
+        _, order = self.get_target_shards(indices)
+        return [issubclass(SpaceGameEnvironment, wrapper_class)] * len(order)
+
+    def seed(self, seed: Optional[int] = None) -> List[None]:
+        return [None for _ in range(self.num_envs)]
+
+    def get_n_actions(self) -> int:
+        return self.n_actions
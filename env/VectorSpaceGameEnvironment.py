@@ -0,0 +1,114 @@
+from typing import Any, Callable, List, Optional, Sequence, Union
+
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+
+from env.SpaceGameEnvironmentConfig import SpaceGameEnvironmentConfig
+from env.SpaceGameGymAPIEnvironment import SpaceGameEnvironment
+from space_game.Config import Config
+from space_game.EventProfiler import EventProfiler
+
+Indices = Union[None, int, Sequence[int]]
+
+
+class VectorSpaceGameEnvironment(VecEnv):
+    """
+    N independent SpaceGameEnvironments stepped in lockstep.
+    Observations, rewards and dones are written into preallocated batched buffers and finished games are reset
+    automatically; the last observation of a finished game is available in its info under 'terminal_observation'.
+    Implements stable-baselines3 VecEnv and exposes single_observation_space/single_action_space like gym.vector.
+    Only the interface is batched: every game keeps its own GameController and entity store and is stepped
+    one after another, so a step costs about as much as stepping the games separately.
+    """
+    def __init__(
+            self,
+            n_envs: int,
+            environment_config: SpaceGameEnvironmentConfig = None,
+            game_config: Config = None,
+            env_factory: Callable[[], SpaceGameEnvironment] = None
+    ):
+        if env_factory is None:
+            environment_config = environment_config if environment_config is not None \
+                else SpaceGameEnvironmentConfig.default()
+            game_config = game_config if game_config is not None else Config.default()
+
+            def env_factory():
+                return SpaceGameEnvironment(environment_config, game_config)
+        self.envs: List[SpaceGameEnvironment] = [env_factory() for _ in range(n_envs)]
+        single_env = self.envs[0]
+        super().__init__(n_envs, single_env.observation_space, single_env.action_space)
+        self.single_observation_space = single_env.observation_space
+        self.single_action_space = single_env.action_space
+        self.observations = np.zeros(
+            (n_envs,) + self.single_observation_space.shape, dtype=self.single_observation_space.dtype
+        )
+        self.rewards = np.zeros(n_envs, dtype=np.float32)
+        self.dones = np.zeros(n_envs, dtype=bool)
+        self.infos: List[dict] = [{} for _ in range(n_envs)]
+        self.actions: Optional[np.ndarray] = None
+        self.games = 0
+
+    def reset_env(self, index: int) -> np.ndarray:
+        self.games += 1
+        return self.envs[index].reset(self.games)
+
+    def reset(self) -> np.ndarray:
+        for index in range(self.num_envs):
+            self.observations[index] = self.reset_env(index)
+        return self.observations.copy()
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self.actions = actions
+
+    def step_wait(self):
+        for index, env in enumerate(self.envs):
+            observation, reward, done, info = env.step(int(self.actions[index]))
+            if done:
+                info["terminal_observation"] = observation
+                observation = self.reset_env(index)
+            self.observations[index] = observation
+            self.rewards[index] = reward
+            self.dones[index] = done
+            self.infos[index] = info
+        return self.observations.copy(), self.rewards.copy(), self.dones.copy(), list(self.infos)
+
+    def close(self) -> None:
+        for env in self.envs:
+            env.close()
+
+    def get_target_envs(self, indices: Indices) -> List[SpaceGameEnvironment]:
+        if indices is None:
+            indices = range(self.num_envs)
+        elif isinstance(indices, int):
+            indices = [indices]
+        return [self.envs[index] for index in indices]
+
+    def get_attr(self, attr_name: str, indices: Indices = None) -> List[Any]:
+        return [getattr(env, attr_name) for env in self.get_target_envs(indices)]
+
+    def set_attr(self, attr_name: str, value: Any, indices: Indices = None) -> None:
+        for env in self.get_target_envs(indices):
+            setattr(env, attr_name, value)
+
+    def env_method(self, method_name: str, *method_args, indices: Indices = None, **method_kwargs) -> List[Any]:
+        return [getattr(env, method_name)(*method_args, **method_kwargs) for env in self.get_target_envs(indices)]
+
+    def env_is_wrapped(self, wrapper_class: type, indices: Indices = None) -> List[bool]:
+        return [isinstance(env, wrapper_class) for env in self.get_target_envs(indices)]
+
+    def seed(self, seed: Optional[int] = None) -> List[None]:
+        return [None for _ in self.envs]
+
+    def get_images(self) -> Sequence[np.ndarray]:
+        return [env.game_controller.screen.process_map() for env in self.envs]
+
+    def enable_profiling(self, profiler: Optional[EventProfiler]) -> None:
+        """
+        Instruments event processing of every game with the same profiler, None disables profiling
+        """
+        for env in self.envs:
+            env.enable_profiling(profiler)
+
+    def get_n_actions(self) -> int:
+        return self.envs[0].get_n_actions()
+
@@ -0,0 +1,3 @@
+from collections import namedtuple
+
+Batch = namedtuple('Batch', ('state', 'action', 'next_state', 'reward', 'non_final', 'slot', 'weight'))
@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+from typing import Tuple
+
+import torch
+
+
+@dataclass
+class BatchBuffers:
+    """
+    Preallocated cpu tensors a batch is sampled into, pinned when batches are copied to cuda
+    """
+    frames: torch.Tensor  # frames of states and next states, which share all but one of them
+    action: torch.Tensor
+    reward: torch.Tensor
+    non_final: torch.Tensor
+    weight: torch.Tensor
+
+    def __len__(self):
+        return len(self.action)
+
+    @staticmethod
+    def allocate(
+            batch_size: int, history_length: int, frame_shape: Tuple[int, ...], pin_memory: bool,
+            dtype: torch.dtype = torch.uint8
+    ):
+        return BatchBuffers(
+            frames=torch.empty(
+                (batch_size, history_length + 1) + tuple(frame_shape), dtype=dtype, pin_memory=pin_memory
+            ),
+            action=torch.empty(batch_size, dtype=torch.long, pin_memory=pin_memory),
+            reward=torch.empty(batch_size, dtype=torch.float32, pin_memory=pin_memory),
+            non_final=torch.empty(batch_size, dtype=torch.bool, pin_memory=pin_memory),
+            weight=torch.empty(batch_size, dtype=torch.float32, pin_memory=pin_memory)
+        )
@@ -0,0 +1,100 @@
+from queue import Queue
+from threading import Thread
+from time import perf_counter
+from typing import Any, Optional
+
+from models.DQN.Batch import Batch
+from models.DQN.ReplayMemory import ReplayMemory
+
+
+class BatchPrefetcher:
+    """
+    Source of the batches optimize_model trains on. With depth > 0 a background thread samples the next batches
+    of memory into a ring of depth + 1 preallocated buffers, while the training loop steps the environment and
+    optimizes on the current batch. A batch is sampled at most depth batches before it is used, so it misses
+    at most the transitions pushed during the last depth optimization steps.
+    With depth 0 batches are sampled on demand by the calling thread.
+    Time spent sampling and time the caller waited for a batch are accumulated until flushed,
+    so the overlap can be verified: with depth > 0 waiting takes only a fraction of sampling.
+    """
+
+    def __init__(self, memory: ReplayMemory, batch_size: int, depth: int = 0):
+        self.memory = memory
+        self.batch_size = batch_size
+        self.depth = depth
+        self.buffers = [memory.allocate_buffers(batch_size) for _ in range(depth + 1)]
+        self.free_buffers: Queue = Queue()
+        self.ready_batches: Queue = Queue()
+        self.used_buffer: Optional[int] = None
+        self.thread: Optional[Thread] = None
+        self.batches = 0
+        self.sample_seconds = 0.
+        self.wait_seconds = 0.
+
+    def is_ready(self) -> bool:
+        return len(self.memory) >= self.batch_size
+
+    def start(self) -> None:
+        self.free_buffers = Queue()
+        self.ready_batches = Queue()
+        self.used_buffer = None
+        for index in range(self.depth + 1):
+            self.free_buffers.put(index)
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self) -> None:
+        while True:
+            index = self.free_buffers.get()
+            if index is None:
+                return
+            start = perf_counter()
+            try:
+                slots = self.memory.fill(self.buffers[index])
+            except Exception as exception:
+                # raised by get instead of leaving it waiting
+                self.ready_batches.put((index, exception))
+                return
+            self.sample_seconds += perf_counter() - start
+            self.ready_batches.put((index, slots))
+
+    def get(self) -> Batch:
+        """
+        :return: Next batch, valid until the following call
+        """
+        start = perf_counter()
+        if self.depth == 0:
+            batch = self.memory.make_batch(self.buffers[0], self.memory.fill(self.buffers[0]))
+            self.sample_seconds += perf_counter() - start
+        else:
+            if self.thread is None:
+                self.start()
+            if self.used_buffer is not None:
+                self.free_buffers.put(self.used_buffer)
+            self.used_buffer, slots = self.ready_batches.get()
+            if isinstance(slots, Exception):
+                self.thread = None
+                raise slots
+            batch = self.memory.make_batch(self.buffers[self.used_buffer], slots)
+        self.wait_seconds += perf_counter() - start
+        self.batches += 1
+        return batch
+
+    def close(self) -> None:
+        if self.thread is not None:
+            self.free_buffers.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def flush(self, writer: Any, step: int) -> None:
+        """
+        Write per batch averages of the collected timings and start collecting anew
+        :param writer: TensorBoard SummaryWriter
+        """
+        if self.batches == 0:
+            return
+        writer.add_scalar("Replay/sample ms per batch", self.sample_seconds / self.batches * 1e3, step)
+        writer.add_scalar("Replay/wait ms per batch", self.wait_seconds / self.batches * 1e3, step)
+        self.batches = 0
+        self.sample_seconds = 0.
+        self.wait_seconds = 0.
@@ -1,24 +1,168 @@
-import random
-from typing import List
+from threading import RLock
+from typing import Dict, Optional, Tuple
 
-from models.DQN.Transition import Transition
+import numpy as np
+import torch
+
+from models.DQN.Batch import Batch
+from models.DQN.BatchBuffers import BatchBuffers
+from models.DQN.domain_types import State
 
 
 class ReplayMemory:
+    """
+    Ring buffer of frames, uint8 screens or float32 feature vectors, every frame of a game is stored once.
+    Each slot holds a frame together with a link to the slot of the previous frame of the same game,
+    so states are stacks of history_length linked frames rebuilt at sample time and the games of several
+    streams (sides of self-play, environments of a vector environment) can be pushed interleaved.
+    A slot pushed with an action is a transition from the state ending at the previous frame to the state ending
+    at its own frame, or to a terminal state when pushed without a frame.
+    Pushing and sampling are guarded by a lock, so batches can be sampled on another thread, see BatchPrefetcher.
+    """
 
-    def __init__(self, capacity: int):
+    def __init__(
+            self, capacity: int, frame_shape: Tuple[int, ...], history_length: int = 3, batch_size: int = 128,
+            device: torch.device = torch.device("cpu"), frame_dtype: np.dtype = np.uint8
+    ):
         self.capacity = capacity
-        self.memory: List[Transition] = []
-        self.position = 0
+        self.history_length = history_length
+        self.device = device
+        self.frames = np.zeros((capacity,) + tuple(frame_shape), dtype=frame_dtype)
+        self.numbers = np.full(capacity, -1, dtype=np.int64)
+        self.previous = np.full(capacity, -1, dtype=np.int64)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.non_final = np.zeros(capacity, dtype=bool)
+        self.is_transition = np.zeros(capacity, dtype=bool)
+        self.written = 0
+        self.n_transitions = 0
+        # absolute number of the last slot of every stream's ongoing game
+        self.stream_heads: Dict[int, int] = {}
+        self.lock = RLock()
+        self.buffers = self.allocate_buffers(batch_size)
+
+    def allocate_buffers(self, batch_size: int) -> BatchBuffers:
+        return BatchBuffers.allocate(
+            batch_size, self.history_length, self.frames.shape[1:], pin_memory=self.device.type == "cuda",
+            dtype=torch.from_numpy(self.frames[:0]).dtype
+        )
+
+    def write(
+            self, frame: Optional[torch.Tensor], previous: int, action: int = 0, reward: float = 0.,
+            is_transition: bool = False
+    ) -> int:
+        """
+        :return: Absolute number of the written slot
+        """
+        slot = self.written % self.capacity
+        self.n_transitions += int(is_transition) - int(self.is_transition[slot])
+        if frame is not None:
+            self.frames[slot] = frame.cpu().numpy().reshape(self.frames.shape[1:])
+        self.numbers[slot] = self.written
+        self.previous[slot] = previous
+        self.actions[slot] = action
+        self.rewards[slot] = reward
+        self.non_final[slot] = frame is not None
+        self.is_transition[slot] = is_transition
+        self.written += 1
+        return self.written - 1
 
-    def push(self, *args):
-        if len(self.memory) < self.capacity:
-            self.memory.append(None)
-        self.memory[self.position] = Transition(*args)
-        self.position = (self.position + 1) % self.capacity
+    def start_episode(self, state: State, stream: int = 0) -> None:
+        """
+        Store frames of the initial state of a new game of the stream
+        :param state: 1xHxFrame state of H = history_length frames
+        """
+        previous = -1
+        with self.lock:
+            for frame in state.reshape((self.history_length,) + self.frames.shape[1:]):
+                previous = self.write(frame, previous)
+        self.stream_heads[stream] = previous
+
+    def push(self, action: int, reward: float, next_frame: Optional[torch.Tensor], stream: int = 0) -> None:
+        """
+        Store transition of the stream's game, whose next state ends with next_frame
+        :param next_frame: None when the game ended
+        """
+        with self.lock:
+            number = self.write(next_frame, self.stream_heads[stream], action, reward, is_transition=True)
+        if next_frame is None:
+            del self.stream_heads[stream]
+        else:
+            self.stream_heads[stream] = number
 
     def __len__(self):
-        return len(self.memory)
+        return self.n_transitions
+
+    def trace_frames(self, slots: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :return: Absolute numbers of the history_length + 1 frames of every slot's transition, oldest first
+        (the last one is the slot itself), and which slots can be sampled: the slot holds a transition whose
+        frames were not overwritten yet
+        """
+        oldest = self.written - self.capacity
+        numbers = np.empty((len(slots), self.history_length + 1), dtype=np.int64)
+        numbers[:, -1] = self.numbers[slots]
+        valid = self.is_transition[slots]
+        for column in range(self.history_length - 1, -1, -1):
+            links = self.previous[numbers[:, column + 1] % self.capacity]
+            valid &= links >= oldest
+            numbers[:, column] = np.where(valid, links, numbers[:, -1])
+        return numbers, valid
+
+    def draw_slots(self, n: int) -> np.ndarray:
+        return np.random.randint(min(self.written, self.capacity), size=n)
+
+    def sample_frame_numbers(self, batch_size: int) -> np.ndarray:
+        """
+        Sample transitions with draw_slots, slots that cannot be sampled are drawn again
+        :return: Frame numbers of the sampled transitions, see trace_frames
+        """
+        sampled = [np.empty((0, self.history_length + 1), dtype=np.int64)]
+        missing = batch_size
+        while missing > 0:
+            numbers, valid = self.trace_frames(self.draw_slots(missing))
+            sampled.append(numbers[valid])
+            missing -= int(valid.sum())
+        return np.concatenate(sampled)
+
+    def fill(self, buffers: BatchBuffers) -> np.ndarray:
+        """
+        Uniformly sample len(buffers) transitions into buffers
+        :return: Slots of the sampled transitions
+        """
+        with self.lock:
+            frame_slots = self.sample_frame_numbers(len(buffers)) % self.capacity
+            slots = frame_slots[:, -1]
+            # indices are in range, with mode='clip' np.take writes to out without an intermediate buffer
+            np.take(self.frames, frame_slots, axis=0, out=buffers.frames.numpy(), mode='clip')
+            np.take(self.actions, slots, out=buffers.action.numpy(), mode='clip')
+            np.take(self.rewards, slots, out=buffers.reward.numpy(), mode='clip')
+            np.take(self.non_final, slots, out=buffers.non_final.numpy(), mode='clip')
+        return slots
+
+    def make_batch(self, buffers: BatchBuffers, slots: np.ndarray) -> Batch:
+        """
+        :return: Batch of filled buffers, on memory's device. Importance sampling weights are None,
+        all transitions being equally likely.
+        """
+        frames = buffers.frames.to(self.device)
+        return Batch(
+            state=frames[:, :-1],
+            action=buffers.action.to(self.device).unsqueeze(1),
+            next_state=frames[:, 1:],
+            reward=buffers.reward.to(self.device),
+            non_final=buffers.non_final.to(self.device),
+            slot=slots,
+            weight=None
+        )
 
-    def sample(self, batch_size):
-        return random.sample(self.memory, batch_size)
+    def sample(self, batch_size: int) -> Batch:
+        """
+        :return: Batch of states and next states (views of a single tensor of frames), actions of shape
+        (batch_size, 1), rewards, mask of transitions with non terminal next state and slots of the transitions.
+        Next states of terminal transitions hold arbitrary frames.
+        On cpu, the tensors are preallocated buffers overwritten by the next call.
+        """
+        if batch_size != len(self.buffers):
+            self.buffers = self.allocate_buffers(batch_size)
+        return self.make_batch(self.buffers, self.fill(self.buffers))
@@ -0,0 +1,70 @@
+from typing import Sequence
+
+import torch
+from torch import nn as nn
+from torch.nn import functional as F
+
+from models.DQN.DQN import DQN
+
+
+class StackedDQN(nn.Module):
+    """
+    Several DQN networks of the same shape evaluated as a single module. Convolutions are grouped per network and
+    batch normalization works per channel, so every network sees only its own input and keeps its own statistics,
+    while a single forward and backward pass serves all of them.
+    Input holds the states of the networks concatenated along channels, output the action values per network.
+    """
+    LAYERS = ('conv1', 'bn1', 'conv2', 'bn2', 'conv3', 'bn3', 'head')
+
+    def __init__(self, networks: Sequence[DQN]):
+        super(StackedDQN, self).__init__()
+        network = networks[0]
+        self.n_networks = n = len(networks)
+        self.conv1 = self.stack_conv(network.conv1, n)
+        self.bn1 = nn.BatchNorm2d(network.bn1.num_features * n)
+        self.conv2 = self.stack_conv(network.conv2, n)
+        self.bn2 = nn.BatchNorm2d(network.bn2.num_features * n)
+        self.conv3 = self.stack_conv(network.conv3, n)
+        self.bn3 = nn.BatchNorm2d(network.bn3.num_features * n)
+        # linear head of every network as a grouped 1x1 convolution over the flattened features
+        self.head = nn.Conv1d(network.head.in_features * n, network.head.out_features * n, kernel_size=1, groups=n)
+        self.load_networks(networks)
+
+    @staticmethod
+    def stack_conv(conv: nn.Conv2d, n: int) -> nn.Conv2d:
+        return nn.Conv2d(conv.in_channels * n, conv.out_channels * n, conv.kernel_size, conv.stride, groups=n)
+
+    def load_networks(self, networks: Sequence[DQN]) -> None:
+        """
+        Copy parameters and statistics of networks into the stacked layers
+        """
+        with torch.no_grad():
+            for layer in self.LAYERS:
+                states = [getattr(network, layer).state_dict() for network in networks]
+                for name, tensor in getattr(self, layer).state_dict().items():
+                    if tensor.dim() == 0:
+                        tensor.copy_(states[0][name])
+                    else:
+                        tensor.copy_(torch.cat([state[name].view(-1) for state in states]).view_as(tensor))
+
+    def copy_to(self, networks: Sequence[DQN]) -> None:
+        """
+        Copy parameters and statistics of the stacked layers back into networks, e.g. to save them separately
+        """
+        with torch.no_grad():
+            for layer in self.LAYERS:
+                states = [getattr(network, layer).state_dict() for network in networks]
+                for name, tensor in getattr(self, layer).state_dict().items():
+                    parts = [tensor] * len(networks) if tensor.dim() == 0 else tensor.view(-1).chunk(len(networks))
+                    for state, part in zip(states, parts):
+                        state[name].copy_(part.view_as(state[name]))
+
+    def forward(self, x: torch.Tensor):
+        """
+        :param x: States of the networks concatenated along channels, BxNCxHxW
+        :return: Action values, BxNxA
+        """
+        x = F.relu(self.bn1(self.conv1(x)))
+        x = F.relu(self.bn2(self.conv2(x)))
+        x = F.relu(self.bn3(self.conv3(x)))
+        return self.head(x.view(x.size()[0], -1, 1)).view(x.size()[0], self.n_networks, -1)
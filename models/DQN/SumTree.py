@@ -0,0 +1,60 @@
+import numpy as np
+
+
+class SumTree:
+    """
+    Array based binary tree whose every node holds the sum of its children's priorities.
+    Leaves are stored from index size on, node i has children 2i and 2i + 1, the root is node 1.
+    Both update and sample handle whole batches at once in O(batch size * log capacity).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.size = 1
+        while self.size < capacity:
+            self.size *= 2
+        self.nodes = np.zeros(2 * self.size, dtype=np.float64)
+
+    def total(self) -> float:
+        return float(self.nodes[1])
+
+    def get(self, leaves: np.ndarray) -> np.ndarray:
+        return self.nodes[leaves + self.size]
+
+    def update(self, leaves: np.ndarray, priorities: np.ndarray) -> None:
+        """
+        Set priorities of leaves, for repeated leaves the last priority is kept
+        """
+        nodes = leaves + self.size
+        self.nodes[nodes] = priorities
+        # all leaves are equally deep, repeated parents are summed twice to the same value
+        nodes //= 2
+        while nodes[0] >= 1:
+            self.nodes[nodes] = self.nodes[2 * nodes] + self.nodes[2 * nodes + 1]
+            nodes //= 2
+
+    def set(self, leaf: int, priority: float) -> None:
+        """
+        Scalar update of a single leaf, cheaper than update for one element
+        """
+        node = leaf + self.size
+        self.nodes[node] = priority
+        node //= 2
+        while node >= 1:
+            self.nodes[node] = self.nodes[2 * node] + self.nodes[2 * node + 1]
+            node //= 2
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """
+        :param values: Prefix sums in [0, total)
+        :return: Leaves whose priority range contains the values
+        """
+        nodes = np.ones(len(values), dtype=np.int64)
+        values = values.astype(np.float64, copy=True)
+        while nodes[0] < self.size:
+            left = 2 * nodes
+            left_sums = self.nodes[left]
+            go_right = values >= left_sums
+            values -= np.where(go_right, left_sums, 0.)
+            nodes = left + go_right
+        return np.minimum(nodes - self.size, self.capacity - 1)
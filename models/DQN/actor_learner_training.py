@@ -0,0 +1,244 @@
+import multiprocessing as mp
+import random
+from datetime import datetime, timezone
+from queue import Empty, Full
+from time import perf_counter
+
+import torch
+from torch.optim.rmsprop import RMSprop
+from torch.utils.tensorboard.writer import SummaryWriter
+
+from constants import SAVED_MODELS_DIRECTORY, TRAINING_LOGS_DIRECTORY
+from env.EnvironmentAction import EnvironmentAction
+from env.FrameHistory import FrameHistory
+from env.FrameStack import FrameStack
+from env.SpaceGameEnvironmentConfig import SpaceGameEnvironmentConfig
+from env.SpaceGameGymAPIEnvironment import SpaceGameEnvironment
+from models.DQN.ActorChunk import ActorChunk
+from models.DQN.BatchPrefetcher import BatchPrefetcher
+from models.DQN.Config import Config
+from models.DQN.DQN import DQN
+from models.DQN.ReplayMemory import ReplayMemory
+from models.DQN.SharedWeights import SharedWeights
+from models.DQN.single_agent_training import create_memory, create_network, device, optimize_model, save
+from space_game.Config import Config as GameConfig
+
+CHUNK_STEPS = 50
+QUEUE_CHUNKS_PER_ACTOR = 4
+PUBLISH_INTERVAL = 100
+REPORT_SECONDS = 30.
+ACTOR_TIMEOUT_SECONDS = 1.
+
+
+def actor_epsilon(index: int, n_actors: int, dqn_config: Config) -> float:
+    """
+    Fixed exploration rate of an actor, spread geometrically from eps_start (actor 0) to eps_end (last actor)
+    """
+    if n_actors == 1:
+        return dqn_config.eps_end
+    return dqn_config.eps_start * (dqn_config.eps_end / dqn_config.eps_start) ** (index / (n_actors - 1))
+
+
+def run_actor(
+        index: int,
+        n_actors: int,
+        weights_name: str,
+        chunks: mp.Queue,
+        stop: mp.Event,
+        environment_config: SpaceGameEnvironmentConfig,
+        game_config: GameConfig,
+        dqn_config: Config
+) -> None:
+    """
+    Plays games with an epsilon-greedy copy of the learner's policy on cpu, sending its experience in chunks
+    of CHUNK_STEPS steps. The latest published weights are loaded before every chunk.
+    """
+    torch.set_num_threads(1)
+    random.seed(index)
+    torch.manual_seed(index)
+    env = SpaceGameEnvironment(environment_config, game_config)
+    frame_shape = FrameHistory.to_frame(env.observation_space.sample()).shape
+    n_actions = env.get_n_actions()
+    policy_net = create_network(frame_shape, n_actions)
+    weights = SharedWeights(policy_net, weights_name)
+    epsilon = actor_epsilon(index, n_actors, dqn_config)
+    policy_version = 0
+    frame_stack = FrameStack(env, frame_difference=dqn_config.is_state_based_on_change)
+
+    def next_chunk() -> ActorChunk:
+        nonlocal policy_version
+        version = weights.load_into(policy_net)
+        policy_version = version if version is not None else policy_version
+        return ActorChunk(actor=index, policy_version=policy_version)
+
+    def send(chunk: ActorChunk) -> None:
+        while not stop.is_set():
+            try:
+                chunks.put(chunk, timeout=ACTOR_TIMEOUT_SECONDS)
+                return
+            except Full:
+                pass
+
+    chunk = next_chunk()
+    i_episode = 0
+    try:
+        while not stop.is_set():
+            frame_stack.reset(i_episode * n_actors + index)
+            i_episode += 1
+            cumulative_reward = 0.
+            info = {'agent_hp': 0}
+            for _ in range(2):
+                state, _, _, _ = frame_stack.step(EnvironmentAction.StandStill)
+            chunk.add_initial_frames(state.numpy().copy())
+            for t in range(3000):
+                if random.random() > epsilon:
+                    with torch.no_grad():
+                        action = int(policy_net(state.float()).max(1)[1])
+                else:
+                    action = random.randrange(n_actions)
+                state, reward, done, info = frame_stack.step(EnvironmentAction(action))
+                cumulative_reward += reward
+                chunk.add_transition(action, reward, None if done else frame_stack.frame().numpy().copy())
+                if chunk.steps >= CHUNK_STEPS:
+                    send(chunk)
+                    chunk = next_chunk()
+                if done or stop.is_set():
+                    break
+            chunk.episode_rewards.append(cumulative_reward)
+            chunk.episodes_won += 1 if info['agent_hp'] > 0 else 0
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # chunks left unsent once the learner stopped reading must not block the exit
+        chunks.cancel_join_thread()
+        weights.close()
+        env.close()
+
+
+def push_chunk(memory: ReplayMemory, chunk: ActorChunk) -> None:
+    """
+    Replay chunk's records into memory, using a stream per actor
+    """
+    for record in chunk.records:
+        if isinstance(record, tuple):
+            action, reward, next_frame = record
+            memory.push(action, reward, torch.from_numpy(next_frame) if next_frame is not None else None, chunk.actor)
+        else:
+            memory.start_episode(torch.from_numpy(record), chunk.actor)
+
+
+def train_model(
+        n_actors: int,
+        environment_config: SpaceGameEnvironmentConfig = None,
+        game_config: GameConfig = None,
+        dqn_config: Config = None,
+        custom_train_run_id: str = None,
+        publish_interval: int = PUBLISH_INTERVAL,
+        start_method: str = None
+) -> DQN:
+    """
+    Ape-X style training on a single machine: n_actors processes play games with their own SpaceGameEnvironment
+    and send experience to the replay memory of the learner, this process, which optimizes the policy
+    and publishes its weights to the actors through shared memory every publish_interval updates.
+    Every finished game of any actor counts as an episode for target updates and logging.
+    Actor steps per second, learner updates per second and policy lag, the number of updates actors'
+    weights were behind the learner when they collected the experience, are reported every REPORT_SECONDS.
+    """
+    train_run_id = custom_train_run_id \
+        if custom_train_run_id \
+        else f"ApeXDQN_{datetime.now(tz=timezone.utc).strftime('%H-%M-%S_%d-%m-%Y')}"
+    writer = SummaryWriter(log_dir=TRAINING_LOGS_DIRECTORY / train_run_id)
+    environment_config = environment_config if environment_config is not None \
+        else SpaceGameEnvironmentConfig.default()
+    game_config = game_config if game_config is not None else GameConfig.default()
+    dqn_config = dqn_config if dqn_config is not None else Config.default()
+
+    probe_env = SpaceGameEnvironment(environment_config, game_config)
+    frame = FrameHistory.to_frame(probe_env.observation_space.sample())
+    n_actions = probe_env.get_n_actions()
+    probe_env.close()
+    policy_net = create_network(frame.shape, n_actions).to(device)
+    target_net = create_network(frame.shape, n_actions).to(device)
+    target_net.load_state_dict(policy_net.state_dict())
+    target_net.eval()
+    optimizer = RMSprop(policy_net.parameters())
+    memory = create_memory(dqn_config, frame.shape, frame.dtype)
+    prefetcher = BatchPrefetcher(memory, dqn_config.batch_size, dqn_config.prefetch_depth)
+
+    weights = SharedWeights(policy_net)
+    weights.publish(policy_net, 0)
+    context = mp.get_context(start_method if start_method is not None else "forkserver")
+    chunks = context.Queue(maxsize=QUEUE_CHUNKS_PER_ACTOR * n_actors)
+    stop = context.Event()
+    actors = [
+        context.Process(
+            target=run_actor,
+            args=(index, n_actors, weights.name, chunks, stop, environment_config, game_config, dqn_config),
+            daemon=True
+        )
+        for index in range(n_actors)
+    ]
+    for actor in actors:
+        actor.start()
+
+    updates = 0
+    episodes_done = 0
+    epoch_wins = 0
+    report_start = perf_counter()
+    report_updates = report_steps = report_lag = 0
+    try:
+        while episodes_done < dqn_config.games_total:
+            while True:
+                try:
+                    # the learner has nothing to do until the memory holds a whole batch
+                    chunk = chunks.get(block=not prefetcher.is_ready(), timeout=ACTOR_TIMEOUT_SECONDS)
+                except Empty:
+                    # actors only exit once stop is set, without them episodes_done would never grow
+                    for index, actor in enumerate(actors):
+                        if not actor.is_alive():
+                            raise RuntimeError(f"Actor {index} exited with code {actor.exitcode}")
+                    break
+                push_chunk(memory, chunk)
+                report_steps += chunk.steps
+                report_lag += chunk.steps * (updates - chunk.policy_version)
+                epoch_wins += chunk.episodes_won
+                for episode_reward in chunk.episode_rewards:
+                    writer.add_scalar("Episode reward", episode_reward, episodes_done)
+                    prefetcher.flush(writer, episodes_done)
+                    episodes_done += 1
+                    if episodes_done % dqn_config.target_update == 0:
+                        target_net.load_state_dict(policy_net.state_dict())
+                    if episodes_done % dqn_config.epoch_duration == 0:
+                        print(f"won games: {epoch_wins}")
+                        epoch_wins = 0
+
+            if prefetcher.is_ready():
+                optimize_model(prefetcher, policy_net, target_net, dqn_config.gamma, optimizer)
+                updates += 1
+                report_updates += 1
+                if updates % publish_interval == 0:
+                    weights.publish(policy_net, updates)
+
+            elapsed = perf_counter() - report_start
+            if elapsed >= REPORT_SECONDS:
+                policy_lag = report_lag / report_steps if report_steps else 0.
+                writer.add_scalar("Ape-X/actor steps per second", report_steps / elapsed, updates)
+                writer.add_scalar("Ape-X/learner updates per second", report_updates / elapsed, updates)
+                writer.add_scalar("Ape-X/policy lag", policy_lag, updates)
+                print(f"actor steps/s: {report_steps / elapsed:.1f}, learner updates/s: {report_updates / elapsed:.1f}, "
+                      f"policy lag: {policy_lag:.1f} updates")
+                report_start = perf_counter()
+                report_updates = report_steps = report_lag = 0
+    finally:
+        stop.set()
+        for actor in actors:
+            actor.join(timeout=ACTOR_TIMEOUT_SECONDS * 5)
+            if actor.is_alive():
+                actor.terminate()
+        chunks.cancel_join_thread()
+        prefetcher.close()
+        weights.close()
+
+    print("STOP")
+    save(target_net, SAVED_MODELS_DIRECTORY / train_run_id)
+    return target_net
@@ -0,0 +1,22 @@
+import torch
+from torch import nn as nn
+from torch.nn import functional as F
+
+HIDDEN_SIZE = 256
+
+
+class MLP(nn.Module):
+    """
+    Counterpart of DQN for feature vector observations, see FeatureObservation.
+    Input holds the history_length last feature vectors, BxHxF, which are flattened into a single input layer.
+    """
+    def __init__(self, history_length: int, n_features: int, outputs: int, hidden_size: int = HIDDEN_SIZE):
+        super(MLP, self).__init__()
+        self.fc1 = nn.Linear(history_length * n_features, hidden_size)
+        self.fc2 = nn.Linear(hidden_size, hidden_size)
+        self.head = nn.Linear(hidden_size, outputs)
+
+    def forward(self, x: torch.Tensor):
+        x = F.relu(self.fc1(x.view(x.size()[0], -1)))
+        x = F.relu(self.fc2(x))
+        return self.head(x)
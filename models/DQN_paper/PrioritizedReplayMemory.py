@@ -0,0 +1,77 @@
+from typing import Optional, Tuple
+
+import numpy as np
+import torch
+
+from models.DQN.Batch import Batch
+from models.DQN.BatchBuffers import BatchBuffers
+from models.DQN.ReplayMemory import ReplayMemory
+from models.DQN.SumTree import SumTree
+
+
+class PrioritizedReplayMemory(ReplayMemory):
+    """
+    ReplayMemory sampling transitions proportionally to priority ** alpha, with priorities derived from TD errors.
+    New transitions get the highest priority seen so far, so each of them is likely to be replayed at least once.
+    Bias of the sampling is corrected by importance sampling weights, whose exponent beta is annealed from
+    beta_start to 1 over beta_steps calls of sample.
+    """
+
+    def __init__(
+            self, capacity: int, frame_shape: Tuple[int, ...], history_length: int = 3, batch_size: int = 128,
+            device: torch.device = torch.device("cpu"), alpha: float = 0.6, beta_start: float = 0.4,
+            beta_steps: int = 100000, epsilon: float = 1e-6, frame_dtype: np.dtype = np.uint8
+    ):
+        self.tree = SumTree(capacity)
+        self.alpha = alpha
+        self.beta_start = beta_start
+        self.beta_steps = beta_steps
+        self.epsilon = epsilon
+        self.max_priority = 1.
+        self.samples_done = 0
+        super().__init__(capacity, frame_shape, history_length, batch_size, device, frame_dtype)
+
+    def write(
+            self, frame: Optional[torch.Tensor], previous: int, action: int = 0, reward: float = 0.,
+            is_transition: bool = False
+    ) -> int:
+        number = super().write(frame, previous, action, reward, is_transition)
+        priority = self.max_priority ** self.alpha if is_transition else 0.
+        self.tree.set(number % self.capacity, priority)
+        return number
+
+    def beta(self) -> float:
+        return min(1., self.beta_start + (1. - self.beta_start) * self.samples_done / self.beta_steps)
+
+    def draw_slots(self, n: int) -> np.ndarray:
+        """
+        Stratified sampling: one slot from each of n equal ranges of the cumulative priority
+        """
+        segment = self.tree.total() / n
+        return self.tree.find((np.arange(n) + np.random.random_sample(n)) * segment)
+
+    def fill(self, buffers: BatchBuffers) -> np.ndarray:
+        """
+        Sample transitions proportionally to their priorities, with importance sampling weights normalized
+        by their maximum
+        """
+        with self.lock:
+            slots = super().fill(buffers)
+            probabilities = self.tree.get(slots) / self.tree.total()
+            weights = (len(self) * probabilities) ** -self.beta()
+            self.samples_done += 1
+        buffers.weight.numpy()[:] = weights / weights.max()
+        return slots
+
+    def make_batch(self, buffers: BatchBuffers, slots: np.ndarray) -> Batch:
+        return super().make_batch(buffers, slots)._replace(weight=buffers.weight.to(self.device))
+
+    def update_priorities(self, slots: np.ndarray, td_errors: np.ndarray) -> None:
+        """
+        :param slots: Slots of a sampled batch
+        :param td_errors: Absolute TD errors of the batch's transitions
+        """
+        priorities = td_errors + self.epsilon
+        with self.lock:
+            self.max_priority = max(self.max_priority, float(priorities.max()))
+            self.tree.update(slots, priorities ** self.alpha)
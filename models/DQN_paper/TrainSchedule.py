@@ -0,0 +1,59 @@
+from typing import Any
+
+from models.DQN.Config import Config
+
+
+class TrainSchedule:
+    """
+    When the learner optimizes, counted in environment steps: gradient_steps batches every train_every steps
+    once learning_starts steps were taken. With target_update_steps the target network is updated every that many
+    steps, otherwise every target_update episodes.
+    Inserted transitions and replayed samples are accumulated until flushed to log the effective replay ratio.
+    """
+
+    def __init__(self, dqn_config: Config):
+        self.train_every = dqn_config.train_every
+        self.gradient_steps = dqn_config.gradient_steps
+        self.learning_starts = dqn_config.learning_starts
+        self.target_update_steps = dqn_config.target_update_steps
+        self.target_update_episodes = dqn_config.target_update
+        self.batch_size = dqn_config.batch_size
+        self.steps_done = 0
+        self.inserted = 0
+        self.replayed = 0
+
+    def step(self, inserted: int = 1) -> int:
+        """
+        Count an environment step
+        :param inserted: Transitions the step pushed to memory
+        :return: Number of gradient steps due after it
+        """
+        self.steps_done += 1
+        self.inserted += inserted
+        if self.steps_done <= self.learning_starts or self.steps_done % self.train_every != 0:
+            return 0
+        return self.gradient_steps
+
+    def record_update(self, optimized: bool, batches: int = 1) -> None:
+        """
+        :param batches: Number of batch_size batches the update replayed
+        """
+        if optimized:
+            self.replayed += batches * self.batch_size
+
+    def is_step_target_update_due(self) -> bool:
+        return self.target_update_steps > 0 and self.steps_done % self.target_update_steps == 0
+
+    def is_episode_target_update_due(self, episodes_done: int) -> bool:
+        return self.target_update_steps <= 0 and episodes_done % self.target_update_episodes == 0
+
+    def flush(self, writer: Any, step: int) -> None:
+        """
+        Write replayed samples per inserted transition since the last flush
+        :param writer: TensorBoard SummaryWriter
+        """
+        if self.inserted == 0:
+            return
+        writer.add_scalar("Replay/replay ratio", self.replayed / self.inserted, step)
+        self.inserted = 0
+        self.replayed = 0
@@ -0,0 +1,26 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+
+@dataclass
+class ActorChunk:
+    """
+    Experience an actor sends to the learner at once, in the order it was collected.
+    A record is either the HxFrame array of initial frames of a new game, or an (action, reward, next frame)
+    transition whose next frame is None when the game ended.
+    """
+    actor: int
+    policy_version: int
+    steps: int = 0
+    records: List[object] = field(default_factory=list)
+    episode_rewards: List[float] = field(default_factory=list)
+    episodes_won: int = 0
+
+    def add_initial_frames(self, frames: np.ndarray) -> None:
+        self.records.append(frames)
+
+    def add_transition(self, action: int, reward: float, next_frame: Optional[np.ndarray]) -> None:
+        self.records.append((action, reward, next_frame))
+        self.steps += 1
@@ -19,9 +19,21 @@ class Config:
     memory_size: int
     target_update: int
     games_total: int
+    prioritized_replay: bool = False
+    priority_alpha: float = 0.6
+    priority_beta_start: float = 0.4
+    priority_beta_steps: int = 100000
+    prefetch_depth: int = 0
+    train_every: int = 1
+    gradient_steps: int = 1
+    learning_starts: int = 0
+    target_update_steps: int = 0
+    fused_self_play: bool = False
+    shared_self_play_policy: bool = False
 
     @staticmethod
     def from_config_dict(config_dict: dict):
+        prioritized_replay = config_dict.get('prioritized_replay', {})
         return Config(
             batch_size=config_dict['batch_size'],
             gamma=config_dict['gamma'],
@@ -33,7 +45,18 @@ class Config:
             is_state_based_on_change=config_dict['is_state_based_on_change'],
             target_update=config_dict['target_update'],
             memory_size=config_dict['memory_size'],
-            games_total=config_dict['games_total']
+            games_total=config_dict['games_total'],
+            prioritized_replay=prioritized_replay.get('enabled', False),
+            priority_alpha=prioritized_replay.get('alpha', 0.6),
+            priority_beta_start=prioritized_replay.get('beta', {}).get('start', 0.4),
+            priority_beta_steps=prioritized_replay.get('beta', {}).get('steps', 100000),
+            prefetch_depth=config_dict.get('prefetch_depth', 0),
+            train_every=config_dict.get('train_every', 1),
+            gradient_steps=config_dict.get('gradient_steps', 1),
+            learning_starts=config_dict.get('learning_starts', 0),
+            target_update_steps=config_dict.get('target_update_steps', 0),
+            fused_self_play=config_dict.get('fused_self_play', False),
+            shared_self_play_policy=config_dict.get('shared_self_play_policy', False)
         )
 
     @staticmethod
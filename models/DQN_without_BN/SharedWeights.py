@@ -0,0 +1,78 @@
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional
+
+import numpy as np
+import torch
+from torch import nn as nn
+
+
+class SharedWeights:
+    """
+    State dict of a model flattened to float32 in a multiprocessing.shared_memory block, written by a single
+    publisher (the learner) and read by any number of processes (the actors).
+    A header holds a sequence counter, odd while weights are being written, and the publisher's version.
+    Readers retry torn reads, so they never load half of an update.
+    """
+    HEADER_SIZE = 2
+
+    def __init__(self, model: nn.Module, name: Optional[str] = None):
+        """
+        :param name: Name of the block created by the publisher, a new block is created when None
+        """
+        self.n_values = sum(tensor.numel() for tensor in model.state_dict().values())
+        self.is_owner = name is None
+        self.shared_memory = SharedMemory(
+            name=name, create=self.is_owner, size=(self.HEADER_SIZE + self.n_values) * 8 if self.is_owner else 0
+        )
+        self.header = np.ndarray((self.HEADER_SIZE,), dtype=np.int64, buffer=self.shared_memory.buf)
+        self.values = np.ndarray(
+            (self.n_values,), dtype=np.float32, buffer=self.shared_memory.buf, offset=self.HEADER_SIZE * 8
+        )
+        if self.is_owner:
+            self.header[:] = 0
+        self.loaded_sequence = -1
+
+    @property
+    def name(self) -> str:
+        return self.shared_memory.name
+
+    def publish(self, model: nn.Module, version: int) -> None:
+        self.header[0] += 1
+        offset = 0
+        for tensor in model.state_dict().values():
+            n = tensor.numel()
+            self.values[offset:offset + n] = tensor.detach().reshape(-1).cpu().float().numpy()
+            offset += n
+        self.header[1] = version
+        self.header[0] += 1
+
+    def load_into(self, model: nn.Module) -> Optional[int]:
+        """
+        Copy the latest published weights into model, unless they were loaded already
+        :return: Version of the loaded weights, None when nothing new was published
+        """
+        while True:
+            sequence = int(self.header[0])
+            if sequence % 2 == 1:
+                continue
+            if sequence == self.loaded_sequence or sequence == 0:
+                return None
+            values = self.values.copy()
+            version = int(self.header[1])
+            if int(self.header[0]) == sequence:
+                break
+        offset = 0
+        with torch.no_grad():
+            for tensor in model.state_dict().values():
+                n = tensor.numel()
+                tensor.copy_(torch.from_numpy(values[offset:offset + n]).view_as(tensor))
+                offset += n
+        self.loaded_sequence = sequence
+        return version
+
+    def close(self) -> None:
+        del self.header
+        del self.values
+        self.shared_memory.close()
+        if self.is_owner:
+            self.shared_memory.unlink()
@@ -4,24 +4,30 @@ import random
 import numpy as np
 
 from pathlib import Path
-from typing import Tuple
+from typing import List, Sequence, Tuple
+from torch.nn.functional import smooth_l1_loss
 from torch.optim.optimizer import Optimizer
 from torch.optim.rmsprop import RMSprop
 from torch.utils.tensorboard.writer import SummaryWriter
 from datetime import datetime, timezone
 from copy import deepcopy
 
+from env.FrameHistory import FrameHistory
+from env.FrameStack import HISTORY_LENGTH, FrameStack
 from env.SpaceGameGymAPIEnvironment import SpaceGameEnvironment
 from env.SpaceGameSelfPlayEnvironment import SpaceGameSelfPlayEnvironment
 from env.EnvironmentAction import EnvironmentAction
 from env.SpaceGameEnvironmentConfig import SpaceGameEnvironmentConfig
 from models.DQN.Config import Config
+from models.DQN.BatchPrefetcher import BatchPrefetcher
 from models.DQN.DQN import DQN
-from models.DQN.ReplayMemory import ReplayMemory
-from models.DQN.single_agent_training import optimize_model
+from models.DQN.StackedDQN import StackedDQN
+from models.DQN.TrainSchedule import TrainSchedule
+from models.DQN.single_agent_training import create_memory, create_network, optimize_model, select_actions
 from game_recorder.GameRecorder import GameRecorder
 from constants import RECORDED_GAMES_DIRECTORY, TRAINING_LOGS_DIRECTORY, SAVED_MODELS_DIRECTORY
 from models.DQN.domain_types import HasAgentWon, GameLength, ProcessedObservation, RawAction, State
+from space_game.EventProfiler import EventProfiler
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
@@ -36,10 +42,12 @@ def process_observation_self_play(observation: np.array) -> ProcessedObservation
     return torch.tensor(observation.copy()).transpose(0, 2)
 
 
-def prepare_model(screen_height: int, screen_width: int,
-                  n_actions: int, old_model: DQN = None) -> Tuple[DQN, DQN, Optimizer]:
-    policy_net = DQN(screen_height, screen_width, n_actions).to(device)
-    target_net = DQN(screen_height, screen_width, n_actions).to(device)
+def prepare_model(frame_shape: Tuple[int, ...], n_actions: int, old_model: DQN = None) -> Tuple[DQN, DQN, Optimizer]:
+    """
+    :param frame_shape: Shape of a processed frame, see create_network
+    """
+    policy_net = create_network(frame_shape, n_actions).to(device)
+    target_net = create_network(frame_shape, n_actions).to(device)
     if old_model is not None:
         policy_net.load_state_dict(old_model.state_dict())
     target_net.load_state_dict(policy_net.state_dict())
@@ -48,6 +56,18 @@ def prepare_model(screen_height: int, screen_width: int,
     return policy_net, target_net, optimizer
 
 
+def prepare_stacked_model(policy_nets: Sequence[DQN]) -> Tuple[StackedDQN, StackedDQN, Optimizer]:
+    """
+    Single network trained in place of policy_nets, see StackedDQN.
+    RMSprop works element-wise, so one optimizer behaves as one per network.
+    """
+    policy_net = StackedDQN(policy_nets).to(device)
+    target_net = StackedDQN(policy_nets).to(device)
+    target_net.eval()
+    optimizer = RMSprop(policy_net.parameters())
+    return policy_net, target_net, optimizer
+
+
 def train_model(
         env: SpaceGameSelfPlayEnvironment = None,
         dqn_config: Config = None,
@@ -55,8 +75,13 @@ def train_model(
         custom_recordings_directory: Path = None,
         visualize_test: bool = False,
         old_model: DQN = None,
-        custom_train_id: str = None
+        custom_train_id: str = None,
+        profiler: EventProfiler = None,
+        n_envs: int = 1
 ) -> Tuple[DQN, DQN]:
+    """
+    :param n_envs: Number of games played at once, requires shared_self_play_policy
+    """
     train_run_id = custom_train_id if custom_train_id else f"CustomDQN_{datetime.now(tz=timezone.utc).strftime('%H-%M-%S_%d-%m-%Y')}"
     recordings_directory = custom_recordings_directory \
         if custom_recordings_directory is not None \
@@ -73,30 +98,85 @@ def train_model(
     if env is None:
         env_config = SpaceGameEnvironmentConfig.default()
         env = SpaceGameSelfPlayEnvironment(env_config)
-
-    random_screen = process_observation_self_play(env.sample_observation_space())
-    _, screen_height, screen_width = random_screen.shape
+    if dqn_config.fused_self_play and dqn_config.shared_self_play_policy:
+        raise ValueError("fused_self_play and shared_self_play_policy exclude each other")
+    if n_envs > 1 and not dqn_config.shared_self_play_policy:
+        raise ValueError("Several self-play games are played at once only with shared_self_play_policy")
+
+    frame = FrameHistory.to_frame(env.sample_observation_space())
+    if dqn_config.fused_self_play and frame.ndim == 1:
+        raise ValueError("fused_self_play requires screen observations")
     n_actions = env.get_n_actions()
 
-    policy_net_up, target_net_up, optimizer_up = prepare_model(screen_height, screen_width, n_actions, old_model)
-    policy_net_down, target_net_down, optimizer_down = prepare_model(screen_height, screen_width, n_actions, old_model)
+    if dqn_config.shared_self_play_policy:
+        envs = [env] + [
+            SpaceGameSelfPlayEnvironment(env.space_game_config, env.environment_config) for _ in range(n_envs - 1)
+        ]
+        if profiler is not None:
+            for shared_env in envs:
+                shared_env.enable_profiling(profiler)
+        policy_net, target_net, optimizer = prepare_model(frame.shape, n_actions, old_model)
+        prefetcher = BatchPrefetcher(
+            create_memory(dqn_config, frame.shape, frame.dtype), dqn_config.batch_size, dqn_config.prefetch_depth
+        )
+        train_shared(
+            envs, n_actions, policy_net, target_net, prefetcher, TrainSchedule(dqn_config), optimizer, dqn_config,
+            recordings_directory, model_save_directory, visualize_test, writer, profiler
+        )
+        prefetcher.close()
+        print("STOP")
+        torch.save(target_net, model_save_directory / "dqn.pt")
+        return target_net, target_net
+
+    policy_net_up, target_net_up, optimizer_up = prepare_model(frame.shape, n_actions, old_model)
+    policy_net_down, target_net_down, optimizer_down = prepare_model(frame.shape, n_actions, old_model)
 
-    memory = ReplayMemory(dqn_config.memory_size)
+    fused = dqn_config.fused_self_play
+    if fused:
+        policy_net, target_net, optimizer = prepare_stacked_model((policy_net_up, policy_net_down))
+
+    memory = create_memory(dqn_config, frame.shape, frame.dtype)
+    # fused training draws the batches of both sides at once
+    prefetcher = BatchPrefetcher(memory, dqn_config.batch_size * (2 if fused else 1), dqn_config.prefetch_depth)
+    schedule = TrainSchedule(dqn_config)
+
+    if profiler is not None:
+        env.enable_profiling(profiler)
 
     steps_done = 0
     test_episode_count = 0
+    frame_stack = FrameStack(env)
     # Training loop
     for i_episode in range(dqn_config.games_total):
-        steps_done = train(
-            env, n_actions, policy_net_up, target_net_up,
-            policy_net_down, target_net_down,
-            memory, optimizer_up, optimizer_down, dqn_config,
-            i_episode, recordings_directory, steps_done
-        )
+        if fused:
+            steps_done = train_fused(
+                frame_stack, n_actions, policy_net, target_net, prefetcher, schedule, optimizer, dqn_config,
+                i_episode, recordings_directory, steps_done
+            )
+        else:
+            steps_done = train(
+                frame_stack, n_actions, policy_net_up, target_net_up,
+                policy_net_down, target_net_down,
+                prefetcher, schedule, optimizer_up, optimizer_down, dqn_config,
+                i_episode, recordings_directory, steps_done
+            )
+        if profiler is not None:
+            profiler.flush(writer, i_episode)
+        prefetcher.flush(writer, i_episode)
+        schedule.flush(writer, i_episode)
+        if schedule.is_episode_target_update_due(i_episode + 1):
+            if fused:
+                target_net.load_state_dict(policy_net.state_dict())
+            else:
+                target_net_up.load_state_dict(policy_net_up.state_dict())
+                target_net_down.load_state_dict(policy_net_down.state_dict())
+        if fused and (
+                (i_episode + 1) % dqn_config.target_update == 0 or (i_episode + 1) % dqn_config.epoch_duration == 0
+        ):
+            # checkpoints and tests take the networks of the sides
+            target_net.copy_to((target_net_up, target_net_down))
         if (i_episode + 1) % dqn_config.target_update == 0:
             print(f"episode: {i_episode}")
-            target_net_up.load_state_dict(policy_net_up.state_dict())
-            target_net_down.load_state_dict(policy_net_down.state_dict())
             torch.save(target_net_up, model_save_directory / "dqn_up.pt")
             torch.save(target_net_down, model_save_directory / "dqn_down.pt")
 
@@ -110,6 +190,9 @@ def train_model(
             print(env.get_current_rewards())
             print(f"current_eps_threshold: {calculate_epsilon_threshold(dqn_config.eps_start, dqn_config.eps_end, dqn_config.eps_decay, steps_done)}")
 
+    prefetcher.close()
+    if fused:
+        target_net.copy_to((target_net_up, target_net_down))
     print("STOP")
     return target_net_up, target_net_down
 
@@ -131,76 +214,82 @@ def select_action(
         return torch.tensor([[random.randrange(n_actions)]], device=device, dtype=torch.long)
 
 
-def process_state_change(previous_state: State, raw_observation: np.ndarray,
-                         target_net: DQN, policy_net: DQN, memory: ReplayMemory,
-                         action_raw: torch.Tensor, reward: float, done: bool,
-                         recorder: GameRecorder, dqn_config: Config, optimizer: Optimizer) -> State:
-    reward_up = torch.tensor([reward], device=device)
-    current_screen = process_observation_self_play(raw_observation)
+def select_actions_stacked(
+        eps_done: float, eps_start: float, eps_decay: int, policy_net: StackedDQN,
+        n_actions: int, states: Sequence[State], steps_done: int
+) -> List[RawAction]:
+    """
+    select_action of every side, with a single forward of the stacked network for the sides acting greedily
+    """
+    eps_threshold = calculate_epsilon_threshold(eps_start, eps_done, eps_decay, steps_done)
+    actions = []
+    for _ in states:
+        if random.random() > eps_threshold:
+            actions.append(None)
+        else:
+            actions.append(torch.tensor([[random.randrange(n_actions)]], device=device, dtype=torch.long))
+    if any(action is None for action in actions):
+        with torch.no_grad():
+            greedy_actions = policy_net(torch.cat(tuple(states), dim=1).to(device).float()).max(2)[1]
+        actions = [
+            greedy_actions[:, side].view(1, 1) if action is None else action for side, action in enumerate(actions)
+        ]
+    return actions
+
+
+def push_state_change(history: FrameHistory, side: int, prefetcher: BatchPrefetcher, action_raw: torch.Tensor,
+                      reward: float, done: bool, recorder: GameRecorder, stream: int) -> None:
+    """
+    :param history: History holding the side's next state
+    :param side: Stream of history the side's frames are pushed to
+    :param stream: Stream of prefetcher's memory the side's transitions are pushed to
+    """
     if recorder:
-        recorder.add_torch_frame(current_screen)
-    if not done:
-        next_frame = current_screen
-        # ':' at first index since it is squeeze dummy dimension
-        next_state = torch.cat((previous_state[:, 1:, :, :].data, next_frame.unsqueeze(0)), dim=1)
-    else:
-        next_state = None
-    memory.push(previous_state, action_raw, next_state, reward_up)
-    state = next_state
-    optimize_model(memory, dqn_config.batch_size, policy_net, target_net, dqn_config.gamma, optimizer)
-    return state
-
-
-def prepare_initial_state(env: SpaceGameEnvironment, game_index: int) -> State:
-    observation_up = env.reset(game_index)
-    processed_screen_up = process_observation_self_play(
-        observation_up)
-    history_up = [processed_screen_up]
+        recorder.add_torch_frame(history.screen(side).clone())
+    prefetcher.memory.push(action_raw.item(), reward, None if done else history.frame(side), stream)
+
+
+def process_state_change(history: FrameHistory, side: int,
+                         target_net: DQN, policy_net: DQN, prefetcher: BatchPrefetcher,
+                         action_raw: torch.Tensor, reward: float, done: bool,
+                         recorder: GameRecorder, dqn_config: Config, optimizer: Optimizer, stream: int,
+                         schedule: TrainSchedule, gradient_steps: int) -> None:
+    """
+    :param stream: Stream of prefetcher's memory the side's transitions are pushed to
+    :param gradient_steps: Number of gradient steps due after the environment step, see TrainSchedule.step
+    """
+    push_state_change(history, side, prefetcher, action_raw, reward, done, recorder, stream)
+    for _ in range(gradient_steps):
+        schedule.record_update(optimize_model(prefetcher, policy_net, target_net, dqn_config.gamma, optimizer))
+
+
+def prepare_initial_state(env: FrameStack, game_index: int) -> State:
+    env.reset(game_index)
     for _ in range(2):
-        observation_up, _, _, _ = env.step(EnvironmentAction.StandStill)
-        processed_screen_up = process_observation_self_play(observation_up)
-        history_up.append(processed_screen_up)
-    state_up = torch.cat(tuple(history_up)).unsqueeze(0)
+        state_up, _, _, _ = env.step(EnvironmentAction.StandStill)
     return state_up
 
 
-def prepare_initial_states(env: SpaceGameSelfPlayEnvironment, i_episode: int) -> Tuple[State, State]:
-    observation_up, observation_down = env.reset(i_episode)
-    processed_screen_up, processed_screen_down = process_observation_self_play(
-        observation_up), process_observation_self_play(observation_down)
-    history_up = [processed_screen_up]
-    history_down = [processed_screen_down]
+def prepare_initial_states(env: FrameStack, i_episode: int) -> Tuple[State, State]:
+    env.reset(i_episode)
     for _ in range(2):
-        (_, observation_up, _), (_, observation_down, _) = env.step(
+        (_, state_up, _), (_, state_down, _) = env.step(
             (EnvironmentAction.StandStill, EnvironmentAction.StandStill)
         )
-        processed_screen_up = process_observation_self_play(observation_up)
-        history_up.append(processed_screen_up)
-        processed_screen_down = process_observation_self_play(observation_down)
-        history_down.append(processed_screen_down)
-    state_up = torch.cat(tuple(history_up)).unsqueeze(0)
-    state_down = torch.cat(tuple(history_down)).unsqueeze(0)
     return state_up, state_down
 
 
-def train(
-        env: SpaceGameSelfPlayEnvironment,
-        n_actions: int,
-        policy_net_up: DQN,
-        target_net_up: DQN,
-        policy_net_down: DQN,
-        target_net_down: DQN,
-        memory: ReplayMemory,
-        optimizer_up: Optimizer,
-        optimizer_down: Optimizer,
-        dqn_config: Config,
-        i_episode: int,
-        recordings_directory: Path,
-        steps_done: int
-) -> int:
+def prepare_recorders(
+        env: SpaceGameSelfPlayEnvironment, dqn_config: Config, i_episode: int, recordings_directory: Path
+) -> Tuple[GameRecorder, GameRecorder]:
+    """
+    :return: Recorders of both sides, None unless the episode is recorded. Games played on feature vectors
+    are not recorded, their screen is not drawn.
+    """
     up_recorder = None
     down_recorder = None
-    recordable_game = ((i_episode + 1) % dqn_config.target_update) == 0
+    recordable_game = ((i_episode + 1) % dqn_config.target_update) == 0 \
+        and env.environment_config.observation_mode == 'pixels'
     if recordable_game:
         screen_width, screen_height, _ = env.sample_observation_space().shape
         up_recorder = GameRecorder(
@@ -217,7 +306,29 @@ def train(
             directory_path=recordings_directory,
             filename=f"down_{i_episode}_raw"
         )
+    return up_recorder, down_recorder
+
+
+def train(
+        env: FrameStack,
+        n_actions: int,
+        policy_net_up: DQN,
+        target_net_up: DQN,
+        policy_net_down: DQN,
+        target_net_down: DQN,
+        prefetcher: BatchPrefetcher,
+        schedule: TrainSchedule,
+        optimizer_up: Optimizer,
+        optimizer_down: Optimizer,
+        dqn_config: Config,
+        i_episode: int,
+        recordings_directory: Path,
+        steps_done: int
+) -> int:
+    up_recorder, down_recorder = prepare_recorders(env, dqn_config, i_episode, recordings_directory)
     state_up, state_down = prepare_initial_states(env, i_episode)
+    prefetcher.memory.start_episode(state_up, stream=0)
+    prefetcher.memory.start_episode(state_down, stream=1)
     for t in range(3000):
         action_up = select_action(
             dqn_config.eps_end, dqn_config.eps_start, dqn_config.eps_decay, policy_net_up, n_actions,
@@ -230,17 +341,115 @@ def train(
         action_parsed_up = EnvironmentAction(action_up.item())
         action_parsed_down = EnvironmentAction(action_down.item())
         steps_done += 1
-        (reward_up, observation_up, done_up), (reward_down, observation_down, done_down) = env.step(
+        (reward_up, state_up, done_up), (reward_down, state_down, done_down) = env.step(
+            (action_parsed_up, action_parsed_down)
+        )
+        gradient_steps = schedule.step(inserted=2)
+        process_state_change(
+            env.history, 0, target_net_up, target_net_up, prefetcher, action_up, reward_up,
+            done_up or done_down, up_recorder, dqn_config, optimizer_up, stream=0,
+            schedule=schedule, gradient_steps=gradient_steps
+        )
+        process_state_change(
+            env.history, 1, target_net_down, target_net_down, prefetcher, action_down, reward_down,
+            done_up or done_down, down_recorder, dqn_config, optimizer_down, stream=1,
+            schedule=schedule, gradient_steps=gradient_steps
+        )
+        if schedule.is_step_target_update_due():
+            target_net_up.load_state_dict(policy_net_up.state_dict())
+            target_net_down.load_state_dict(policy_net_down.state_dict())
+        if done_up or done_down:
+            if up_recorder:
+                up_recorder.save_recording()
+            if down_recorder:
+                down_recorder.save_recording()
+            break
+    return steps_done
+
+
+def optimize_stacked_model(
+        prefetcher: BatchPrefetcher,
+        policy_net: StackedDQN, target_net: StackedDQN, gamma: float, optimizer: Optimizer
+) -> bool:
+    """
+    optimize_model of every side in a single forward and backward pass. A prefetched batch is split into one part
+    per network, each an independent uniform batch of the shared memory, which mixes the transitions of both sides
+    like the batches of separate training do. The loss sums the losses of the networks, so each gets its own gradient.
+    :return: Whether memory held enough transitions to optimize
+    """
+    if not prefetcher.is_ready():
+        return False
+    batch = prefetcher.get()
+    n = policy_net.n_networks
+    batch_size = len(batch.slot) // n
+    states = torch.cat(batch.state.float().chunk(n), dim=1)
+    next_states = torch.cat(batch.next_state.float().chunk(n), dim=1)
+    actions = batch.action.view(n, batch_size).t()
+    non_final = batch.non_final.view(n, batch_size).t()
+
+    state_action_values = policy_net(states).gather(2, actions.unsqueeze(2)).squeeze(2)
+    next_state_values = torch.zeros(batch_size, n, device=device)
+    next_state_values[non_final] = target_net(next_states).max(2)[0].detach()[non_final]
+    expected_state_action_values = (next_state_values * gamma) + batch.reward.view(n, batch_size).t()
+
+    losses = smooth_l1_loss(state_action_values, expected_state_action_values, reduction='none')
+    if batch.weight is None:
+        loss = losses.mean(0).sum()
+    else:
+        loss = (losses * batch.weight.view(n, batch_size).t()).mean(0).sum()
+        td_errors = (expected_state_action_values - state_action_values).detach().abs()
+        prefetcher.memory.update_priorities(batch.slot, td_errors.t().reshape(-1).cpu().numpy())
+
+    optimizer.zero_grad()
+    loss.backward()
+    for param in policy_net.parameters():
+        param.grad.data.clamp_(-1, 1)
+    optimizer.step()
+    return True
+
+
+def train_fused(
+        env: FrameStack,
+        n_actions: int,
+        policy_net: StackedDQN,
+        target_net: StackedDQN,
+        prefetcher: BatchPrefetcher,
+        schedule: TrainSchedule,
+        optimizer: Optimizer,
+        dqn_config: Config,
+        i_episode: int,
+        recordings_directory: Path,
+        steps_done: int
+) -> int:
+    """
+    train with the networks of both sides stacked, so both act and learn in single fused passes
+    """
+    up_recorder, down_recorder = prepare_recorders(env, dqn_config, i_episode, recordings_directory)
+    state_up, state_down = prepare_initial_states(env, i_episode)
+    prefetcher.memory.start_episode(state_up, stream=0)
+    prefetcher.memory.start_episode(state_down, stream=1)
+    for t in range(3000):
+        action_up, action_down = select_actions_stacked(
+            dqn_config.eps_end, dqn_config.eps_start, dqn_config.eps_decay, policy_net, n_actions,
+            (state_up, state_down), steps_done
+        )
+        action_parsed_up = EnvironmentAction(action_up.item())
+        action_parsed_down = EnvironmentAction(action_down.item())
+        steps_done += 1
+        (reward_up, state_up, done_up), (reward_down, state_down, done_down) = env.step(
             (action_parsed_up, action_parsed_down)
         )
-        state_up = process_state_change(
-            state_up, observation_up, target_net_up, target_net_up, memory, action_up, reward_up,
-            done_up or done_down, up_recorder, dqn_config, optimizer_up
+        push_state_change(
+            env.history, 0, prefetcher, action_up, reward_up, done_up or done_down, up_recorder, stream=0
         )
-        state_down = process_state_change(
-            state_down, observation_down, target_net_down, target_net_down, memory, action_down, reward_down,
-            done_up or done_down, down_recorder, dqn_config, optimizer_down
+        push_state_change(
+            env.history, 1, prefetcher, action_down, reward_down, done_up or done_down, down_recorder, stream=1
         )
+        for _ in range(schedule.step(inserted=2)):
+            optimized = optimize_stacked_model(prefetcher, policy_net, target_net, dqn_config.gamma, optimizer)
+            schedule.record_update(optimized, batches=2)
+        if schedule.is_step_target_update_due():
+            target_net.load_state_dict(policy_net.state_dict())
         if done_up or done_down:
             if up_recorder:
                 up_recorder.save_recording()
@@ -250,6 +459,133 @@ def train(
     return steps_done
 
 
+def start_shared_game(
+        env: SpaceGameSelfPlayEnvironment, i_episode: int, history: FrameHistory, prefetcher: BatchPrefetcher,
+        stream: int, dqn_config: Config, recordings_directory: Path
+) -> List[GameRecorder]:
+    """
+    Reset env for episode i_episode, whose UP and DOWN sides use streams stream and stream + 1
+    of both history and prefetcher's memory
+    :return: Recorders of both sides
+    """
+    for side, observation in enumerate(env.reset(i_episode)):
+        history.reset(stream + side, observation)
+        prefetcher.memory.start_episode(history.state(stream + side), stream=stream + side)
+    return list(prepare_recorders(env, dqn_config, i_episode, recordings_directory))
+
+
+def train_shared(
+        envs: List[SpaceGameSelfPlayEnvironment],
+        n_actions: int,
+        policy_net: DQN,
+        target_net: DQN,
+        prefetcher: BatchPrefetcher,
+        schedule: TrainSchedule,
+        optimizer: Optimizer,
+        dqn_config: Config,
+        recordings_directory: Path,
+        model_save_directory: Path,
+        visualize_test: bool,
+        writer: SummaryWriter,
+        profiler: EventProfiler = None
+) -> None:
+    """
+    Training loop of a single network playing both sides of all games at once. DOWN observations are mirrored,
+    so the UP and DOWN states of every game form one batch of 2N states evaluated in a single forward pass,
+    and transitions of both sides go to the same memory.
+    Every finished game counts as an episode for target updates, checkpoints, logging and testing.
+    A freshly reset game starts with its first frame repeated over the whole history.
+    """
+    frame = FrameHistory.to_frame(envs[0].sample_observation_space())
+    history = FrameHistory(2 * len(envs), HISTORY_LENGTH, frame.shape, dtype=frame.dtype)
+    recorders: List[GameRecorder] = []
+    for index, env in enumerate(envs):
+        recorders.extend(
+            start_shared_game(env, index, history, prefetcher, 2 * index, dqn_config, recordings_directory)
+        )
+    games_started = len(envs)
+    steps_done = 0
+    episodes_done = 0
+    test_episode_count = 0
+    while episodes_done < dqn_config.games_total:
+        actions = select_actions(
+            dqn_config.eps_end, dqn_config.eps_start, dqn_config.eps_decay, policy_net, n_actions,
+            history.states().to(device), steps_done
+        )
+        steps_done += len(envs)
+        results = [
+            env.step((EnvironmentAction(actions[2 * index].item()), EnvironmentAction(actions[2 * index + 1].item())))
+            for index, env in enumerate(envs)
+        ]
+        history.push([observation for result in results for _, observation, _ in result])
+        for index, env in enumerate(envs):
+            up, down = 2 * index, 2 * index + 1
+            (reward_up, _, done_up), (reward_down, _, done_down) = results[index]
+            done = done_up or done_down
+            push_state_change(history, up, prefetcher, actions[up], reward_up, done, recorders[up], stream=up)
+            push_state_change(history, down, prefetcher, actions[down], reward_down, done, recorders[down], stream=down)
+            for _ in range(schedule.step(inserted=2)):
+                schedule.record_update(optimize_model(prefetcher, policy_net, target_net, dqn_config.gamma, optimizer))
+            if schedule.is_step_target_update_due():
+                target_net.load_state_dict(policy_net.state_dict())
+            if not done:
+                continue
+
+            for recorder in recorders[up:down + 1]:
+                if recorder:
+                    recorder.save_recording()
+            if profiler is not None:
+                profiler.flush(writer, episodes_done)
+            prefetcher.flush(writer, episodes_done)
+            schedule.flush(writer, episodes_done)
+            episodes_done += 1
+            if schedule.is_episode_target_update_due(episodes_done):
+                target_net.load_state_dict(policy_net.state_dict())
+            if episodes_done % dqn_config.target_update == 0:
+                print(f"episode: {episodes_done - 1}")
+                torch.save(target_net, model_save_directory / "dqn.pt")
+            if episodes_done % dqn_config.epoch_duration == 0:
+                test_shared(
+                    test_episode_count, env, dqn_config, target_net, recordings_directory, visualize_test, writer
+                )
+                test_episode_count += 1
+                print(env.get_current_rewards())
+                print(f"current_eps_threshold: {calculate_epsilon_threshold(dqn_config.eps_start, dqn_config.eps_end, dqn_config.eps_decay, steps_done)}")
+            recorders[up:down + 1] = start_shared_game(
+                env, games_started, history, prefetcher, up, dqn_config, recordings_directory
+            )
+            games_started += 1
+
+
+def create_test_env(env: SpaceGameSelfPlayEnvironment, visualize_test: bool) -> SpaceGameEnvironment:
+    env_config_copied = deepcopy(env.environment_config)
+    env_config_copied.render = visualize_test
+    game_config_copied = deepcopy(env.space_game_config)
+    return SpaceGameEnvironment(game_config=game_config_copied, environment_config=env_config_copied)
+
+
+def test_shared(
+        test_episode_count: int,
+        env: SpaceGameSelfPlayEnvironment,
+        dqn_config: Config,
+        target_net: DQN,
+        recordings_directory: Path,
+        visualize_test: bool,
+        writer: SummaryWriter
+):
+    """
+    test of the network playing both sides, DOWN observations being mirrored it is tested once
+    """
+    print("test_episode: ", test_episode_count)
+    test_env = create_test_env(env, visualize_test)
+    win_rate, average_game_duration = test_model(test_env, dqn_config, target_net,
+                                                 recordings_directory, test_episode_count, side='shared')
+    writer.add_scalar("Test episode winratio", win_rate, test_episode_count)
+    writer.add_scalar("Test episode average game length", average_game_duration, test_episode_count)
+    print("win ratio: ", win_rate)
+    print("game length: ", average_game_duration)
+
+
 def test(
         test_episode_count: int,
         env: SpaceGameSelfPlayEnvironment,
@@ -261,10 +597,7 @@ def test(
         writer: SummaryWriter
 ):
     print("test_episode: ", test_episode_count)
-    env_config_copied = deepcopy(env.environment_config)
-    env_config_copied.render = visualize_test
-    game_config_copied = deepcopy(env.space_game_config)
-    test_env = SpaceGameEnvironment(game_config=game_config_copied, environment_config=env_config_copied)
+    test_env = create_test_env(env, visualize_test)
     win_rate_up, average_game_duration_up = test_model(test_env, dqn_config, target_net_up,
                                                        recordings_directory, test_episode_count, side='up')
     win_rate_down, average_game_duration_down = test_model(test_env, dqn_config, target_net_down,
@@ -285,9 +618,10 @@ def test_model(test_env: SpaceGameEnvironment, dqn_config: Config, policy_net: D
                recordings_directory: Path, test_episode_count: int, side: str) -> Tuple[float, float]:
     won_games = 0
     game_durations = 0
+    frame_stack = FrameStack(test_env)
     with torch.no_grad():
         for run_id in range(dqn_config.n_test_runs):
-            game_duration, has_won = test_game(env=test_env, policy_net=policy_net,
+            game_duration, has_won = test_game(env=frame_stack, policy_net=policy_net,
                                                test_episode_count=test_episode_count,
                                                recordings_directory=recordings_directory, run_id=f"{run_id}_{side}")
             won_games += (1 if has_won else 0)
@@ -296,41 +630,45 @@ def test_model(test_env: SpaceGameEnvironment, dqn_config: Config, policy_net: D
 
 
 def test_game(
-        env: SpaceGameEnvironment, recordings_directory: Path, test_episode_count: int,
+        env: FrameStack, recordings_directory: Path, test_episode_count: int,
         policy_net: DQN, run_id: str
 ) -> Tuple[GameLength, HasAgentWon]:
+    """
+    Games played on feature vectors are not recorded, their screen is not drawn
+    """
     done = False
     game_length = 0
     info = {'agent_hp': float('inf')}
-    raw_screen_width, raw_screen_height, _ = env.sample_observation_space().shape
-    pov_screen_width, pov_screen_height = raw_screen_width, raw_screen_height
-    recorder = GameRecorder(
-        raw_screen_width,
-        raw_screen_height,
-        grayscale=True,
-        directory_path=recordings_directory,
-        filename=f"test_{test_episode_count}_{run_id}_raw"
-    )
-    recorder_pov = GameRecorder(
-        pov_screen_width,
-        pov_screen_height,
-        grayscale=True,
-        directory_path=recordings_directory,
-        filename=f"test_{test_episode_count}_{run_id}_pov"
-    )
+    recorded = env.environment_config.observation_mode == 'pixels'
+    if recorded:
+        raw_screen_width, raw_screen_height, _ = env.sample_observation_space().shape
+        pov_screen_width, pov_screen_height = raw_screen_width, raw_screen_height
+        recorder = GameRecorder(
+            raw_screen_width,
+            raw_screen_height,
+            grayscale=True,
+            directory_path=recordings_directory,
+            filename=f"test_{test_episode_count}_{run_id}_raw"
+        )
+        recorder_pov = GameRecorder(
+            pov_screen_width,
+            pov_screen_height,
+            grayscale=True,
+            directory_path=recordings_directory,
+            filename=f"test_{test_episode_count}_{run_id}_pov"
+        )
 
     state = prepare_initial_state(env, 0)
     while not done:
         action = policy_net(state.to(device).float()).max(1)[1].view(1, 1)
-        observation, _, done, info = env.step(action.item())
-        current_screen = process_observation_self_play(observation)
-        recorder.add_torch_frame(current_screen)
-        next_frame = current_screen
-        recorder_pov.add_torch_frame(next_frame)
-        state = torch.cat((state[:, 1:, :, :], next_frame.unsqueeze(0)), dim=1)
+        state, _, done, info = env.step(action.item())
+        if recorded:
+            recorder.add_torch_frame(env.screen().clone())
+            recorder_pov.add_torch_frame(env.frame().clone())
         game_length += 1
-    recorder.save_recording()
-    recorder_pov.save_recording()
+    if recorded:
+        recorder.save_recording()
+        recorder_pov.save_recording()
     return game_length, info['agent_hp'] > 0
 
 
@@ -1,39 +1,45 @@
 import math
+import numpy as np
 import torch
 import random
-import gym
 
 from pathlib import Path
-from typing import Tuple
+from typing import Tuple, Union
 from torch.nn.functional import smooth_l1_loss
-from collections import deque
 from torch.optim.optimizer import Optimizer
 from torch.optim.rmsprop import RMSprop
 from torch.utils.tensorboard.writer import SummaryWriter
 from datetime import datetime, timezone
 
-from common.utils import process_observation
+from env.FrameHistory import FrameHistory
+from env.FrameStack import HISTORY_LENGTH, FrameStack
 from env.SpaceGameGymAPIEnvironment import SpaceGameEnvironment
+from env.VectorSpaceGameEnvironment import VectorSpaceGameEnvironment
 from env.EnvironmentAction import EnvironmentAction
 from env.SpaceGameEnvironmentConfig import SpaceGameEnvironmentConfig
 from models.DQN.Config import Config
+from models.DQN.BatchPrefetcher import BatchPrefetcher
 from models.DQN.DQN import DQN
+from models.DQN.MLP import MLP
+from models.DQN.PrioritizedReplayMemory import PrioritizedReplayMemory
 from models.DQN.ReplayMemory import ReplayMemory
+from models.DQN.TrainSchedule import TrainSchedule
 from game_recorder.GameRecorder import GameRecorder
 from constants import RECORDED_GAMES_DIRECTORY, TRAINING_LOGS_DIRECTORY, SAVED_MODELS_DIRECTORY
-from models.DQN.Transition import Transition
+from space_game.EventProfiler import EventProfiler
 from models.DQN.domain_types import HasAgentWon, GameLength, RawAction, State
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
 
 def train_model(
-        env: SpaceGameEnvironment = None,
+        env: Union[SpaceGameEnvironment, VectorSpaceGameEnvironment] = None,
         dqn_config: Config = None,
         custom_logs_directory: Path = None,
         custom_recordings_directory: Path = None,
         save_models_directory: Path = None,
-        custom_train_run_id: str = None
+        custom_train_run_id: str = None,
+        profiler: EventProfiler = None
 ) -> DQN:
     train_run_id = custom_train_run_id \
         if custom_train_run_id \
@@ -53,25 +59,42 @@ def train_model(
         env_config = SpaceGameEnvironmentConfig.default()
         env = SpaceGameEnvironment(env_config)
 
-    random_screen = process_observation(env.observation_space.sample())
-    _, screen_height, screen_width = random_screen.shape
+    frame = FrameHistory.to_frame(env.observation_space.sample())
     n_actions = env.get_n_actions()
-    policy_net = DQN(screen_height, screen_width, n_actions).to(device)
-    target_net = DQN(screen_height, screen_width, n_actions).to(device)
+    policy_net = create_network(frame.shape, n_actions).to(device)
+    target_net = create_network(frame.shape, n_actions).to(device)
     target_net.load_state_dict(policy_net.state_dict())
     target_net.eval()
     optimizer = RMSprop(policy_net.parameters())
 
-    memory = ReplayMemory(dqn_config.memory_size)
+    memory = create_memory(dqn_config, frame.shape, frame.dtype)
+    prefetcher = BatchPrefetcher(memory, dqn_config.batch_size, dqn_config.prefetch_depth)
+    schedule = TrainSchedule(dqn_config)
+
+    if profiler is not None:
+        env.enable_profiling(profiler)
+
+    if isinstance(env, VectorSpaceGameEnvironment):
+        train_vectorized(env, dqn_config, policy_net, n_actions, prefetcher, schedule, target_net, optimizer, writer,
+                         recordings_directory, profiler)
+        prefetcher.close()
+        print("STOP")
+        save(target_net, save_models_directory)
+        return target_net
 
     steps_done = 0
 
     # Training loop
     test_episode_count = 0
     epoch_wins = 0
+    frame_stack = FrameStack(env, frame_difference=dqn_config.is_state_based_on_change)
     for i_episode in range(dqn_config.games_total):
-        steps_done, has_won = train(env, dqn_config, policy_net, n_actions, memory,
-                           target_net, optimizer, i_episode, writer, steps_done)
+        steps_done, has_won = train(frame_stack, dqn_config, policy_net, n_actions, prefetcher, schedule,
+                                    target_net, optimizer, i_episode, writer, steps_done)
+        if profiler is not None:
+            profiler.flush(writer, i_episode)
+        prefetcher.flush(writer, i_episode)
+        schedule.flush(writer, i_episode)
         epoch_wins += 1 if has_won else 0
         # Testing phase
         if (i_episode+1) % dqn_config.epoch_duration == 0:
@@ -81,6 +104,7 @@ def train_model(
             print(f"won games: {epoch_wins}")
             epoch_wins = 0
 
+    prefetcher.close()
     print("STOP")
     save(target_net, save_models_directory)
     return target_net
@@ -90,8 +114,9 @@ def test(dqn_config: Config, env: SpaceGameEnvironment, recordings_directory: Pa
          writer: SummaryWriter, test_episode_count: int):
     games_won_lengths = []
     games_lost_lengths = []
+    frame_stack = FrameStack(env, frame_difference=dqn_config.is_state_based_on_change)
     for i_test_run in range(dqn_config.n_test_runs):
-        game_length, has_won = test_game(env, recordings_directory, test_episode_count, target_net,
+        game_length, has_won = test_game(frame_stack, recordings_directory, test_episode_count, target_net,
                                          i_test_run, dqn_config)
         if has_won:
             games_won_lengths.append(game_length)
@@ -121,52 +146,123 @@ def test(dqn_config: Config, env: SpaceGameEnvironment, recordings_directory: Pa
     print("======================")
 
 
-def train(env: SpaceGameEnvironment, dqn_config: Config, policy_net: DQN, n_actions: int, memory: ReplayMemory,
-          target_net: DQN, optimizer: Optimizer, i_episode: int, writer: SummaryWriter, steps_done: int) -> Tuple[int, bool]:
-    observation = env.reset(i_episode)
-    last_screen = process_observation(observation)
-    current_screen = process_observation(observation)
-    last_frame = current_screen - last_screen if dqn_config.is_state_based_on_change else last_screen
+def train(env: FrameStack, dqn_config: Config, policy_net: DQN, n_actions: int, prefetcher: BatchPrefetcher,
+          schedule: TrainSchedule, target_net: DQN, optimizer: Optimizer, i_episode: int, writer: SummaryWriter,
+          steps_done: int) -> Tuple[int, bool]:
+    memory = prefetcher.memory
+    state = env.reset(i_episode)
     cumulative_reward = 0.
-    history = deque([last_frame])
     info = {'agent_hp': 0}
     for _ in range(2):
-        observation, _, _, _ = env.step(EnvironmentAction.StandStill)
-        last_screen = current_screen
-        current_screen = process_observation(observation)
-        last_frame = current_screen - last_screen if dqn_config.is_state_based_on_change else last_screen
-        history.append(last_frame)
-    state = torch.cat(tuple(history)).unsqueeze(0)
+        state, _, _, _ = env.step(EnvironmentAction.StandStill)
+    memory.start_episode(state)
     for t in range(3000):
         action = select_action(
             dqn_config.eps_end, dqn_config.eps_start, dqn_config.eps_decay, policy_net, n_actions, state.to(device), steps_done
         )
         action_parsed = EnvironmentAction(action.item())
         steps_done += 1
-        observation, reward, done, info = env.step(action_parsed)
+        state, reward, done, info = env.step(action_parsed)
         cumulative_reward += reward
-        reward = torch.tensor([reward], device=device)
-        last_screen = current_screen
-        current_screen = process_observation(observation)
-        if not done:
-            next_frame = current_screen - last_screen if dqn_config.is_state_based_on_change else last_screen
-            # ':' at first index since it is squeeze dummy dimension
-            next_state = torch.cat((state[:, 1:, :, :], next_frame.unsqueeze(0)), dim=1)
-        else:
-            next_state = None
-        memory.push(state, action, next_state if next_state is not None else None, reward)
-        state = next_state
-        optimize_model(memory, dqn_config.batch_size, policy_net, target_net, dqn_config.gamma, optimizer)
+        memory.push(action.item(), reward, None if done else env.frame())
+        for _ in range(schedule.step()):
+            schedule.record_update(optimize_model(prefetcher, policy_net, target_net, dqn_config.gamma, optimizer))
+        if schedule.is_step_target_update_due():
+            target_net.load_state_dict(policy_net.state_dict())
         if done:
             break
 
-    if (i_episode + 1) % dqn_config.target_update == 0:
+    if schedule.is_episode_target_update_due(i_episode + 1):
         target_net.load_state_dict(policy_net.state_dict())
 
     writer.add_scalar("Episode reward", cumulative_reward, i_episode)
     return steps_done, info['agent_hp'] > 0
 
 
+def train_vectorized(env: VectorSpaceGameEnvironment, dqn_config: Config, policy_net: DQN, n_actions: int,
+                     prefetcher: BatchPrefetcher, schedule: TrainSchedule, target_net: DQN, optimizer: Optimizer,
+                     writer: SummaryWriter, recordings_directory: Path, profiler: EventProfiler = None) -> None:
+    """
+    Training loop stepping all games of the vector environment at once.
+    Every finished game counts as an episode for target updates, logging and testing,
+    every step of a single game counts as a step of the schedule.
+    A freshly reset game starts with its first frame repeated over the whole history.
+    """
+    memory = prefetcher.memory
+    frame = FrameHistory.to_frame(env.observation_space.sample())
+    history = FrameHistory(env.num_envs, HISTORY_LENGTH, frame.shape, dqn_config.is_state_based_on_change, frame.dtype)
+    observations = env.reset()
+    for index, observation in enumerate(observations):
+        history.reset(index, observation)
+        memory.start_episode(history.state(index), stream=index)
+    cumulative_rewards = [0.] * env.num_envs
+    steps_done = 0
+    episodes_done = 0
+    test_episode_count = 0
+    epoch_wins = 0
+    while episodes_done < dqn_config.games_total:
+        actions = select_actions(
+            dqn_config.eps_end, dqn_config.eps_start, dqn_config.eps_decay, policy_net, n_actions,
+            history.states().to(device), steps_done
+        )
+        steps_done += env.num_envs
+        observations, rewards, dones, infos = env.step(actions.view(-1).cpu().numpy())
+        history.push(observations)
+        for index in range(env.num_envs):
+            cumulative_rewards[index] += rewards[index]
+            next_frame = None if dones[index] else history.frame(index)
+            memory.push(actions[index].item(), float(rewards[index]), next_frame, stream=index)
+            for _ in range(schedule.step()):
+                schedule.record_update(optimize_model(prefetcher, policy_net, target_net, dqn_config.gamma, optimizer))
+            if schedule.is_step_target_update_due():
+                target_net.load_state_dict(policy_net.state_dict())
+            if not dones[index]:
+                continue
+
+            writer.add_scalar("Episode reward", cumulative_rewards[index], episodes_done)
+            if profiler is not None:
+                profiler.flush(writer, episodes_done)
+            prefetcher.flush(writer, episodes_done)
+            schedule.flush(writer, episodes_done)
+            epoch_wins += 1 if infos[index]['agent_hp'] > 0 else 0
+            episodes_done += 1
+            if schedule.is_episode_target_update_due(episodes_done):
+                target_net.load_state_dict(policy_net.state_dict())
+            if episodes_done % dqn_config.epoch_duration == 0:
+                with torch.no_grad():
+                    test(dqn_config, env.envs[index], recordings_directory, target_net, writer, test_episode_count)
+                    test_episode_count += 1
+                print(f"won games: {epoch_wins}")
+                epoch_wins = 0
+                observations[index] = env.reset_env(index)
+            cumulative_rewards[index] = 0.
+            history.reset(index, observations[index])
+            memory.start_episode(history.state(index), stream=index)
+
+
+def create_network(frame_shape: Tuple[int, ...], n_actions: int) -> Union[DQN, MLP]:
+    """
+    :param frame_shape: Shape of a processed frame, see FrameHistory.to_frame
+    :return: DQN for screen observations, MLP for feature vectors
+    """
+    if len(frame_shape) == 1:
+        return MLP(HISTORY_LENGTH, frame_shape[0], n_actions)
+    screen_height, screen_width = frame_shape
+    return DQN(screen_height, screen_width, n_actions)
+
+
+def create_memory(dqn_config: Config, frame_shape: Tuple[int, ...], frame_dtype: np.dtype) -> ReplayMemory:
+    if dqn_config.prioritized_replay:
+        return PrioritizedReplayMemory(
+            dqn_config.memory_size, frame_shape, batch_size=dqn_config.batch_size, device=device,
+            alpha=dqn_config.priority_alpha, beta_start=dqn_config.priority_beta_start,
+            beta_steps=dqn_config.priority_beta_steps, frame_dtype=frame_dtype
+        )
+    return ReplayMemory(
+        dqn_config.memory_size, frame_shape, batch_size=dqn_config.batch_size, device=device, frame_dtype=frame_dtype
+    )
+
+
 def save(dqn: DQN, directory: Path) -> None:
     directory.mkdir(parents=True, exist_ok=True)
     torch.save(dqn, directory / "dqn.pt")
@@ -185,88 +281,101 @@ def select_action(
         return torch.tensor([[random.randrange(n_actions)]], device=device, dtype=torch.long)
 
 
+def select_actions(
+        eps_done: float, eps_start: float, eps_decay: int, policy_net: DQN,
+        n_actions: int, states: State, steps_done: int
+) -> RawAction:
+    """
+    Batched version of select_action, drawing exploration independently for every state
+    :return: Actions of shape (N, 1)
+    """
+    eps_threshold = eps_done + (eps_start - eps_done) * math.exp(-1. * steps_done / eps_decay)
+    with torch.no_grad():
+        actions = policy_net(states.float()).max(1)[1].view(-1, 1)
+    explore = torch.rand(actions.shape, device=device) <= eps_threshold
+    random_actions = torch.randint(n_actions, actions.shape, device=device, dtype=torch.long)
+    return torch.where(explore, random_actions, actions)
+
+
 def optimize_model(
-        memory: ReplayMemory, batch_size: int,
+        prefetcher: BatchPrefetcher,
         policy_net: DQN, target_net: DQN, gamma: float, optimizer: Optimizer
-) -> None:
-    if len(memory) < batch_size:
-        return
-    transitions = memory.sample(batch_size)
-    batch = Transition(*zip(*transitions))
-    non_final_mask = torch.tensor(tuple(map(lambda s: s is not None,
-                                            batch.next_state)), device=device, dtype=torch.bool)
-
-    non_final_next_states = torch.cat([s for s in batch.next_state
-                                       if s is not None]).to(device).float()
-    state_batch = torch.cat(batch.state).to(device).float()
-    action_batch = torch.cat(batch.action)
-    reward_batch = torch.cat(batch.reward)
-
-    state_action_values = policy_net(state_batch).gather(1, action_batch)
+) -> bool:
+    """
+    :return: Whether memory held enough transitions to optimize
+    """
+    if not prefetcher.is_ready():
+        return False
+    batch = prefetcher.get()
+    batch_size = len(batch.slot)
+    non_final_next_states = batch.next_state[batch.non_final].float()
+
+    state_action_values = policy_net(batch.state.float()).gather(1, batch.action)
     next_state_values = torch.zeros(batch_size, device=device)
-    next_state_values[non_final_mask] = target_net(non_final_next_states).max(1)[0].detach()
-    expected_state_action_values = (next_state_values * gamma) + reward_batch
+    next_state_values[batch.non_final] = target_net(non_final_next_states).max(1)[0].detach()
+    expected_state_action_values = (next_state_values * gamma) + batch.reward
 
-    loss = smooth_l1_loss(state_action_values, expected_state_action_values.unsqueeze(1))
+    if batch.weight is None:
+        loss = smooth_l1_loss(state_action_values, expected_state_action_values.unsqueeze(1))
+    else:
+        losses = smooth_l1_loss(state_action_values, expected_state_action_values.unsqueeze(1), reduction='none')
+        loss = (losses.squeeze(1) * batch.weight).mean()
+        td_errors = (expected_state_action_values - state_action_values.squeeze(1)).detach().abs()
+        prefetcher.memory.update_priorities(batch.slot, td_errors.cpu().numpy())
 
     optimizer.zero_grad()
     loss.backward()
     for param in policy_net.parameters():
         param.grad.data.clamp_(-1, 1)
     optimizer.step()
+    return True
 
 
 def test_game(
-        env: gym.Env, recordings_directory: Path, test_episode_count: int,
+        env: FrameStack, recordings_directory: Path, test_episode_count: int,
         policy_net: DQN, run_id: int, dqn_config: Config
 ) -> Tuple[GameLength, HasAgentWon]:
-    screen_raw = env.reset()
-    last_screen = process_observation(screen_raw)
-    current_screen = last_screen
-    raw_screen_width, raw_screen_height, _ = screen_raw.shape
+    """
+    Games played on feature vectors are not recorded, their screen is not drawn
+    """
+    state = env.reset()
     done = False
     game_length = 0
     info = {'agent_hp': float('inf')}
-    last_frame = current_screen - last_screen
-    _, pov_screen_width, pov_screen_height = last_frame.shape
-    history = deque([last_frame])
-    recorder = GameRecorder(
-        raw_screen_width,
-        raw_screen_height,
-        grayscale=True,
-        directory_path=recordings_directory,
-        filename=f"{test_episode_count}_{run_id}_raw"
-    )
-    recorder_pov = GameRecorder(
-        pov_screen_width,
-        pov_screen_height,
-        grayscale=True,
-        directory_path=recordings_directory,
-        filename=f"{test_episode_count}_{run_id}_pov"
-    )
+    recorded = env.environment_config.observation_mode == 'pixels'
+    if recorded:
+        raw_screen_width, raw_screen_height, _ = env.sample_observation_space().shape
+        _, pov_screen_width, pov_screen_height = env.frame().shape
+        recorder = GameRecorder(
+            raw_screen_width,
+            raw_screen_height,
+            grayscale=True,
+            directory_path=recordings_directory,
+            filename=f"{test_episode_count}_{run_id}_raw"
+        )
+        recorder_pov = GameRecorder(
+            pov_screen_width,
+            pov_screen_height,
+            grayscale=True,
+            directory_path=recordings_directory,
+            filename=f"{test_episode_count}_{run_id}_pov"
+        )
     for _ in range(2):
-        observation, _, _, _ = env.step(0)
-        last_screen = current_screen
-        current_screen = process_observation(observation)
-        recorder.add_torch_frame(current_screen.cpu())
-        last_frame = current_screen - last_screen if dqn_config.is_state_based_on_change else last_screen
-        recorder_pov.add_torch_frame(last_frame.cpu())
-        history.append(last_frame)
-    state = torch.cat(tuple(history)).unsqueeze(0)
+        state, _, _, _ = env.step(0)
+        if recorded:
+            recorder.add_torch_frame(env.screen().clone())
+            recorder_pov.add_torch_frame(env.frame().clone())
     while not done:
         action = policy_net(state.to(device).float()).max(1)[1].view(1, 1)
-        observation, _, done, info = env.step(action.item())
-        last_screen = current_screen
-        current_screen = process_observation(observation)
-        recorder.add_torch_frame(current_screen.cpu())
-        next_frame = current_screen - last_screen if dqn_config.is_state_based_on_change else last_screen
-        recorder_pov.add_torch_frame(next_frame.cpu())
-        state = torch.cat((state[:, 1:, :, :], next_frame.unsqueeze(0)), dim=1)
+        state, _, done, info = env.step(action.item())
+        if recorded:
+            recorder.add_torch_frame(env.screen().clone())
+            recorder_pov.add_torch_frame(env.frame().clone())
         game_length += 1
-    recorder.save_recording()
-    recorder_pov.save_recording()
+    if recorded:
+        recorder.save_recording()
+        recorder_pov.save_recording()
     return game_length, info['agent_hp'] > 0
 
-
 if __name__ == "__main__":
     train_model()
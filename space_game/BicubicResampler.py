@@ -0,0 +1,60 @@
+from numpy import zeros, float64, uint8, clip, floor, flatnonzero, ndarray
+
+PRECISION_BITS = 22
+
+
+def bicubic_filter(x: float, a: float = -0.5) -> float:
+    x = abs(x)
+    if x < 1.0:
+        return ((a + 2.0) * x - (a + 3.0)) * x * x + 1
+    if x < 2.0:
+        return (((x - 5) * x + 8) * x - 4) * a
+    return 0.0
+
+
+def resampling_coefficients(in_size: int, out_size: int) -> ndarray:
+    """
+    Fixed point bicubic coefficients computed exactly as Pillow does for 8 bit images
+    :param in_size: Length of the resampled axis
+    :param out_size: Length of the axis after resampling
+    :return: Matrix of shape (out_size, in_size)
+    """
+    scale = filterscale = in_size / out_size
+    if filterscale < 1.0:
+        filterscale = 1.0
+    support = 2.0 * filterscale
+    coefficients = zeros((out_size, in_size), dtype=float64)
+    for out_index in range(out_size):
+        center = (out_index + 0.5) * scale
+        x_min = max(int(center - support + 0.5), 0)
+        x_max = min(int(center + support + 0.5), in_size) - x_min
+        weights = [bicubic_filter((x + x_min - center + 0.5) / filterscale) for x in range(x_max)]
+        total = sum(weights)
+        for x, weight in enumerate(weights):
+            k = weight / total if total != 0.0 else weight
+            coefficients[out_index, x_min + x] = int(-0.5 + k * (1 << PRECISION_BITS)) if k < 0 \
+                else int(0.5 + k * (1 << PRECISION_BITS))
+    return coefficients
+
+
+class BicubicResampler:
+    """
+    Bit exact replacement of PIL's bicubic resize of 8 bit grayscale images, done as two matrix products.
+    Rows which are entirely black are skipped, as they do not contribute to the result.
+    """
+    def __init__(self, in_rows: int, in_columns: int, out_rows: int, out_columns: int):
+        self.row_coefficients = resampling_coefficients(in_rows, out_rows)
+        self.column_coefficients_t = resampling_coefficients(in_columns, out_columns).T.copy()
+        self.out_rows = out_rows
+        self.out_columns = out_columns
+
+    @staticmethod
+    def round_to_uint8(accumulator: ndarray) -> ndarray:
+        return clip(floor((accumulator + (1 << (PRECISION_BITS - 1))) / (1 << PRECISION_BITS)), 0, 255)
+
+    def resample(self, image: ndarray) -> ndarray:
+        rows = flatnonzero(image.any(axis=1))
+        if len(rows) == 0:
+            return zeros((self.out_rows, self.out_columns), dtype=uint8)
+        horizontal = self.round_to_uint8(image[rows].astype(float64) @ self.column_coefficients_t)
+        return self.round_to_uint8(self.row_coefficients[:, rows] @ horizontal).astype(uint8)
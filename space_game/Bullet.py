@@ -6,14 +6,13 @@ from space_game.Projectile import Projectile
 from space_game.domain_names import Coordinate, HitPoint, ObjectId
 from space_game.Entity import Entity
 from space_game.events.EventEmitter import EventEmitter
-from space_game.interfaces.Stateful import Stateful
+from space_game.interfaces.Expirable import Expirable
 from space_game.managers.EventManager import EventManager
 from space_game.events.DamageDealtEvent import DamageDealtEvent
 from space_game.events.ObjectDeletedEvent import ObjectDeletedEvent
-from space_game.managers.ObjectsManager import objects_manager
 
 
-class Bullet(Projectile, EventEmitter, Drawable, Stateful):
+class Bullet(Projectile, EventEmitter, Drawable, Expirable):
     def __init__(self, entity: Entity, damage: HitPoint, event_manager: EventManager):
         super().__init__()
         self.entity = entity
@@ -38,12 +37,18 @@ class Bullet(Projectile, EventEmitter, Drawable, Stateful):
 
     def update_state(self) -> None:
         if self.entity.is_at_constraints():
-            self.destroy()
+            self.expire()
+
+    def get_entity(self) -> Entity:
+        return self.entity
+
+    def expire(self) -> None:
+        self.destroy()
 
     def draw(self, window) -> None:
         self.entity.draw(window)
 
     def collide(self, target_id: ObjectId) -> None:
-        if issubclass(type(objects_manager.get_by_id(target_id)), Damagable):
+        if issubclass(type(self.event_manager.objects_manager.get_by_id(target_id)), Damagable):
             self.event_manager.add_event(DamageDealtEvent(target_id, self.damage))
             self.destroy()
@@ -1,24 +1,89 @@
-from dataclasses import dataclass
 from typing import Tuple
 
+from space_game.EntityStore import EntityStore
 from space_game.Screen import Screen
 from space_game.domain_names import Constraint, Coordinate, Acceleration
 
 
-@dataclass()
+class EntityField:
+    """
+    Exposes a single column of the EntityStore row backing an entity as a plain attribute
+    """
+    def __init__(self, cast=int):
+        self.cast = cast
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, entity, owner=None):
+        if entity is None:
+            return self
+        return self.cast(getattr(entity.store, self.name)[entity.row])
+
+    def __set__(self, entity, value) -> None:
+        getattr(entity.store, self.name)[entity.row] = value
+
+
 class Entity:
-    x: Coordinate
-    y: Coordinate
-    x_constraint: Constraint
-    y_constraint: Constraint
-    vertical_velocity: Acceleration
-    horizontal_velocity: Acceleration
-    width: int
-    height: int
-    color: Tuple[int, int, int]
-    max_velocity: Acceleration
-    acceleration: Acceleration = 0.
-    respect_constraints: bool = True
+    """
+    Thin view onto a row of an EntityStore. Until adopted by a shared store, the entity keeps its state
+    in a private single-row store, so it can be used standalone.
+    """
+    x = EntityField()
+    y = EntityField()
+    vertical_velocity = EntityField()
+    horizontal_velocity = EntityField()
+    width = EntityField()
+    height = EntityField()
+    max_velocity = EntityField()
+    acceleration = EntityField()
+    respect_constraints = EntityField(bool)
+
+    def __init__(
+            self,
+            x: Coordinate,
+            y: Coordinate,
+            x_constraint: Constraint,
+            y_constraint: Constraint,
+            vertical_velocity: Acceleration,
+            horizontal_velocity: Acceleration,
+            width: int,
+            height: int,
+            color: Tuple[int, int, int],
+            max_velocity: Acceleration,
+            acceleration: Acceleration = 0,
+            respect_constraints: bool = True
+    ):
+        self.store = EntityStore(capacity=1)
+        self.row = self.store.allocate()
+        self.color = color
+        self.x = x
+        self.y = y
+        self.x_constraint = x_constraint
+        self.y_constraint = y_constraint
+        self.vertical_velocity = vertical_velocity
+        self.horizontal_velocity = horizontal_velocity
+        self.width = width
+        self.height = height
+        self.max_velocity = max_velocity
+        self.acceleration = acceleration
+        self.respect_constraints = respect_constraints
+
+    @property
+    def x_constraint(self) -> Constraint:
+        return Constraint(int(self.store.x_min[self.row]), int(self.store.x_max[self.row]))
+
+    @x_constraint.setter
+    def x_constraint(self, constraint: Constraint) -> None:
+        self.store.x_min[self.row], self.store.x_max[self.row] = constraint
+
+    @property
+    def y_constraint(self) -> Constraint:
+        return Constraint(int(self.store.y_min[self.row]), int(self.store.y_max[self.row]))
+
+    @y_constraint.setter
+    def y_constraint(self, constraint: Constraint) -> None:
+        self.store.y_min[self.row], self.store.y_max[self.row] = constraint
 
     def draw(self, screen: Screen) -> None:
         screen.draw_rect(self.x, self.width, self.y, self.height, self.color)
@@ -0,0 +1,152 @@
+from typing import Dict, List, Tuple
+
+from numpy import zeros, int64, ndarray, flatnonzero
+
+FIELDS = (
+    'x', 'y', 'x_min', 'x_max', 'y_min', 'y_max', 'vertical_velocity', 'horizontal_velocity',
+    'width', 'height', 'max_velocity', 'acceleration', 'respect_constraints', 'active'
+)
+
+UNBOUNDED = 2 ** 62
+
+
+def count_valid_moves(position: int, velocity: int, low: int, high: int) -> int:
+    """
+    Number of consecutive upcoming moves at constant velocity for which low < position < high holds,
+    UNBOUNDED for a position that does not move and lies within the bounds
+    """
+    if not low < position + velocity < high:
+        return 0
+    if velocity == 0:
+        return UNBOUNDED
+    room = high - position if velocity > 0 else position - low
+    return -(-room // abs(velocity)) - 1
+
+
+class EntityStore:
+    """
+    Struct-of-arrays storage of entity state. Every field is a contiguous row of a single int64 array,
+    so movement and constraint checks of all active entities are performed with a handful of array operations.
+    """
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.data = zeros((len(FIELDS), capacity), dtype=int64)
+        self.free_rows: List[int] = list(reversed(range(capacity)))
+        self.bind_fields()
+
+    def bind_fields(self) -> None:
+        for index, field in enumerate(FIELDS):
+            setattr(self, field, self.data[index])
+
+    def __getstate__(self) -> dict:
+        return {key: value for key, value in self.__dict__.items() if key not in FIELDS}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.bind_fields()
+
+    def grow(self) -> None:
+        new_capacity = self.capacity * 2
+        data = zeros((len(FIELDS), new_capacity), dtype=int64)
+        data[:, :self.capacity] = self.data
+        self.free_rows = list(reversed(range(self.capacity, new_capacity))) + self.free_rows
+        self.data = data
+        self.capacity = new_capacity
+        self.bind_fields()
+
+    def allocate(self) -> int:
+        if not self.free_rows:
+            self.grow()
+        return self.free_rows.pop()
+
+    def free(self, row: int) -> None:
+        self.data[:, row] = 0
+        self.free_rows.append(row)
+
+    def adopt(self, entity) -> None:
+        """
+        Move entity state into this store and make it part of the vectorized updates
+        """
+        if entity.store is self:
+            return
+        row = self.allocate()
+        self.data[:, row] = entity.store.data[:, entity.row]
+        self.active[row] = 1
+        entity.store.free(entity.row)
+        entity.store, entity.row = self, row
+
+    def release(self, entity) -> None:
+        """
+        Move entity state out into a private single-row store, so the entity stays readable after removal
+        """
+        if entity.store is not self:
+            return
+        store = EntityStore(capacity=1)
+        row = store.allocate()
+        store.data[:, row] = self.data[:, entity.row]
+        store.active[row] = 0
+        self.free(entity.row)
+        entity.store, entity.row = store, row
+
+    def move_horizontally(self) -> None:
+        new_x = self.x + self.horizontal_velocity
+        valid = (new_x > self.x_min) & (new_x + self.width < self.x_max)
+        active = self.active.astype(bool)
+        self.x[active & valid] = new_x[active & valid]
+        self.horizontal_velocity[active & ~valid & self.respect_constraints.astype(bool)] = 0
+
+    def move_vertically(self) -> None:
+        new_y = self.y + self.vertical_velocity
+        valid = (new_y > self.y_min) & (new_y + self.height < self.y_max)
+        active = self.active.astype(bool)
+        self.y[active & valid] = new_y[active & valid]
+        self.vertical_velocity[active & ~valid & self.respect_constraints.astype(bool)] = 0
+
+    def update_positions(self) -> None:
+        self.move_horizontally()
+        self.move_vertically()
+
+    def read_rows(self, rows: List[int]) -> Dict[str, List[int]]:
+        """
+        :return: Values of every field for rows, as plain lists
+        """
+        return dict(zip(FIELDS, self.data[:, rows].tolist()))
+
+    def count_valid_moves(self) -> Dict[int, Tuple[int, int]]:
+        """
+        :return: For every active row, the number of consecutive upcoming moves at constant velocity that stay within
+        constraints along both axes, and the number of moves that neither stop the entity nor change its velocity.
+        A failed move along an axis the entity does not move along changes nothing, so it limits only the former.
+        """
+        rows = flatnonzero(self.active).tolist()
+        state = self.read_rows(rows)
+        counts = {}
+        for row, x, y, x_min, x_max, y_min, y_max, vertical_velocity, horizontal_velocity, width, height in zip(
+                rows, state['x'], state['y'], state['x_min'], state['x_max'], state['y_min'], state['y_max'],
+                state['vertical_velocity'], state['horizontal_velocity'], state['width'], state['height']
+        ):
+            horizontal = count_valid_moves(x, horizontal_velocity, x_min, x_max - width)
+            vertical = count_valid_moves(y, vertical_velocity, y_min, y_max - height)
+            counts[row] = (
+                min(horizontal, vertical),
+                min(horizontal if horizontal_velocity else UNBOUNDED, vertical if vertical_velocity else UNBOUNDED)
+            )
+        return counts
+
+    def advance(self, moves: int) -> None:
+        """
+        Move every active entity by moves steps at once, valid only if none of the moves fails
+        """
+        active = self.active.astype(bool)
+        self.x[active] += moves * self.horizontal_velocity[active]
+        self.y[active] += moves * self.vertical_velocity[active]
+
+    def is_at_constraints(self) -> ndarray:
+        new_x = self.x + self.horizontal_velocity
+        new_y = self.y + self.vertical_velocity
+        vertical_constraint = (new_y > self.y_min) & (new_y + self.height < self.y_max)
+        horizontal_constraint = (new_x > self.x_min) & (new_x + self.width < self.x_max)
+        return self.active.astype(bool) & (~vertical_constraint | ~horizontal_constraint)
+
+    def rows_at_constraints(self) -> ndarray:
+        return flatnonzero(self.is_at_constraints())
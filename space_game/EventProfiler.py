@@ -0,0 +1,74 @@
+from collections import defaultdict
+from time import perf_counter
+from typing import Any, DefaultDict
+
+
+class EventProfiler:
+    """
+    Opt-in instrumentation of EventManager.process_events. Every call of process_events is one tick
+    (a single GameController.__refresh__), for which events are counted and timed per event type, processors are
+    timed per processor type and the queue depth is tracked. Counters are aggregated until flushed.
+    Timing of an event type includes all its processors, so Update*Event types give the phases of a tick.
+    The batched deletion pass is accounted to the EventManager processor.
+    """
+    def __init__(self):
+        self.ticks = 0
+        self.event_counts: DefaultDict[type, int] = defaultdict(int)
+        self.event_times: DefaultDict[type, float] = defaultdict(float)
+        self.processor_times: DefaultDict[type, float] = defaultdict(float)
+        self.queue_depth_total = 0
+        self.queue_depth_max = 0
+
+    def reset(self) -> None:
+        self.ticks = 0
+        self.event_counts.clear()
+        self.event_times.clear()
+        self.processor_times.clear()
+        self.queue_depth_total = 0
+        self.queue_depth_max = 0
+
+    def process_events(self, event_manager) -> None:
+        """
+        Instrumented equivalent of EventManager.process_events
+        """
+        queue = event_manager.event_queue
+        event_processors = event_manager.event_processors
+        self.ticks += 1
+        depth = len(queue)
+        while len(queue) > 0 or len(event_manager.pending_deletions) > 0:
+            while len(queue) > 0:
+                depth = max(depth, len(queue))
+                event = queue.popleft()
+                event_type = type(event)
+                event_start = perf_counter()
+                for processor in event_processors[event_type].values():
+                    start = perf_counter()
+                    processor.process_event(event)
+                    self.processor_times[type(processor)] += perf_counter() - start
+                self.event_times[event_type] += perf_counter() - event_start
+                self.event_counts[event_type] += 1
+            start = perf_counter()
+            event_manager.apply_pending_deletions()
+            self.processor_times[type(event_manager)] += perf_counter() - start
+        self.queue_depth_total += depth
+        self.queue_depth_max = max(self.queue_depth_max, depth)
+
+    def flush(self, writer: Any, step: int) -> None:
+        """
+        Write per tick averages of the collected counters and start collecting anew
+        :param writer: TensorBoard SummaryWriter
+        """
+        if self.ticks == 0:
+            return
+        writer.add_scalar("Profiling/ticks", self.ticks, step)
+        writer.add_scalar("Profiling/queue depth mean", self.queue_depth_total / self.ticks, step)
+        writer.add_scalar("Profiling/queue depth max", self.queue_depth_max, step)
+        for event_type, count in self.event_counts.items():
+            writer.add_scalar(f"Profiling/events per tick/{event_type.__name__}", count / self.ticks, step)
+        for event_type, seconds in self.event_times.items():
+            writer.add_scalar(f"Profiling/event ms per tick/{event_type.__name__}", seconds / self.ticks * 1e3, step)
+        for processor_type, seconds in self.processor_times.items():
+            writer.add_scalar(
+                f"Profiling/processor ms per tick/{processor_type.__name__}", seconds / self.ticks * 1e3, step
+            )
+        self.reset()
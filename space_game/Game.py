@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Optional
 
 import pygame
 import pygame.locals
@@ -19,10 +20,16 @@ logger = logging.getLogger()
 
 
 class Game:
-    def __init__(self, config: Config, max_game_length=10000):
-        self.game_controller = GameController(config, renderable=True)
+    def __init__(self, config: Config, max_game_length=10000, headless: bool = False):
+        """
+        :param headless: Whether the game runs without a window, clock throttling and keyboard polling,
+        as fast as possible, e.g. for evaluation and tournaments. Headless games are played by AI controllers only
+        and end with the same results as interactive ones.
+        """
+        self.game_controller = GameController(config, renderable=not headless)
         self.config = config
-        self.clock = pygame.time.Clock()
+        self.headless = headless
+        self.clock = None if headless else pygame.time.Clock()
         self.running = True
         self.player_1_tuple = None
         self.player_2_tuple = None
@@ -35,6 +42,12 @@ class Game:
         self.player_2_tuple = player_2_tuple
 
     def start(self):
+        if self.headless and not all(
+                player_tuple is not None and player_tuple.ai_controller is not None
+                and player_tuple.keyboard_controller is None
+                for player_tuple in (self.player_1_tuple, self.player_2_tuple)
+        ):
+            raise ValueError("Headless games are played by AI controllers only")
         if self.player_1_tuple is not None:
             player_1, p1_keyboard_controller, p1_ai_controller = \
                 self.player_1_tuple.player, self.player_1_tuple.keyboard_controller, self.player_1_tuple.ai_controller
@@ -72,6 +85,9 @@ class Game:
             self.game_controller.__add_ai_controller__(ai_2)
             self.game_controller.__add_player__(player_2)
 
+        if self.headless:
+            return self.run_headless()
+
         screenshooter = Screenshooter(self.config, id(player_1), constants.SCREENSHOTS_DIRECTORY, self.game_controller.screen)
         screenshooter.register(self.game_controller.event_manager)
         pressed_keys = {}
@@ -90,16 +106,35 @@ class Game:
             for key, val in pressed_keys.items():
                 if val:
                     self.game_controller.event_manager.add_event(KeyPressedEvent(key))
-            self.game_controller.__refresh__()
-            winner = self.game_controller.is_game_over()
-            if winner == Winner.PLAYER1:
-                return Winner.PLAYER1
-            if winner == Winner.PLAYER2:
-                return Winner.PLAYER2
-            if self.max_game_length <= 0:
-                return Winner.DRAW
-            else:
-                self.max_game_length -= 1
+            result = self.resolve_frame()
+            if result is not None:
+                return result
 
         pygame.display.update()
         pygame.time.wait(5000)
+
+    def run_headless(self) -> Winner:
+        """
+        Resolve frames until the game ends. The screen is only drawn in frames in which an AI controller reads it,
+        see GameController.__refresh__.
+        """
+        while True:
+            result = self.resolve_frame(draw=False)
+            if result is not None:
+                return result
+
+    def resolve_frame(self, draw: bool = True) -> Optional[Winner]:
+        """
+        :return: Winner of the game, DRAW once max_game_length frames passed, None while the game goes on
+        """
+        self.game_controller.__refresh__(draw)
+        winner = self.game_controller.is_game_over()
+        if winner == Winner.PLAYER1:
+            return Winner.PLAYER1
+        if winner == Winner.PLAYER2:
+            return Winner.PLAYER2
+        if self.max_game_length <= 0:
+            return Winner.DRAW
+        else:
+            self.max_game_length -= 1
+        return None
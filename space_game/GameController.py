@@ -1,14 +1,17 @@
-from typing import List
+from typing import Any, List
 
 import pygame
 
 from space_game.AccelerationDirection import AccelerationDirection
 from space_game.Config import Config
+from space_game.EntityStore import EntityStore
+from space_game.GameSnapshot import GameSnapshot
 from space_game.InformationDisplay import InformationDisplay
 from space_game.KeyboardController import KeyboardController
 from space_game.Player import Player
 from space_game.Screen import Screen
 from space_game.ai.AIController import AIController
+from space_game.broad_phase.UniformGridBroadPhase import UniformGridBroadPhase
 from space_game.events.PlayerAcceleratedEvent import PlayerAcceleratedEvent
 from space_game.events.PlayerShootsEvent import PlayerShootsEvent
 from space_game.events.creation_events.NewDrawableAddedEvent import NewDrawableAddedEvent
@@ -18,18 +21,33 @@ from space_game.events.update_events.UpdateAIControllersEvent import UpdateAICon
 from space_game.events.update_events.UpdateDrawablesEvent import UpdateDrawablesEvent
 from space_game.events.update_events.UpdateMovablesEvent import UpdateMovablesEvent
 from space_game.events.update_events.UpdateStatefulsEvent import UpdateStatefulsEvent
+from space_game.interfaces.Movable import Movable
 from space_game.managers.CollisionManager import CollisionManager
 from space_game.managers.DrawableManager import DrawableManager
 from space_game.managers.EventManager import EventManager
 from space_game.managers.KeyboardEventsProcessor import KeyboardEventsProcessor
 from space_game.managers.MovableManager import MovableManager
+from space_game.managers.ObjectsManager import ObjectsManager
 from space_game.managers.StatefulsManager import StatefulsManager
 from space_game.Winner import Winner
 
 
 class GameController:
-    def __init__(self, config: Config, renderable: bool = False):
+    def __init__(
+            self,
+            config: Config,
+            renderable: bool = False,
+            synchronous_registration: bool = False,
+            macro_step: bool = False
+    ):
+        """
+        :param synchronous_registration: Whether registration events are dispatched as soon as they are added,
+        see EventManager
+        :param macro_step: Whether advance resolves ticks in which objects only move at constant velocity at once,
+        see count_quiet_ticks
+        """
         self.renderable = renderable
+        self.macro_step = macro_step
         if renderable:
             self.window = pygame.display.set_mode((config.width, config.height))
         self.config = config
@@ -38,13 +56,20 @@ class GameController:
             height=config.height,
             n_channels=3,
             scaled_width=config.scaled_width,
-            scaled_height=config.scaled_height
+            scaled_height=config.scaled_height,
+            keep_rgb=renderable
         )
-        self.event_manager = EventManager()
-        self.drawable_manager = DrawableManager(config, self.screen)
-        self.collision_manager = CollisionManager(event_manager=self.event_manager)
-        self.movable_manager = MovableManager()
-        self.stateful_manager = StatefulsManager()
+        self.objects_manager = ObjectsManager()
+        self.event_manager = EventManager(self.objects_manager, synchronous_registration)
+        self.entity_store = EntityStore()
+        self.drawable_manager = DrawableManager(config, self.screen, self.objects_manager)
+        self.collision_manager = CollisionManager(
+            event_manager=self.event_manager,
+            broad_phase=UniformGridBroadPhase.from_config(config)
+        )
+        self.movable_manager = MovableManager(self.objects_manager, self.entity_store)
+        self.movable_manager.add_movement_observer(self.collision_manager)
+        self.stateful_manager = StatefulsManager(self.objects_manager, self.entity_store)
         self.keyboard_processor = KeyboardEventsProcessor(event_manager=self.event_manager)
         self.drawable_manager.register(self.event_manager)
         self.collision_manager.register(self.event_manager)
@@ -52,17 +77,110 @@ class GameController:
         self.stateful_manager.register(self.event_manager)
         self.keyboard_processor.register(self.event_manager)
         self.players: List[Player] = []
+        self.ai_controllers: List[AIController] = []
+
+    def __refresh__(self, draw: bool = True):
+        """
+        Resolve single frame of the game
+        :param draw: Whether the screen has to be repainted in this frame.
+        Frame is drawn anyway when the game is rendered or any AI controller reads the screen in this frame.
+        """
+        self.add_frame_events(draw)
+        self.event_manager.process_events()
+        if self.renderable:
+            self.render_screen()
 
-    def __refresh__(self):
-        self.event_manager.add_event(UpdateDrawablesEvent())
+    def add_frame_events(self, draw: bool) -> None:
+        if draw or self.renderable or self.is_screen_needed():
+            self.event_manager.add_event(UpdateDrawablesEvent())
         self.event_manager.add_event(UpdateMovablesEvent())
         self.event_manager.add_event(UpdateStatefulsEvent())
         self.event_manager.add_event(CheckCollisionsEvent())
         self.event_manager.add_event(UpdateAIControllersEvent())
 
-        self.event_manager.process_events()
-        if self.renderable:
-            self.render_screen()
+    def advance(self, ticks: int, pooled_ticks: int = 1) -> None:
+        """
+        Resolve ticks frames, only the last pooled_ticks of which are drawn. The observation of the screen is
+        the element-wise maximum over the drawn frames, see Screen.pool_observation.
+        With pooled_ticks 0 no frame is drawn unless the game is rendered or an AI controller reads the screen,
+        e.g. when observations are not read from the screen.
+        With macro_step, runs of quiet ticks are resolved at once, see count_quiet_ticks.
+        """
+        first_drawn = ticks - pooled_ticks
+        pooled = None
+        if not self.macro_step or self.renderable:
+            for frame in range(ticks):
+                self.__refresh__(draw=frame >= first_drawn)
+                if frame >= first_drawn and pooled_ticks > 1:
+                    pooled = self.screen.pool_observation(pooled)
+            return
+        event_queue = self.event_manager.event_queue
+        # events queued before the first frame, e.g. actions, are the first ones it dispatches,
+        # while the events they emit follow the frame's own events
+        self.event_manager.dispatch_queued_events()
+        frame = 0
+        while frame < ticks:
+            held_events = list(event_queue)
+            event_queue.clear()
+            limit = first_drawn - frame
+            quiet_ticks = self.count_quiet_ticks(min(limit, 1) if held_events else limit)
+            drawn = False
+            if quiet_ticks > 0:
+                self.skip_ticks(quiet_ticks)
+                frame += quiet_ticks
+            else:
+                drawn = frame >= first_drawn
+                self.add_frame_events(draw=drawn)
+                frame += 1
+            event_queue.extend(held_events)
+            self.event_manager.process_events()
+            if drawn and pooled_ticks > 1:
+                pooled = self.screen.pool_observation(pooled)
+
+    def count_quiet_ticks(self, limit: int) -> int:
+        """
+        Number of upcoming ticks, at most limit, that change nothing but positions and counters: no event is queued,
+        no AI controller reacts, no entity stops at or expires on its constraints and no collisables collide.
+        Collisions are predicted for the sampled positions of every tick, so the outcome equals frame by frame
+        resolution, tunnelling included.
+        :return: 0 whenever the game holds objects the prediction does not cover
+        """
+        event_manager = self.event_manager
+        if limit <= 0 or self.renderable or event_manager.event_queue or event_manager.pending_deletions:
+            return 0
+        tick_managers = {
+            UpdateMovablesEvent: self.movable_manager,
+            UpdateStatefulsEvent: self.stateful_manager,
+            CheckCollisionsEvent: self.collision_manager
+        }
+        for event_type, manager in tick_managers.items():
+            if event_manager.event_processors[event_type].keys() != {id(manager)}:
+                return 0
+        ai_controllers = event_manager.event_processors[UpdateAIControllersEvent].values()
+        if not all(isinstance(ai_controller, AIController) for ai_controller in ai_controllers):
+            return 0
+        if self.movable_manager.standalone_movables or not self.stateful_manager.can_skip_ticks():
+            return 0
+
+        quiet_ticks = min([limit] + [ai_controller.count_idle_ticks() for ai_controller in ai_controllers])
+        if quiet_ticks == 0:
+            return 0
+        expirables_by_row = self.stateful_manager.expirables_by_row
+        for row, (valid_moves, unchanged_moves) in self.entity_store.count_valid_moves().items():
+            # expirables expire in the tick after which their next move would fail
+            quiet_ticks = min(quiet_ticks, valid_moves - 1 if row in expirables_by_row else unchanged_moves)
+        if quiet_ticks <= 0:
+            return 0
+        return self.collision_manager.count_collision_free_ticks(self.entity_store, quiet_ticks)
+
+    def skip_ticks(self, ticks: int) -> None:
+        """
+        Resolve quiet ticks at once, see count_quiet_ticks
+        """
+        self.movable_manager.skip_ticks(ticks)
+        self.stateful_manager.skip_ticks(ticks)
+        for ai_controller in self.event_manager.event_processors[UpdateAIControllersEvent].values():
+            ai_controller.skip_ticks(ticks)
 
     def __add_player__(self, player: Player, keyboard_controller: KeyboardController = None) -> None:
         player.register(self.event_manager)
@@ -99,6 +217,10 @@ class GameController:
 
     def __add_ai_controller__(self, ai_controller: AIController):
         ai_controller.register(self.event_manager)
+        self.ai_controllers.append(ai_controller)
+
+    def is_screen_needed(self) -> bool:
+        return any(ai_controller.needs_screen() for ai_controller in self.ai_controllers)
 
     def render_screen(self) -> None:
         surf = self.screen.convert_to_pygame_surface()
@@ -112,6 +234,45 @@ class GameController:
             return Winner.PLAYER1
         return Winner.NOBODY
 
+    def get_state_objects(self) -> List[Any]:
+        """
+        :return: Every object holding simulation state: the controller, its managers and all registered objects,
+        including the ones waiting for registration in the event queue, together with their entities
+        """
+        objects = [
+            self, self.objects_manager, self.event_manager, self.entity_store, self.screen,
+            self.drawable_manager, self.collision_manager, self.collision_manager.broad_phase, self.movable_manager,
+            self.stateful_manager, self.keyboard_processor, *self.players, *self.ai_controllers,
+            *self.objects_manager.objects.values(),
+            *(event.new_object for event in self.event_manager.event_queue if type(event) is NewObjectCreatedEvent)
+        ]
+        for o in list(objects):
+            if isinstance(o, Movable) and o.get_entity() is not None:
+                objects.append(o.get_entity())
+                if o.get_entity().store is not self.entity_store:
+                    objects.append(o.get_entity().store)
+        return list({id(o): o for o in objects}.values())
+
+    def snapshot(self) -> GameSnapshot:
+        """
+        Captures the full simulation state, so the game can be brought back to it with restore, e.g. to reset
+        to a pristine initial state or to look ahead from the middle of an episode.
+        Configs, AI models and the module level random generator are not a part of the state.
+        """
+        return GameSnapshot(self.get_state_objects())
+
+    def restore(self, snapshot: GameSnapshot) -> None:
+        if snapshot.objects[0] is not self:
+            raise ValueError("Snapshot was captured from a different GameController")
+        snapshot.restore()
+
+    def release(self) -> None:
+        """
+        Unregisters every object of the game, so it can be garbage collected once the controller is dropped
+        """
+        self.event_manager.clear()
+        self.players.clear()
+        self.ai_controllers.clear()
 
     def __del__(self):
         self.screen.screen = None
@@ -0,0 +1,61 @@
+from collections import defaultdict, deque
+from typing import Any, Dict, Iterable, List
+
+from numpy import ndarray
+
+
+def copy_state(value: Any, memo: Dict[int, Any]) -> Any:
+    """
+    Copies plain data (builtin containers and arrays) recursively. Every other object is kept by reference.
+    """
+    value_type = type(value)
+    if value_type not in (dict, defaultdict, list, deque, set, tuple, ndarray):
+        return value
+    if id(value) in memo:
+        return memo[id(value)]
+    if value_type is ndarray:
+        copied = value.copy()
+    elif value_type is dict:
+        copied = {key: copy_state(item, memo) for key, item in value.items()}
+    elif value_type is defaultdict:
+        copied = defaultdict(value.default_factory, {key: copy_state(item, memo) for key, item in value.items()})
+    elif value_type is list:
+        copied = [copy_state(item, memo) for item in value]
+    elif value_type is deque:
+        copied = deque((copy_state(item, memo) for item in value), value.maxlen)
+    elif value_type is set:
+        copied = set(value)
+    else:
+        copied = tuple(copy_state(item, memo) for item in value)
+    memo[id(value)] = copied
+    return copied
+
+
+def get_state(o: Any) -> dict:
+    return o.__getstate__() if hasattr(o, '__setstate__') else vars(o)
+
+
+def set_state(o: Any, state: dict) -> None:
+    o.__dict__.clear()
+    if hasattr(o, '__setstate__'):
+        o.__setstate__(state)
+    else:
+        o.__dict__.update(state)
+
+
+class GameSnapshot:
+    """
+    State of a fixed set of game objects. Objects are held by reference, so their ids, which key every registry
+    of the game, stay valid; only their attributes are copied. Objects created after the capture are dropped
+    from the game on restore, objects deleted since are brought back. Snapshot can be restored any number of times.
+    """
+    def __init__(self, objects: Iterable[Any]):
+        self.objects: List[Any] = list(objects)
+        states = [get_state(o) for o in self.objects]
+        memo = {}
+        self.states: List[dict] = [copy_state(state, memo) for state in states]
+
+    def restore(self) -> None:
+        memo = {}
+        for o, state in zip(self.objects, self.states):
+            set_state(o, copy_state(state, memo))
@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import Tuple, Any, Callable
 
 import pygame
 
@@ -71,6 +71,9 @@ class Player(Movable, Damagable, Collisable, EventEmitter, EventProcessor, Drawa
     def process_event(self, event: Event):
         self.game_event_resolver.get(type(event))(event)
 
+    def get_event_handler(self, event_type: Any) -> Callable[[Event], None]:
+        return self.game_event_resolver.get(event_type)
+
     def process_acceleration_event(self, event: PlayerAcceleratedEvent):
         if event.player_id == id(self):
             if event.direction == AccelerationDirection.LEFT:
@@ -101,6 +104,9 @@ class Player(Movable, Damagable, Collisable, EventEmitter, EventProcessor, Drawa
     def update_position(self) -> None:
         self.entity.update_position()
 
+    def get_entity(self) -> Entity:
+        return self.entity
+
     def shoot(self) -> None:
         if self.shoot_countdown <= 0 and self.ammo_left > 0:
             bullet = Bullet(
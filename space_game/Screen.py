@@ -1,30 +1,100 @@
-from typing import Tuple
+from typing import Dict, Optional, Tuple
 
 from PIL.Image import fromarray
-from numpy import zeros, array, uint8, expand_dims
+from numpy import zeros, array, uint8, expand_dims, ndarray, flip, ascontiguousarray, maximum
 from pygame.surfarray import make_surface
 from pygame import Surface
 
+from space_game.BicubicResampler import BicubicResampler
+
+Color = Tuple[int, int, int]
+
 
 class Screen:
-    def __init__(self, width: int, height: int, n_channels: int, scaled_height: int, scaled_width: int) -> None:
+    """
+    Drawing target of the game. Drawables are rasterized into a grayscale buffer, from which observations
+    are resampled. Full color buffer is only kept when keep_rgb is set (rendering, recording).
+    Processed observations are memoized until the screen is painted again, so arrays returned by process_map
+    and process_flipped_map are shared between readers and must not be modified.
+    """
+    def __init__(
+            self,
+            width: int,
+            height: int,
+            n_channels: int,
+            scaled_height: int,
+            scaled_width: int,
+            keep_rgb: bool = True
+    ) -> None:
         self.width = width
         self.height = height
         self.n_channels = n_channels
-        self.screen = zeros((self.width, self.height, self.n_channels), dtype=uint8)
         self.scaled_height = scaled_height
         self.scaled_width = scaled_width
+        self.keep_rgb = keep_rgb
+        self.screen = zeros((self.width, self.height, self.n_channels), dtype=uint8) if keep_rgb else None
+        self.grayscale = zeros((self.width, self.height), dtype=uint8)
+        self.grayscale_colors: Dict[Color, int] = {}
+        self.resampler = BicubicResampler(self.width, self.height, self.scaled_width, self.scaled_height)
+        self.frame = 0
+        self.observation: Optional[ndarray] = None
+        self.flipped_observation: Optional[ndarray] = None
+
+    def invalidate(self) -> None:
+        self.observation = None
+        self.flipped_observation = None
+
+    def enable_rgb(self) -> None:
+        """
+        Starts keeping the full color buffer, which is filled from the next redraw on
+        """
+        if not self.keep_rgb:
+            self.keep_rgb = True
+            self.screen = zeros((self.width, self.height, self.n_channels), dtype=uint8)
 
     def reset_screen(self) -> None:
-        self.screen = zeros((self.width, self.height, self.n_channels), dtype=uint8)
+        self.frame += 1
+        self.invalidate()
+        self.grayscale.fill(0)
+        if self.keep_rgb:
+            self.screen.fill(0)
 
-    def draw_rect(self, x: int, width: int, y: int, height: int, pxl: Tuple[int, int, int]) -> None:
-        self.screen[x:x+width, y:y+height] = array(pxl)
+    def to_grayscale(self, pxl: Color) -> int:
+        pxl = tuple(pxl)
+        if pxl not in self.grayscale_colors:
+            self.grayscale_colors[pxl] = fromarray(array([[pxl]], dtype=uint8)).convert('L').getpixel((0, 0))
+        return self.grayscale_colors[pxl]
+
+    def draw_rect(self, x: int, width: int, y: int, height: int, pxl: Color) -> None:
+        self.invalidate()
+        self.grayscale[x:x+width, y:y+height] = self.to_grayscale(pxl)
+        if self.keep_rgb:
+            self.screen[x:x+width, y:y+height] = array(pxl)
 
     def convert_to_pygame_surface(self) -> Surface:
         return make_surface(self.screen)
 
-    def process_map(self):
-        array_processed = array(fromarray(self.screen).convert('L').resize(
-            size=(self.scaled_height, self.scaled_width)))
-        return expand_dims(array_processed, axis=-1)
+    def process_map(self) -> ndarray:
+        if self.observation is None:
+            self.observation = expand_dims(self.resampler.resample(self.grayscale), axis=-1)
+        return self.observation
+
+    def process_flipped_map(self) -> ndarray:
+        """
+        Observation as seen from the DOWN side (mirrored along the second axis)
+        """
+        if self.flipped_observation is None:
+            self.flipped_observation = ascontiguousarray(flip(self.process_map(), axis=1))
+        return self.flipped_observation
+
+    def pool_observation(self, pooled: Optional[ndarray]) -> ndarray:
+        """
+        Max-pool the observation of the current frame with the ones of previous frames
+        :param pooled: Observation pooled over previous frames, None at the first pooled frame
+        :return: Observation pooled up to the current frame, which process_map returns until the screen is repainted
+        """
+        observation = self.process_map()
+        if pooled is not None:
+            self.observation = maximum(observation, pooled)
+            self.flipped_observation = None
+        return self.observation
@@ -1,4 +1,5 @@
 import numpy as np
+from typing import Any, Callable
 from pathlib import Path
 from time import time
 
@@ -37,6 +38,9 @@ class Screenshooter(EventProcessor, Registrable):
     def process_event(self, event: Event):
         self.event_resolver[type(event)](event)
 
+    def get_event_handler(self, event_type: Any) -> Callable[[Event], None]:
+        return self.event_resolver[event_type]
+
     def process_player_accelerated_event(self, event: PlayerAcceleratedEvent):
         if event.player_id == self.player_id:
             if event.direction == AccelerationDirection.LEFT:
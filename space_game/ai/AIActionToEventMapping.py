@@ -1,4 +1,4 @@
-from typing import List, Callable, Dict
+from typing import List, Callable, Dict, Tuple
 
 from space_game.events.PlayerAcceleratedEvent import PlayerAcceleratedEvent
 from space_game.events.PlayerShootsEvent import PlayerShootsEvent
@@ -34,6 +34,15 @@ AIActionToEventMapping: Dict[AIAction, Callable[[PlayerId], List[Event]]] = {
 
 
 }
+
+
+def compile_action_events(player_id: PlayerId) -> Dict[AIAction, Tuple[Event, ...]]:
+    """
+    Events of every action of a single player, created once and reused on every step, as events are never modified
+    """
+    return {action: tuple(to_events(player_id)) for action, to_events in AIActionToEventMapping.items()}
+
+
 # StandStill = auto()
 #
 # MoveLeft = auto()
@@ -1,6 +1,8 @@
 from space_game.Config import Config
 from space_game.Player import Player
 from space_game.Screen import Screen
+from space_game.ai.AIAction import AIAction
+from space_game.ai.AIActionToEventMapping import compile_action_events
 from space_game.domain_names import Side
 from space_game.events.EventEmitter import EventEmitter
 from space_game.events.EventProcessor import EventProcessor
@@ -13,6 +15,8 @@ from space_game.events.Event import Event
 
 
 class AIController(EventEmitter, EventProcessor, Registrable):
+    reads_screen = True
+
     def __init__(self, event_manager: EventManager, config: Config, player: Player, opponent: Player, side: Side, screen: Screen):
         super().__init__(event_manager)
         self.config = config
@@ -24,6 +28,7 @@ class AIController(EventEmitter, EventProcessor, Registrable):
         }
         self.player = player
         self.screen = screen
+        self.action_events = compile_action_events(id(player))
 
     def process_event(self, event: Event):
         if self.lag_count_left <= 0:
@@ -35,9 +40,30 @@ class AIController(EventEmitter, EventProcessor, Registrable):
     def process_update_ai_controllers_event(self, event: UpdateAIControllersEvent):
         self.react()
 
+    def count_idle_ticks(self) -> int:
+        """
+        Number of upcoming UpdateAIControllersEvents the controller lets pass without reacting
+        """
+        return max(self.lag_count_left, 0)
+
+    def skip_ticks(self, ticks: int) -> None:
+        """
+        Account for ticks idle ticks resolved without dispatching UpdateAIControllersEvents
+        """
+        self.lag_count_left -= ticks
+
+    def needs_screen(self) -> bool:
+        """
+        Whether the controller reads the screen when the next UpdateAIControllersEvent is processed
+        """
+        return self.reads_screen and self.lag_count_left <= 0
+
     def get_current_map(self):
         return self.screen.process_map()
 
+    def get_current_flipped_map(self):
+        return self.screen.process_flipped_map()
+
     def react(self):
         """
         React to current situation on the map
@@ -45,6 +71,10 @@ class AIController(EventEmitter, EventProcessor, Registrable):
         """
         pass
 
+    def perform(self, action: AIAction) -> None:
+        for event in self.action_events[action]:
+            self.event_manager.add_event(event)
+
     def register(self, event_manager: EventManager):
         event_manager.add_event(NewObjectCreatedEvent(self))
         event_manager.add_event(NewEventProcessorAddedEvent(id(self), UpdateAIControllersEvent))
@@ -1,7 +1,5 @@
 from pathlib import Path
 
-import numpy as np
-
 from common.utils import inverse_movement
 from space_game.Screen import Screen
 from space_game.ai.AIController import AIController
@@ -9,7 +7,6 @@ from space_game.Config import Config
 from space_game.Player import Player
 from space_game.domain_names import Side
 from space_game.managers.EventManager import EventManager
-from space_game.ai.AIActionToEventMapping import AIActionToEventMapping
 from common.DQNWrapper import DQNWrapper
 
 import torch
@@ -30,12 +27,10 @@ class CDQNController(AIController):
                 self.dqn_wrapper = DQNWrapper.from_file(dqn_path)
 
     def react(self):
-        current_map = self.get_current_map()
         if self.side == Side.UP:
-            choice = self.dqn_wrapper.predict(current_map)
+            choice = self.dqn_wrapper.predict(self.get_current_map())
         else:
-            choice = self.dqn_wrapper.predict(np.flip(current_map, axis=1).copy())
+            choice = self.dqn_wrapper.predict(self.get_current_flipped_map())
             choice = inverse_movement(choice)
 
-        for event in AIActionToEventMapping[choice](id(self.player)):
-            self.event_manager.add_event(event)
+        self.perform(choice)
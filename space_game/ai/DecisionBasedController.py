@@ -2,7 +2,6 @@ from typing import Dict, List, Union
 from random import randint
 
 from space_game.Screen import Screen
-from space_game.ai.AIActionToEventMapping import AIActionToEventMapping
 from space_game.Config import Config
 from space_game.Player import Player
 from space_game.Projectile import Projectile
@@ -14,7 +13,6 @@ from space_game.events.creation_events.NewEventProcessorAddedEvent import NewEve
 from space_game.managers.EventManager import EventManager
 from space_game.events.ProjectileFiredEvent import ProjectileFiredEvent
 from space_game.events.ObjectDeletedEvent import ObjectDeletedEvent
-from space_game.managers.ObjectsManager import objects_manager
 
 
 def random_vertical_action_modifier() -> Union[AIAction, bool]:
@@ -32,6 +30,8 @@ def shooting_modifier() -> AIAction:
 
 
 class DecisionBasedController(AIController):
+    reads_screen = False
+
     def __init__(self, event_manager: EventManager, config: Config, player: Player, opponent: Player, side: Side, screen: Screen):
         super().__init__(event_manager, config, player, opponent, side, screen)
         self.opponent = opponent
@@ -64,8 +64,7 @@ class DecisionBasedController(AIController):
         choice +=  random_vertical_action_modifier()
         if self.is_opponent_in_interaction_site():
             choice += AIAction.Shoot
-        for event in AIActionToEventMapping[choice](id(self.player)):
-            self.event_manager.add_event(event)
+        self.perform(choice)
 
     def process_event(self, event: Event) -> None:
         if self.lag_count_left <= 0:
@@ -75,7 +74,8 @@ class DecisionBasedController(AIController):
 
     def process_projectile_fired_event(self, event: ProjectileFiredEvent) -> None:
         if event.shooter_id == id(self.opponent):
-            self.tracked_projectiles[event.projectile_id] = objects_manager.get_by_id(event.projectile_id)
+            self.tracked_projectiles[event.projectile_id] = self.event_manager.objects_manager.get_by_id(event.projectile_id)
+            self.event_manager.subscribe_to_deletion(event.projectile_id, self)
 
     def process_object_deleted_event(self, event: ObjectDeletedEvent) -> None:
         if event.object_id in self.tracked_projectiles:
@@ -137,7 +137,6 @@ class DecisionBasedController(AIController):
     def register(self, event_manager: EventManager):
         super().register(event_manager)
         event_manager.add_event(NewEventProcessorAddedEvent(id(self), ProjectileFiredEvent))
-        event_manager.add_event(NewEventProcessorAddedEvent(id(self), ObjectDeletedEvent))
 
     def move_toward_opponent(self):
         player_x, player_y = self.player.get_coordinates()
@@ -12,7 +12,6 @@ from space_game.Config import Config
 from space_game.Player import Player
 from space_game.domain_names import Side
 from space_game.managers.EventManager import EventManager
-from space_game.ai.AIActionToEventMapping import AIActionToEventMapping
 
 
 class SBDQNController(AIController):
@@ -28,6 +27,5 @@ class SBDQNController(AIController):
         choice, _ = self.dqn.predict(current_map)
         if type(choice) is np.ndarray:
             choice = choice[0]
-        for event in AIActionToEventMapping[EnvironmentActionToAIActionMapping.get(EnvironmentAction(choice), AIAction.StandStill)](id(self.player)):
-            self.event_manager.add_event(event)
+        self.perform(EnvironmentActionToAIActionMapping.get(EnvironmentAction(choice), AIAction.StandStill))
 
@@ -10,7 +10,6 @@ from space_game.domain_names import Side
 from space_game.events.creation_events.NewEventProcessorAddedEvent import NewEventProcessorAddedEvent
 from space_game.events.update_events.UpdateAIControllersEvent import UpdateAIControllersEvent
 from space_game.managers.EventManager import EventManager
-from space_game.ai.AIActionToEventMapping import AIActionToEventMapping
 
 
 class TFNaiveController(AIController):
@@ -25,8 +24,7 @@ class TFNaiveController(AIController):
             self.cooldown = self.cooldown_max
             current_map = self.get_current_map()
             choice = np.argmax(self.model.predict(np.array([current_map])))
-            for event in AIActionToEventMapping[tf_naive_action_mapper[choice]](id(self.player)):
-                self.event_manager.add_event(event)
+            self.perform(tf_naive_action_mapper[choice])
         else:
             self.cooldown -= 1
 
@@ -0,0 +1,23 @@
+from typing import Iterable, Tuple
+
+from space_game.domain_names import ObjectId
+from space_game.interfaces.Collisable import Collisable
+
+
+class BroadPhase:
+    def add(self, object_id: ObjectId, collisable: Collisable) -> None:
+        pass
+
+    def remove(self, object_id: ObjectId) -> None:
+        pass
+
+    def update(self, object_id: ObjectId) -> None:
+        pass
+
+    def get_candidate_pairs(self) -> Iterable[Tuple[ObjectId, ObjectId]]:
+        """
+        Pairs which may collide, ordered as itertools.combinations over collisables in order of addition
+
+        :return: Iterable of (first added id, second added id) pairs
+        """
+        pass
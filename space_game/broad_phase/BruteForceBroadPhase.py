@@ -0,0 +1,21 @@
+from typing import Dict, Iterable, Tuple
+from itertools import combinations
+
+from space_game.broad_phase.BroadPhase import BroadPhase
+from space_game.domain_names import ObjectId
+from space_game.interfaces.Collisable import Collisable
+
+
+class BruteForceBroadPhase(BroadPhase):
+    def __init__(self):
+        self.collisables: Dict[ObjectId, Collisable] = {}
+
+    def add(self, object_id: ObjectId, collisable: Collisable) -> None:
+        self.collisables[object_id] = collisable
+
+    def remove(self, object_id: ObjectId) -> None:
+        if object_id in self.collisables:
+            del self.collisables[object_id]
+
+    def get_candidate_pairs(self) -> Iterable[Tuple[ObjectId, ObjectId]]:
+        return combinations(self.collisables.keys(), 2)
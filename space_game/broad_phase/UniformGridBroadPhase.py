@@ -0,0 +1,83 @@
+from typing import DefaultDict, Dict, Iterable, Set, Tuple
+from collections import defaultdict
+from itertools import combinations
+
+from space_game.Config import Config
+from space_game.broad_phase.BroadPhase import BroadPhase
+from space_game.domain_names import ObjectId
+from space_game.interfaces.Collisable import Collisable
+
+Cell = Tuple[int, int]
+CellSpan = Tuple[int, int, int, int]
+
+
+class UniformGridBroadPhase(BroadPhase):
+    """
+    Buckets collisables into square cells, so only objects sharing a cell are passed to the narrow phase.
+    Cells of an object are recalculated only when it is reported as moved through update.
+    """
+    def __init__(self, cell_size: int):
+        self.cell_size = cell_size
+        self.collisables: Dict[ObjectId, Collisable] = {}
+        self.insertion_index: Dict[ObjectId, int] = {}
+        self.next_insertion_index = 0
+        self.spans: Dict[ObjectId, CellSpan] = {}
+        self.cells: DefaultDict[Cell, Set[ObjectId]] = defaultdict(set)
+
+    @staticmethod
+    def from_config(config: Config):
+        return UniformGridBroadPhase(max(config.player_size, config.bullet_width, config.bullet_height))
+
+    def add(self, object_id: ObjectId, collisable: Collisable) -> None:
+        if object_id not in self.collisables:
+            self.insertion_index[object_id] = self.next_insertion_index
+            self.next_insertion_index += 1
+        self.collisables[object_id] = collisable
+        self.update(object_id)
+
+    def remove(self, object_id: ObjectId) -> None:
+        if object_id in self.collisables:
+            self.remove_from_cells(object_id, self.spans.pop(object_id))
+            del self.collisables[object_id]
+            del self.insertion_index[object_id]
+
+    def update(self, object_id: ObjectId) -> None:
+        new_span = self.calculate_span(self.collisables[object_id])
+        old_span = self.spans.get(object_id)
+        if new_span == old_span:
+            return
+        if old_span is not None:
+            self.remove_from_cells(object_id, old_span)
+        self.spans[object_id] = new_span
+        min_column, max_column, min_row, max_row = new_span
+        for column in range(min_column, max_column + 1):
+            for row in range(min_row, max_row + 1):
+                self.cells[(column, row)].add(object_id)
+
+    def remove_from_cells(self, object_id: ObjectId, span: CellSpan) -> None:
+        min_column, max_column, min_row, max_row = span
+        for column in range(min_column, max_column + 1):
+            for row in range(min_row, max_row + 1):
+                cell = self.cells[(column, row)]
+                cell.discard(object_id)
+                if not cell:
+                    del self.cells[(column, row)]
+
+    def calculate_span(self, collisable: Collisable) -> CellSpan:
+        x, y = collisable.get_coordinates()
+        width, height = collisable.get_shape()
+        return (
+            int(x // self.cell_size),
+            int((x + width) // self.cell_size),
+            int(y // self.cell_size),
+            int((y + height) // self.cell_size)
+        )
+
+    def get_candidate_pairs(self) -> Iterable[Tuple[ObjectId, ObjectId]]:
+        index = self.insertion_index
+        pairs = set()
+        for cell in self.cells.values():
+            if len(cell) > 1:
+                for p1_id, p2_id in combinations(cell, 2):
+                    pairs.add((p1_id, p2_id) if index[p1_id] < index[p2_id] else (p2_id, p1_id))
+        return sorted(pairs, key=lambda pair: (index[pair[0]], index[pair[1]]))
@@ -6,5 +6,7 @@ from space_game.domain_names import ObjectId
 
 @dataclass
 class CollisionOccurredEvent(Event):
-    participant_1_id: ObjectId = None
-    participant_2_id: ObjectId = None
\ No newline at end of file
+    __slots__ = ('participant_1_id', 'participant_2_id')
+
+    participant_1_id: ObjectId
+    participant_2_id: ObjectId
\ No newline at end of file
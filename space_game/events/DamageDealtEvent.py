@@ -6,5 +6,7 @@ from space_game.domain_names import ObjectId, HitPoint
 
 @dataclass
 class DamageDealtEvent(Event):
-    damaged_id: ObjectId = None
-    amount: HitPoint = None
\ No newline at end of file
+    __slots__ = ('damaged_id', 'amount')
+
+    damaged_id: ObjectId
+    amount: HitPoint
\ No newline at end of file
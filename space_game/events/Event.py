@@ -3,4 +3,4 @@ from dataclasses import dataclass
 
 @dataclass
 class Event:
-    pass
\ No newline at end of file
+    __slots__ = ()
\ No newline at end of file
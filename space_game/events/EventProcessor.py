@@ -1,6 +1,14 @@
+from typing import Any, Callable
+
 from space_game.events.Event import Event
 
 
 class EventProcessor:
     def process_event(self, event: Event):
         pass
+
+    def get_event_handler(self, event_type: Any) -> Callable[[Event], None]:
+        """
+        Callable processing events of event_type, resolved once when the processor is registered for the type
+        """
+        return self.process_event
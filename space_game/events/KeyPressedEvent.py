@@ -6,4 +6,6 @@ from space_game.events.Event import Event
 
 @dataclass
 class KeyPressedEvent(Event):
+    __slots__ = ('key_id',)
+
     key_id: KeyId
@@ -6,4 +6,6 @@ from space_game.events.Event import Event
 
 @dataclass
 class ObjectDeletedEvent(Event):
+    __slots__ = ('object_id',)
+
     object_id: ObjectId
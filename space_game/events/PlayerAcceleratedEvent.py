@@ -7,5 +7,7 @@ from space_game.domain_names import ObjectId
 
 @dataclass
 class PlayerAcceleratedEvent(Event):
-    player_id: ObjectId = None
-    direction: AccelerationDirection = None
+    __slots__ = ('player_id', 'direction')
+
+    player_id: ObjectId
+    direction: AccelerationDirection
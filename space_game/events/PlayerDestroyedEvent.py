@@ -6,4 +6,6 @@ from space_game.domain_names import ObjectId
 
 @dataclass
 class PlayerDestroyedEvent(Event):
-    player_id: ObjectId = None
\ No newline at end of file
+    __slots__ = ('player_id',)
+
+    player_id: ObjectId
\ No newline at end of file
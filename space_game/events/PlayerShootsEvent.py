@@ -6,4 +6,6 @@ from space_game.domain_names import ObjectId
 
 @dataclass
 class PlayerShootsEvent(Event):
-    player_id: ObjectId = None
+    __slots__ = ('player_id',)
+
+    player_id: ObjectId
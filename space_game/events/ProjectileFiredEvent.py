@@ -6,5 +6,7 @@ from space_game.events.Event import Event
 
 @dataclass
 class ProjectileFiredEvent(Event):
-    projectile_id: ObjectId = None
-    shooter_id: ObjectId = None
+    __slots__ = ('projectile_id', 'shooter_id')
+
+    projectile_id: ObjectId
+    shooter_id: ObjectId
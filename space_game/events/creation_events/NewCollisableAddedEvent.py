@@ -6,4 +6,6 @@ from space_game.events.Event import Event
 
 @dataclass
 class NewCollisableAddedEvent(Event):
+    __slots__ = ('collisable_id',)
+
     collisable_id: ObjectId
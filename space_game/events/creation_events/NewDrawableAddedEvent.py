@@ -6,4 +6,6 @@ from space_game.events.Event import Event
 
 @dataclass
 class NewDrawableAddedEvent(Event):
+    __slots__ = ('drawable_id',)
+
     drawable_id: ObjectId
@@ -7,5 +7,7 @@ from space_game.events.Event import Event
 
 @dataclass
 class NewEventProcessorAddedEvent(Event):
+    __slots__ = ('processor_id', 'event_type')
+
     processor_id: ObjectId
     event_type: Any
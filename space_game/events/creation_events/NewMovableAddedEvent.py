@@ -6,4 +6,6 @@ from space_game.events.Event import Event
 
 @dataclass
 class NewMovableAddedEvent(Event):
+    __slots__ = ('movable_id',)
+
     movable_id: ObjectId
@@ -6,4 +6,6 @@ from space_game.events.Event import Event
 
 @dataclass
 class NewObjectCreatedEvent(Event):
+    __slots__ = ('new_object',)
+
     new_object: Any
@@ -6,4 +6,6 @@ from space_game.events.Event import Event
 
 @dataclass
 class NewStatefulAddedEvent(Event):
+    __slots__ = ('stateful_id',)
+
     stateful_id: ObjectId
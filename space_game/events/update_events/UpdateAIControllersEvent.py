@@ -5,4 +5,4 @@ from space_game.events.Event import Event
 
 @dataclass
 class UpdateAIControllersEvent(Event):
-    pass
+    __slots__ = ()
@@ -5,4 +5,4 @@ from space_game.events.Event import Event
 
 @dataclass
 class UpdateStatefulsEvent(Event):
-    pass
+    __slots__ = ()
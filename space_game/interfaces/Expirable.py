@@ -0,0 +1,13 @@
+from space_game.Entity import Entity
+from space_game.interfaces.Stateful import Stateful
+
+
+class Expirable(Stateful):
+    """
+    Stateful which expires once its entity reaches its constraints
+    """
+    def get_entity(self) -> Entity:
+        pass
+
+    def expire(self) -> None:
+        pass
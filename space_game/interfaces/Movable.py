@@ -1,4 +1,15 @@
+from typing import Optional
+
+from space_game.Entity import Entity
+
 
 class Movable:
     def update_position(self) -> None:
         pass
+
+    def get_entity(self) -> Optional[Entity]:
+        """
+        Entity backing the movable. Movables returning an entity are moved in bulk by the EntityStore
+        instead of through update_position
+        """
+        return None
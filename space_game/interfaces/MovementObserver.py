@@ -0,0 +1,8 @@
+from typing import Iterable
+
+from space_game.domain_names import ObjectId
+
+
+class MovementObserver:
+    def process_movables_updated(self, movable_ids: Iterable[ObjectId]) -> None:
+        pass
@@ -1,12 +1,16 @@
-from typing import Dict
-from itertools import combinations
+from typing import Dict, Iterable, Any, Callable, Tuple
+
+from space_game.EntityStore import EntityStore
 
 from space_game.events.creation_events.NewEventProcessorAddedEvent import NewEventProcessorAddedEvent
 from space_game.events.creation_events.NewObjectCreatedEvent import NewObjectCreatedEvent
+from space_game.broad_phase.BroadPhase import BroadPhase
+from space_game.broad_phase.BruteForceBroadPhase import BruteForceBroadPhase
 from space_game.interfaces.Collisable import Collisable
+from space_game.interfaces.Movable import Movable
+from space_game.interfaces.MovementObserver import MovementObserver
 from space_game.interfaces.Registrable import Registrable
 from space_game.managers.EventManager import EventManager
-from space_game.managers.ObjectsManager import objects_manager
 from space_game.domain_names import ObjectId
 from space_game.events.update_events.CheckCollisionsEvent import CheckCollisionsEvent
 from space_game.events.Event import Event
@@ -17,10 +21,52 @@ from space_game.events.CollisionOccurredEvent import CollisionOccurredEvent
 from space_game.events.ObjectDeletedEvent import ObjectDeletedEvent
 
 
-class CollisionManager(EventEmitter, EventProcessor, Registrable):
-    def __init__(self, event_manager: EventManager):
+def are_colliding(participant_1: Collisable, participant_2: Collisable) -> bool:
+    participant_1_x, participant_1_y = participant_1.get_coordinates()
+    participant_1_width, participant_1_height = participant_1.get_shape()
+    participant_2_x, participant_2_y = participant_2.get_coordinates()
+    participant_2_width, participant_2_height = participant_2.get_shape()
+    horizontal_collision = (participant_2_x < (participant_1_x + participant_1_width)) and (
+            (participant_2_x + participant_2_width) > participant_1_x)
+    vertical_collision = (participant_2_y < (participant_1_y + participant_1_height)) and (
+            (participant_2_y + participant_2_height) > participant_1_y)
+    return horizontal_collision and vertical_collision
+
+
+MovingBox = Tuple[int, int, int, int, int, int]
+
+
+def are_boxes_colliding(box_1: MovingBox, box_2: MovingBox, tick: int) -> bool:
+    """
+    Collision test of are_colliding for boxes (x, y, width, height, horizontal velocity, vertical velocity)
+    moved for tick ticks
+    """
+    x_1, y_1, width_1, height_1, horizontal_velocity_1, vertical_velocity_1 = box_1
+    x_2, y_2, width_2, height_2, horizontal_velocity_2, vertical_velocity_2 = box_2
+    x_1, y_1 = x_1 + tick * horizontal_velocity_1, y_1 + tick * vertical_velocity_1
+    x_2, y_2 = x_2 + tick * horizontal_velocity_2, y_2 + tick * vertical_velocity_2
+    return x_2 < x_1 + width_1 and x_2 + width_2 > x_1 and y_2 < y_1 + height_1 and y_2 + height_2 > y_1
+
+
+def sweep(box: MovingBox, ticks: int) -> Tuple[int, int, int, int]:
+    """
+    Bounds (left, top, right, bottom) of the area covered by box over the upcoming ticks ticks
+    """
+    x, y, width, height, horizontal_velocity, vertical_velocity = box
+    horizontal_shift = (horizontal_velocity, ticks * horizontal_velocity)
+    vertical_shift = (vertical_velocity, ticks * vertical_velocity)
+    return (
+        x + min(horizontal_shift), y + min(vertical_shift),
+        x + max(horizontal_shift) + width, y + max(vertical_shift) + height
+    )
+
+
+class CollisionManager(EventEmitter, EventProcessor, Registrable, MovementObserver):
+    def __init__(self, event_manager: EventManager, broad_phase: BroadPhase = None):
         super().__init__(event_manager)
         self.collisables: Dict[ObjectId, Collisable] = {}
+        self.broad_phase = broad_phase if broad_phase is not None else BruteForceBroadPhase()
+        self.pair_tests = 0
         self.event_resolver = {
             NewCollisableAddedEvent: self.process_new_collisable_added_event,
             ObjectDeletedEvent: self.process_object_deleted_event,
@@ -32,39 +78,73 @@ class CollisionManager(EventEmitter, EventProcessor, Registrable):
         event_manager.add_event(NewObjectCreatedEvent(self))
         event_manager.add_event(NewEventProcessorAddedEvent(id(self), CheckCollisionsEvent))
         event_manager.add_event(NewEventProcessorAddedEvent(id(self), NewCollisableAddedEvent))
-        event_manager.add_event(NewEventProcessorAddedEvent(id(self), ObjectDeletedEvent))
 
     def process_event(self, event: Event):
         self.event_resolver[type(event)](event)
 
+    def get_event_handler(self, event_type: Any) -> Callable[[Event], None]:
+        return self.event_resolver[event_type]
+
     def process_new_collisable_added_event(self, event: NewCollisableAddedEvent):
-        collisable = objects_manager.get_by_id(event.collisable_id)
+        collisable = self.event_manager.objects_manager.get_by_id(event.collisable_id)
         self.collisables[event.collisable_id] = collisable
+        self.broad_phase.add(event.collisable_id, collisable)
+        self.event_manager.subscribe_to_deletion(event.collisable_id, self)
 
     def process_object_deleted_event(self, event: ObjectDeletedEvent):
         if event.object_id in self.collisables:
             del self.collisables[event.object_id]
+            self.broad_phase.remove(event.object_id)
+
+    def process_movables_updated(self, movable_ids: Iterable[ObjectId]) -> None:
+        for movable_id in movable_ids:
+            if movable_id in self.collisables:
+                self.broad_phase.update(movable_id)
 
     def process_check_collisions_event(self, event: CheckCollisionsEvent):
         self.check_collisions()
 
     def check_collisions(self):
-        for (p1_id, participant_1), (p2_id, participant_2) in combinations(self.collisables.items(), 2):
-            participant_1_x, participant_1_y = participant_1.get_coordinates()
-            participant_1_width, participant_1_height = participant_1.get_shape()
-            if p1_id == p2_id:
-                continue
-            else:
-                participant_2_x, participant_2_y = participant_2.get_coordinates()
-                participant_2_width, participant_2_height = participant_2.get_shape()
-                horizontal_collision = (participant_2_x < (participant_1_x + participant_1_width)) and (
-                        (participant_2_x + participant_2_width) > participant_1_x)
-                vertical_collision = (participant_2_y < (participant_1_y + participant_1_height)) and (
-                        (participant_2_y + participant_2_height) > participant_1_y)
-                if horizontal_collision and vertical_collision:
-                    self.emit_collision(p1_id, p2_id)
-                    participant_1.collide(p2_id)
-                    participant_2.collide(p1_id)
+        self.pair_tests = 0
+        for p1_id, p2_id in self.broad_phase.get_candidate_pairs():
+            self.pair_tests += 1
+            participant_1, participant_2 = self.collisables[p1_id], self.collisables[p2_id]
+            if are_colliding(participant_1, participant_2):
+                self.emit_collision(p1_id, p2_id)
+                participant_1.collide(p2_id)
+                participant_2.collide(p1_id)
+
+    def count_collision_free_ticks(self, entity_store: EntityStore, limit: int) -> int:
+        """
+        Number of upcoming ticks, at most limit, in which no collisables collide, assuming they keep moving
+        at constant velocity. Pairs whose swept boxes overlap are found by sweeping them in order of their left bound
+        and tested at the positions of every tick like in check_collisions, so boxes passing through each other
+        between two ticks do not collide.
+        :return: 0 if any collisable is not backed by entity_store
+        """
+        rows = []
+        for collisable in self.collisables.values():
+            entity = collisable.get_entity() if isinstance(collisable, Movable) else None
+            if entity is None or entity.store is not entity_store:
+                return 0
+            rows.append(entity.row)
+        state = entity_store.read_rows(rows)
+        boxes = list(zip(
+            state['x'], state['y'], state['width'], state['height'],
+            state['horizontal_velocity'], state['vertical_velocity']
+        ))
+        swept_boxes = sorted((sweep(box, limit), box) for box in boxes)
+        free_ticks = limit
+        for index_1, ((left_1, top_1, right_1, bottom_1), box_1) in enumerate(swept_boxes):
+            for (left_2, top_2, right_2, bottom_2), box_2 in swept_boxes[index_1 + 1:]:
+                if left_2 >= right_1:
+                    break
+                if top_2 < bottom_1 and bottom_2 > top_1:
+                    for tick in range(1, free_ticks + 1):
+                        if are_boxes_colliding(box_1, box_2, tick):
+                            free_ticks = tick - 1
+                            break
+        return free_ticks
 
     def emit_collision(self, p1_id, p2_id):
         # self.event_manager.add_event(CollisionOccurredEvent(participant_1_id=p1_id, participant_2_id=p2_id))
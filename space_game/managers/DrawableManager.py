@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Any, Callable
 
 from space_game.Config import Config
 from space_game.Screen import Screen
@@ -12,12 +12,13 @@ from space_game.events.creation_events.NewDrawableAddedEvent import NewDrawableA
 from space_game.events.ObjectDeletedEvent import ObjectDeletedEvent
 from space_game.interfaces.Registrable import Registrable
 from space_game.managers.EventManager import EventManager
-from space_game.managers.ObjectsManager import objects_manager
+from space_game.managers.ObjectsManager import ObjectsManager
 from space_game.events.update_events.UpdateDrawablesEvent import UpdateDrawablesEvent
 
 
 class DrawableManager(EventProcessor, Registrable):
-    def __init__(self, config: Config, screen: Screen):
+    def __init__(self, config: Config, screen: Screen, objects_manager: ObjectsManager):
+        self.objects_manager = objects_manager
         self.drawables: Dict[ObjectId, Drawable] = {}
         self.event_resolver = {
             NewDrawableAddedEvent: self.process_new_drawable_added_event,
@@ -29,17 +30,21 @@ class DrawableManager(EventProcessor, Registrable):
         self.screen = screen
 
     def register(self, event_manager: EventManager):
+        self.event_manager = event_manager
         event_manager.add_event(NewObjectCreatedEvent(self))
         event_manager.add_event(NewEventProcessorAddedEvent(id(self), NewDrawableAddedEvent))
-        event_manager.add_event(NewEventProcessorAddedEvent(id(self), ObjectDeletedEvent))
         event_manager.add_event(NewEventProcessorAddedEvent(id(self), UpdateDrawablesEvent))
 
     def process_event(self, event: Event):
         self.event_resolver[type(event)](event)
 
+    def get_event_handler(self, event_type: Any) -> Callable[[Event], None]:
+        return self.event_resolver[event_type]
+
     def process_new_drawable_added_event(self, event: NewDrawableAddedEvent):
-        drawable = objects_manager.get_by_id(event.drawable_id)
+        drawable = self.objects_manager.get_by_id(event.drawable_id)
         self.drawables[event.drawable_id] = drawable
+        self.event_manager.subscribe_to_deletion(event.drawable_id, self)
 
     def process_object_deleted_event(self, event: ObjectDeletedEvent):
         if event.object_id in self.drawables:
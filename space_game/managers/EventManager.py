@@ -1,49 +1,138 @@
-from typing import Dict, Deque, DefaultDict, Any
+from typing import Callable, Dict, Deque, DefaultDict, Any, FrozenSet, Optional, Set, Tuple
 from collections import deque, defaultdict
 
 from space_game.domain_names import ObjectId
+from space_game.EventProfiler import EventProfiler
 from space_game.events.EventProcessor import EventProcessor
 from space_game.events.Event import Event
-from space_game.managers.ObjectsManager import objects_manager
+from space_game.managers.ObjectsManager import ObjectsManager
 from space_game.events.creation_events.NewEventProcessorAddedEvent import NewEventProcessorAddedEvent
 from space_game.events.creation_events.NewObjectCreatedEvent import NewObjectCreatedEvent
 from space_game.events.ObjectDeletedEvent import ObjectDeletedEvent
+from space_game.events.creation_events.NewCollisableAddedEvent import NewCollisableAddedEvent
+from space_game.events.creation_events.NewDrawableAddedEvent import NewDrawableAddedEvent
+from space_game.events.creation_events.NewMovableAddedEvent import NewMovableAddedEvent
+from space_game.events.creation_events.NewStatefulAddedEvent import NewStatefulAddedEvent
+
+REGISTRATION_EVENT_TYPES = frozenset({
+    NewObjectCreatedEvent, NewEventProcessorAddedEvent, NewMovableAddedEvent, NewCollisableAddedEvent,
+    NewDrawableAddedEvent, NewStatefulAddedEvent
+})
 
 
 class EventManager(EventProcessor):
-    def __init__(self):
+    """
+    Dispatches queued events to processors registered for their type. Handlers of every processor are resolved
+    with get_event_handler once, when it is registered for a type, and kept in a per type tuple.
+    With synchronous_registration, registration events are dispatched as soon as they are added instead of
+    being queued, so e.g. a bullet fired by an action is already moved in the tick it is fired in.
+    Deletions are collected while the queue is processed and applied in one pass once it is empty:
+    only processors subscribed to the deletion of the object through subscribe_to_deletion are notified
+    and only the event types the object is registered for are cleaned up.
+    """
+    def __init__(self, objects_manager: ObjectsManager = None, synchronous_registration: bool = False):
+        self.objects_manager = objects_manager if objects_manager is not None else ObjectsManager()
         self.event_processors: DefaultDict[Any, Dict[ObjectId, EventProcessor]] = defaultdict(dict)
         self.event_queue: Deque[Event] = deque()
+        self.event_handlers: Dict[Any, Tuple[Callable[[Event], None], ...]] = {}
+        self.immediate_event_types: FrozenSet[Any] = \
+            REGISTRATION_EVENT_TYPES if synchronous_registration else frozenset()
+        self.profiler: Optional[EventProfiler] = None
+        self.subscribed_event_types: DefaultDict[ObjectId, Set[Any]] = defaultdict(set)
+        self.deletion_subscribers: DefaultDict[ObjectId, Dict[ObjectId, EventProcessor]] = defaultdict(dict)
+        self.pending_deletions: Dict[ObjectId, ObjectDeletedEvent] = {}
         self.event_processors[ObjectDeletedEvent][id(self)] = self
         self.event_processors[NewEventProcessorAddedEvent][id(self)] = self
-        self.event_processors[NewObjectCreatedEvent][id(objects_manager)] = objects_manager
-        self.event_processors[ObjectDeletedEvent][id(objects_manager)] = objects_manager
+        self.event_processors[NewObjectCreatedEvent][id(self.objects_manager)] = self.objects_manager
         self.event_resolver = {
             ObjectDeletedEvent: self.process_object_deleted_event,
             NewEventProcessorAddedEvent: self.process_new_event_processor_added_event,
             Event: lambda e: None
         }
+        for event_type in self.event_processors:
+            self.compile_handlers(event_type)
 
     def process_events(self) -> None:
-        while len(self.event_queue) > 0:
+        if self.profiler is not None:
+            self.profiler.process_events(self)
+            return
+        queue = self.event_queue
+        event_handlers = self.event_handlers
+        while len(queue) > 0 or len(self.pending_deletions) > 0:
+            while len(queue) > 0:
+                event = queue.popleft()
+                for handler in event_handlers.get(type(event), ()):
+                    handler(event)
+            self.apply_pending_deletions()
+
+    def dispatch_queued_events(self) -> None:
+        """
+        Dispatch only the events queued so far, the events they emit stay queued
+        """
+        for _ in range(len(self.event_queue)):
             event = self.event_queue.popleft()
-            for processor in self.event_processors[type(event)].values():
-                processor.process_event(event)
+            for handler in self.event_handlers.get(type(event), ()):
+                handler(event)
 
     def process_event(self, event: Event):
         self.event_resolver[type(event)](event)
 
+    def get_event_handler(self, event_type: Any) -> Callable[[Event], None]:
+        return self.event_resolver[event_type]
+
+    def compile_handlers(self, event_type: Any) -> None:
+        self.event_handlers[event_type] = tuple(
+            processor.get_event_handler(event_type) for processor in self.event_processors[event_type].values()
+        )
+
     def process_object_deleted_event(self, event: ObjectDeletedEvent):
-        for sub_dict in self.event_processors.values():
-            if event.object_id in sub_dict:
-                del sub_dict[event.object_id]
+        self.pending_deletions.setdefault(event.object_id, event)
+
+    def apply_pending_deletions(self) -> None:
+        pending_deletions = self.pending_deletions
+        self.pending_deletions = {}
+        for object_id, event in pending_deletions.items():
+            subscribers = self.deletion_subscribers.pop(object_id, None)
+            if subscribers is not None:
+                for processor in subscribers.values():
+                    processor.process_event(event)
+            event_types = self.subscribed_event_types.pop(object_id, None)
+            if event_types is not None:
+                for event_type in event_types:
+                    del self.event_processors[event_type][object_id]
+                    self.compile_handlers(event_type)
+            self.objects_manager.delete_by_id(object_id)
+
+    def subscribe_to_deletion(self, object_id: ObjectId, processor: EventProcessor) -> None:
+        """
+        Have processor receive ObjectDeletedEvent of object_id when the object is deleted
+        """
+        self.deletion_subscribers[object_id][id(processor)] = processor
 
     def process_new_event_processor_added_event(self, event: NewEventProcessorAddedEvent):
         self.add_event_processor(event.processor_id, event.event_type)
 
     def add_event(self, event: Event):
-        self.event_queue.append(event)
+        if type(event) in self.immediate_event_types:
+            for handler in self.event_handlers.get(type(event), ()):
+                handler(event)
+        else:
+            self.event_queue.append(event)
 
     def add_event_processor(self, event_processor_id: ObjectId, event_type: Any):
-        event_processor = objects_manager.get_by_id(event_processor_id)
+        event_processor = self.objects_manager.get_by_id(event_processor_id)
         self.event_processors[event_type][event_processor_id] = event_processor
+        self.subscribed_event_types[event_processor_id].add(event_type)
+        self.compile_handlers(event_type)
+
+    def clear(self) -> None:
+        """
+        Drops pending events and every registered processor, including the ones stored in the objects manager
+        """
+        self.event_queue.clear()
+        self.event_processors.clear()
+        self.event_handlers.clear()
+        self.subscribed_event_types.clear()
+        self.deletion_subscribers.clear()
+        self.pending_deletions.clear()
+        self.objects_manager.clear()
@@ -1,4 +1,4 @@
-from typing import DefaultDict, List, Any
+from typing import DefaultDict, List, Any, Callable
 from collections import defaultdict
 
 from space_game.events.Event import Event
@@ -33,3 +33,6 @@ class KeyboardEventsProcessor(EventProcessor, EventEmitter, Registrable):
 
     def process_event(self, event: Event):
         self.event_resolver.get(type(event))(event)
+
+    def get_event_handler(self, event_type: Any) -> Callable[[Event], None]:
+        return self.event_resolver.get(event_type)
@@ -1,8 +1,10 @@
-from typing import Dict
+from typing import Dict, List, Any, Callable
 
+from space_game.EntityStore import EntityStore
 from space_game.events.creation_events.NewEventProcessorAddedEvent import NewEventProcessorAddedEvent
 from space_game.events.creation_events.NewObjectCreatedEvent import NewObjectCreatedEvent
 from space_game.interfaces.Movable import Movable
+from space_game.interfaces.MovementObserver import MovementObserver
 from space_game.domain_names import ObjectId
 from space_game.events.Event import Event
 from space_game.events.EventProcessor import EventProcessor
@@ -10,13 +12,17 @@ from space_game.events.creation_events.NewMovableAddedEvent import NewMovableAdd
 from space_game.events.ObjectDeletedEvent import ObjectDeletedEvent
 from space_game.interfaces.Registrable import Registrable
 from space_game.managers.EventManager import EventManager
-from space_game.managers.ObjectsManager import objects_manager
+from space_game.managers.ObjectsManager import ObjectsManager
 from space_game.events.update_events.UpdateMovablesEvent import UpdateMovablesEvent
 
 
 class MovableManager(EventProcessor, Registrable):
-    def __init__(self):
+    def __init__(self, objects_manager: ObjectsManager, entity_store: EntityStore = None):
+        self.objects_manager = objects_manager
+        self.entity_store = entity_store if entity_store is not None else EntityStore()
         self.movables: Dict[ObjectId, Movable] = {}
+        self.standalone_movables: Dict[ObjectId, Movable] = {}
+        self.movement_observers: List[MovementObserver] = []
         self.event_resolver = {
             NewMovableAddedEvent: self.process_new_movable_added_event,
             ObjectDeletedEvent: self.process_object_deleted_event,
@@ -25,25 +31,52 @@ class MovableManager(EventProcessor, Registrable):
         }
 
     def register(self, event_manager: EventManager):
+        self.event_manager = event_manager
         event_manager.add_event(NewObjectCreatedEvent(self))
         event_manager.add_event(NewEventProcessorAddedEvent(id(self), NewMovableAddedEvent))
-        event_manager.add_event(NewEventProcessorAddedEvent(id(self), ObjectDeletedEvent))
         event_manager.add_event(NewEventProcessorAddedEvent(id(self), UpdateMovablesEvent))
 
     def process_event(self, event: Event):
         self.event_resolver[type(event)](event)
 
+    def get_event_handler(self, event_type: Any) -> Callable[[Event], None]:
+        return self.event_resolver[event_type]
+
     def process_new_movable_added_event(self, event: NewMovableAddedEvent):
-        movable = objects_manager.get_by_id(event.movable_id)
+        movable = self.objects_manager.get_by_id(event.movable_id)
         self.movables[event.movable_id] = movable
+        self.event_manager.subscribe_to_deletion(event.movable_id, self)
+        entity = movable.get_entity()
+        if entity is not None:
+            self.entity_store.adopt(entity)
+        else:
+            self.standalone_movables[event.movable_id] = movable
 
     def process_object_deleted_event(self, event: ObjectDeletedEvent):
         if event.object_id in self.movables:
-            del self.movables[event.object_id]
+            movable = self.movables.pop(event.object_id)
+            entity = movable.get_entity()
+            if entity is not None:
+                self.entity_store.release(entity)
+            else:
+                del self.standalone_movables[event.object_id]
+
+    def add_movement_observer(self, observer: MovementObserver):
+        self.movement_observers.append(observer)
 
     def update_movables(self):
-        for movable in self.movables.values():
+        self.entity_store.update_positions()
+        for movable in self.standalone_movables.values():
             movable.update_position()
+        for observer in self.movement_observers:
+            observer.process_movables_updated(self.movables.keys())
+
+    def skip_ticks(self, ticks: int) -> None:
+        """
+        Resolve ticks updates at once, valid only if every movable is backed by the entity store and none of the moves
+        fails, see EntityStore.count_valid_moves. Movement observers are brought up to date by the next update.
+        """
+        self.entity_store.advance(ticks)
 
     def process_update_movables_event(self, event: Event):
         self.update_movables()
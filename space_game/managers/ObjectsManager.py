@@ -1,5 +1,5 @@
 from collections import defaultdict
-from typing import Any, DefaultDict
+from typing import Any, DefaultDict, Callable
 
 from space_game.domain_names import ObjectId
 from space_game.events.Event import Event
@@ -33,8 +33,11 @@ class ObjectsManager(EventProcessor):
     def process_event(self, event: Event):
         self.event_resolver.get(type(event))(event)
 
+    def get_event_handler(self, event_type: Any) -> Callable[[Event], None]:
+        return self.event_resolver.get(event_type)
+
     def get_by_id(self, o_id: ObjectId) -> Any:
         return self.objects[o_id]
 
-
-objects_manager = ObjectsManager()
+    def clear(self) -> None:
+        self.objects.clear()
@@ -1,4 +1,6 @@
-from typing import Dict
+from typing import Dict, Any, Callable
+
+from space_game.EntityStore import EntityStore
 
 from space_game.events.creation_events.NewEventProcessorAddedEvent import NewEventProcessorAddedEvent
 from space_game.events.creation_events.NewObjectCreatedEvent import NewObjectCreatedEvent
@@ -10,16 +12,21 @@ from space_game.events.Event import Event
 from space_game.events.EventProcessor import EventProcessor
 from space_game.events.creation_events.NewMovableAddedEvent import NewMovableAddedEvent
 from space_game.events.ObjectDeletedEvent import ObjectDeletedEvent
+from space_game.interfaces.Expirable import Expirable
 from space_game.interfaces.Registrable import Registrable
 from space_game.interfaces.Stateful import Stateful
 from space_game.managers.EventManager import EventManager
-from space_game.managers.ObjectsManager import objects_manager
+from space_game.managers.ObjectsManager import ObjectsManager
 from space_game.events.update_events.UpdateMovablesEvent import UpdateMovablesEvent
 
 
 class StatefulsManager(EventProcessor, Registrable):
-    def __init__(self):
+    def __init__(self, objects_manager: ObjectsManager, entity_store: EntityStore = None):
+        self.objects_manager = objects_manager
+        self.entity_store = entity_store if entity_store is not None else EntityStore()
         self.statefuls: Dict[ObjectId, Stateful] = {}
+        self.expirable_rows: Dict[ObjectId, int] = {}
+        self.expirables_by_row: Dict[int, Expirable] = {}
         self.event_resolver = {
             NewStatefulAddedEvent: self.process_new_stateful_added_event,
             ObjectDeletedEvent: self.process_object_deleted_event,
@@ -28,25 +35,55 @@ class StatefulsManager(EventProcessor, Registrable):
         }
 
     def register(self, event_manager: EventManager):
+        self.event_manager = event_manager
         event_manager.add_event(NewObjectCreatedEvent(self))
         event_manager.add_event(NewEventProcessorAddedEvent(id(self), NewStatefulAddedEvent))
-        event_manager.add_event(NewEventProcessorAddedEvent(id(self), ObjectDeletedEvent))
         event_manager.add_event(NewEventProcessorAddedEvent(id(self), UpdateStatefulsEvent))
 
     def process_event(self, event: Event):
         self.event_resolver[type(event)](event)
 
+    def get_event_handler(self, event_type: Any) -> Callable[[Event], None]:
+        return self.event_resolver[event_type]
+
     def process_new_stateful_added_event(self, event: NewStatefulAddedEvent):
-        stateful = objects_manager.get_by_id(event.stateful_id)
-        self.statefuls[event.stateful_id] = stateful
+        stateful = self.objects_manager.get_by_id(event.stateful_id)
+        self.event_manager.subscribe_to_deletion(event.stateful_id, self)
+        if isinstance(stateful, Expirable) and stateful.get_entity().store is self.entity_store:
+            row = stateful.get_entity().row
+            self.expirable_rows[event.stateful_id] = row
+            self.expirables_by_row[row] = stateful
+        else:
+            self.statefuls[event.stateful_id] = stateful
 
     def process_object_deleted_event(self, event: ObjectDeletedEvent):
         if event.object_id in self.statefuls:
             del self.statefuls[event.object_id]
+        if event.object_id in self.expirable_rows:
+            del self.expirables_by_row[self.expirable_rows.pop(event.object_id)]
 
     def update_statefuls(self):
         for stateful in self.statefuls.values():
             stateful.update_state()
+        if self.expirables_by_row:
+            for row in self.entity_store.rows_at_constraints():
+                expirable = self.expirables_by_row.get(row)
+                if expirable is not None:
+                    expirable.expire()
+
+    def can_skip_ticks(self) -> bool:
+        """
+        Whether skip_ticks is exact: every expirable is checked through the entity store
+        """
+        return not any(isinstance(stateful, Expirable) for stateful in self.statefuls.values())
+
+    def skip_ticks(self, ticks: int) -> None:
+        """
+        Resolve ticks updates in which, as checked by the caller, no expirable reaches its constraints
+        """
+        for _ in range(ticks):
+            for stateful in self.statefuls.values():
+                stateful.update_state()
 
     def process_update_statefuls_event(self, event: Event):
         self.update_statefuls()
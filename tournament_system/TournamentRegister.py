@@ -17,7 +17,7 @@ def one_round(fst_model: ModelEntry, snd_model: ModelEntry, game_in_round:int) -
     points = 0
     for i in range(game_in_round):
         game_config = Config.unified()
-        game = Game(game_config, max_game_length=2000)
+        game = Game(game_config, max_game_length=2000, headless=True)
         p1 = create_player_1(game_config, game.game_controller.event_manager)
         p2 = create_player_2(game_config, game.game_controller.event_manager)
         c1 = fst_model.create_controller(game.game_controller.event_manager, game_config,